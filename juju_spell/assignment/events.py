@@ -0,0 +1,152 @@
+"""Events emitted while commands are running on controllers.
+
+The subscribers are called synchronously in the event loop, so they should be
+fast, e.g. write a line to metrics file or update a progress bar. Subscribing to
+`Event` receives all events.
+
+    def on_result_ready(event: ResultReady) -> None:
+        ...
+
+    event_bus.subscribe(ResultReady, on_result_ready)
+"""
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import logging
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Type
+
+if TYPE_CHECKING:
+    from juju_spell.commands.base import BaseJujuCommand, Result
+    from juju_spell.config import Controller
+
+logger = logging.getLogger(__name__)
+
+Subscriber = Callable[["Event"], None]
+
+
+@dataclasses.dataclass(frozen=True)
+class Event:
+    """Base event."""
+
+
+@dataclasses.dataclass(frozen=True)
+class ControllerConnectStart(Event):
+    """Connection to controller started."""
+
+    controller_config: Controller
+
+
+@dataclasses.dataclass(frozen=True)
+class ControllerConnectEnd(Event):
+    """Connection to controller ended, the error is set if it failed."""
+
+    controller_config: Controller
+    error: Optional[BaseException] = None
+
+
+@dataclasses.dataclass(frozen=True)
+class CommandStart(Event):
+    """Command, including pre-check, started on controller."""
+
+    controller_config: Controller
+    command: BaseJujuCommand
+
+
+@dataclasses.dataclass(frozen=True)
+class CommandEnd(Event):
+    """Command ended on controller, the error is set if it did not finish."""
+
+    controller_config: Controller
+    command: BaseJujuCommand
+    output: Optional[Result] = None
+    error: Optional[BaseException] = None
+
+
+@dataclasses.dataclass(frozen=True)
+class ModelOpen(Event):
+    """Model was connected."""
+
+    controller_uuid: str
+    model_name: str
+
+
+@dataclasses.dataclass(frozen=True)
+class ModelClose(Event):
+    """Model was disconnected."""
+
+    controller_uuid: str
+    model_name: str
+
+
+@dataclasses.dataclass(frozen=True)
+class ResultReady(Event):
+    """Result of controller is ready, including cached and failed results."""
+
+    controller_config: Controller
+    result: Dict[str, Any]
+
+
+class EventBus:
+    """Bus delivering events to subscribers.
+
+    The `publish` creates the event only if there is any subscriber, so events
+    have almost no overhead if nothing is subscribed.
+    """
+
+    def __init__(self) -> None:
+        """Initialize bus without subscribers."""
+        self._subscribers: Dict[Type[Event], List[Subscriber]] = defaultdict(list)
+        self._active = False
+
+    def subscribe(self, event_type: Type[Event], subscriber: Subscriber) -> None:
+        """Subscribe to events of given type, `Event` is used for all events."""
+        self._subscribers[event_type].append(subscriber)
+        self._active = True
+
+    def unsubscribe(self, event_type: Type[Event], subscriber: Subscriber) -> None:
+        """Remove subscriber of events of given type."""
+        with contextlib.suppress(ValueError):
+            self._subscribers[event_type].remove(subscriber)
+
+        self._active = any(self._subscribers.values())
+
+    @contextlib.contextmanager
+    def subscribed(
+        self, event_type: Type[Event], subscriber: Subscriber
+    ) -> Iterator[None]:
+        """Subscribe to events only inside the context."""
+        self.subscribe(event_type, subscriber)
+        try:
+            yield
+        finally:
+            self.unsubscribe(event_type, subscriber)
+
+    def has_subscribers(self, event_type: Type[Event]) -> bool:
+        """Check if there is any subscriber of events of given type."""
+        return self._active and bool(
+            self._subscribers.get(event_type) or self._subscribers.get(Event)
+        )
+
+    def publish(self, event_type: Type[Event], **fields: Any) -> None:
+        """Create event and deliver it to subscribers.
+
+        The failure of subscriber is only logged, so it can't affect the command.
+        """
+        if not self.has_subscribers(event_type):
+            return
+
+        event = event_type(**fields)
+        subscribers = [
+            *self._subscribers.get(event_type, []),
+            *self._subscribers.get(Event, []),
+        ]
+        for subscriber in subscribers:
+            try:
+                subscriber(event)
+            except Exception as error:
+                logger.error("subscriber %r failed with error '%s'", subscriber, error)
+
+
+event_bus = EventBus()
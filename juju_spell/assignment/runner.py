@@ -6,41 +6,381 @@ Provides different ways to run the Juju command:
     - Parallel: 20 in parallel
     - Serial: 20 commands in 1 parallel
 """
+import asyncio
 import logging
 from argparse import Namespace
-from dataclasses import asdict
-from typing import Any, Dict, List
+from typing import Any, AsyncGenerator, Awaitable, Dict, List, Optional, Set, Tuple
 
+from juju_spell.assignment.events import (
+    CommandEnd,
+    CommandStart,
+    ControllerConnectEnd,
+    ControllerConnectStart,
+    ResultReady,
+    event_bus,
+)
+from juju_spell.cache import get_cache_key, result_cache
 from juju_spell.commands.base import BaseJujuCommand, Result
 from juju_spell.config import Config, Controller
 from juju_spell.connections import connect_manager, get_controller
+from juju_spell.settings import DEFAULT_MAX_CONCURRENCY
+from juju_spell.timings import PHASE_EXECUTE, PHASE_PRE_CHECK, phase_timings
 
 logger = logging.getLogger(__name__)
 
 RESULT_TYPE = Dict[str, Dict[str, Any]]
 RESULTS_TYPE = List[RESULT_TYPE]
+BATCH_MODE_WAVE = "wave"
+BATCH_MODE_WINDOW = "window"
+BATCH_MODES = [BATCH_MODE_WAVE, BATCH_MODE_WINDOW]
 
 
 def get_result(controller_config: Controller, output: Result) -> RESULT_TYPE:
-    """Get command result."""
+    """Get command result.
+
+    The result only references the command output, since `dataclasses.asdict` would
+    create a deep copy of it, e.g. whole status of controller.
+    """
     return {
         "context": {
             "uuid": controller_config.uuid,
             "name": controller_config.name,
             "customer": controller_config.customer,
         },
-        **asdict(output),
+        "success": output.success,
+        "output": output.output,
+        "error": output.error,
     }
 
 
+def publish_result(controller_config: Controller, result: RESULT_TYPE) -> RESULT_TYPE:
+    """Publish the ResultReady event and return the result."""
+    event_bus.publish(ResultReady, controller_config=controller_config, result=result)
+    return result
+
+
+def attach_timings(
+    controller_config: Controller, parsed_args: Namespace, result: RESULT_TYPE
+) -> RESULT_TYPE:
+    """Attach timings of phases to result context if `--timings` is used.
+
+    The timings are removed in any case, so they are not mixed with the next run.
+    """
+    timings = phase_timings.pop(controller_config.name)
+    if getattr(parsed_args, "timings", False):
+        result["context"]["timings"] = timings
+
+    return result
+
+
+def get_max_concurrency(config: Config, parsed_args: Namespace) -> int:
+    """Get maximum number of controllers processed at the same time.
+
+    The `--parallel` CLI argument takes precedence over `connection.max-concurrency`
+    from config. The default is used only if neither of them is set.
+    """
+    parallel = getattr(parsed_args, "parallel", None)
+    if parallel is not None:
+        max_concurrency = parallel
+    elif config.connection is not None:
+        max_concurrency = config.connection.get("max-concurrency")
+    else:
+        max_concurrency = None
+
+    if max_concurrency is None:
+        return DEFAULT_MAX_CONCURRENCY
+
+    if max_concurrency < 1:
+        raise ValueError(f"max-concurrency must be greater than 0: {max_concurrency}")
+
+    return max_concurrency
+
+
+def get_batches(
+    config: Config, parsed_args: Namespace
+) -> Tuple[List[List[Controller]], int]:
+    """Split controllers to batches based on `--batch-size` and `--batch-mode`.
+
+    Returns list of batches and maximum number of controllers processed at the same
+    time. The sliding window is represented by single batch with all controllers.
+    """
+    batch_size = getattr(parsed_args, "batch_size", None)
+    batch_size = batch_size or get_max_concurrency(config, parsed_args)
+    batch_mode = getattr(parsed_args, "batch_mode", None) or BATCH_MODE_WAVE
+    logger.info("running in batches of %d in %s mode", batch_size, batch_mode)
+
+    if batch_mode == BATCH_MODE_WINDOW:
+        return [config.controllers], batch_size
+
+    batches = []
+    for start in range(0, len(config.controllers), batch_size):
+        end = start + batch_size
+        batches.append(config.controllers[start:end])
+
+    return batches, batch_size
+
+
+def get_deadline(parsed_args: Namespace) -> Optional[float]:
+    """Get deadline of the whole run as event loop time.
+
+    The deadline is defined by the `--deadline` argument in seconds from now.
+    """
+    deadline = getattr(parsed_args, "deadline", None)
+    if deadline is None:
+        return None
+
+    return asyncio.get_running_loop().time() + deadline
+
+
+def get_timeout(timeout: Optional[float], deadline: Optional[float]) -> Optional[float]:
+    """Get timeout for single step, which does not exceed the deadline."""
+    if deadline is None:
+        return timeout
+
+    remaining = max(deadline - asyncio.get_running_loop().time(), 0)
+    if timeout is None:
+        return remaining
+
+    return min(timeout, remaining)
+
+
+async def wait_for(awaitable: Awaitable, timeout: Optional[float], message: str) -> Any:
+    """Wait for awaitable and raise TimeoutError with message if it takes too long."""
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(message) from None
+
+
+def get_cached_output(
+    controller_config: Controller, command: BaseJujuCommand, parsed_args: Namespace
+) -> Optional[Result]:
+    """Get cached output of command, which is not older than `--max-age`.
+
+    Only read commands define the `--max-age` argument, so the output of write
+    commands is never cached.
+    """
+    max_age = getattr(parsed_args, "max_age", None)
+    if not max_age or parsed_args.dry_run:
+        return None
+
+    key = get_cache_key(controller_config, command, parsed_args)
+    return result_cache.get(key, max_age)
+
+
+def set_cached_output(
+    controller_config: Controller,
+    command: BaseJujuCommand,
+    parsed_args: Namespace,
+    output: Result,
+) -> None:
+    """Store output of successful command to cache if `--max-age` is used."""
+    if getattr(parsed_args, "max_age", None) and not parsed_args.dry_run:
+        if output.success:
+            key = get_cache_key(controller_config, command, parsed_args)
+            result_cache.set(key, output)
+
+
+async def connect(
+    controller_config: Controller,
+    parsed_args: Namespace,
+    port_range: range,
+    deadline: Optional[float] = None,
+) -> Any:
+    """Connect to controller in `--connect-timeout` and publish connect events."""
+    event_bus.publish(ControllerConnectStart, controller_config=controller_config)
+    try:
+        controller = await wait_for(
+            get_controller(controller_config, port_range),
+            get_timeout(getattr(parsed_args, "connect_timeout", None), deadline),
+            f"connection to controller {controller_config.name} timed out",
+        )
+    except Exception as error:
+        event_bus.publish(
+            ControllerConnectEnd, controller_config=controller_config, error=error
+        )
+        raise
+
+    event_bus.publish(ControllerConnectEnd, controller_config=controller_config)
+    return controller
+
+
+async def execute(
+    controller: Any,
+    command: BaseJujuCommand,
+    parsed_args: Namespace,
+    command_kwargs: Dict[str, Any],
+    deadline: Optional[float] = None,
+) -> Result:
+    """Run command in `--timeout` and publish command events."""
+    controller_config = command_kwargs["controller_config"]
+    event_bus.publish(
+        CommandStart, controller_config=controller_config, command=command
+    )
+    try:
+        output = await wait_for(
+            _run_command(controller, command, parsed_args, command_kwargs),
+            get_timeout(getattr(parsed_args, "timeout", None), deadline),
+            f"command on controller {controller_config.name} timed out",
+        )
+    except Exception as error:
+        event_bus.publish(
+            CommandEnd,
+            controller_config=controller_config,
+            command=command,
+            error=error,
+        )
+        raise
+
+    event_bus.publish(
+        CommandEnd, controller_config=controller_config, command=command, output=output
+    )
+    return output
+
+
+async def _run_command(
+    controller: Any,
+    command: BaseJujuCommand,
+    parsed_args: Namespace,
+    command_kwargs: Dict[str, Any],
+) -> Result:
+    """Run pre-check and dry-run or run of command."""
+    name = command_kwargs["controller_config"].name
+    with phase_timings.span(name, PHASE_PRE_CHECK):
+        pre_check = await command.pre_check(controller=controller, **command_kwargs)
+
+    if pre_check is not None:
+        return pre_check
+
+    with phase_timings.span(name, PHASE_EXECUTE):
+        if parsed_args.dry_run:
+            return await command.dry_run(controller=controller, **command_kwargs)
+
+        return await command.run(controller=controller, **command_kwargs)
+
+
+async def run_on_controller(
+    controller_config: Controller,
+    command: BaseJujuCommand,
+    parsed_args: Namespace,
+    port_range: range,
+    deadline: Optional[float] = None,
+) -> RESULT_TYPE:
+    """Run controller target command on single controller.
+
+    The connection to controller is limited by `--connect-timeout` and the command
+    itself by `--timeout` argument, both of them are also limited by the deadline.
+    If any of them is exceeded, the failed result with TimeoutError is returned.
+
+    Parameters:
+        controller_config(Controller): controller configuration
+        command(BaseJujuCommand): command to run
+        parsed_args(Namespace): Namespace from CLI
+        port_range(range): range of ports used for port-forwarding
+        deadline(Optional[float]): deadline of the whole run as event loop time
+    Returns:
+        result(Dict): Controller dict with result.
+    """
+    output = get_cached_output(controller_config, command, parsed_args)
+    if output is not None:
+        logger.info("%s using cached result", controller_config.uuid)
+        return publish_result(controller_config, get_result(controller_config, output))
+
+    # NOTE: parsed_args are shared between all controllers, so the kwargs need to
+    # be a copy to not leak controller_config between concurrently running tasks
+    command_kwargs = {**vars(parsed_args), "controller_config": controller_config}
+    try:
+        controller = await connect(controller_config, parsed_args, port_range, deadline)
+        output = await execute(
+            controller, command, parsed_args, command_kwargs, deadline
+        )
+    except TimeoutError as error:
+        logger.warning("%s %s", controller_config.uuid, error)
+        output = Result(False, error=error)
+
+    set_cached_output(controller_config, command, parsed_args, output)
+    result = get_result(controller_config, output)
+    return publish_result(
+        controller_config, attach_timings(controller_config, parsed_args, result)
+    )
+
+
+async def run_on_controller_isolated(
+    controller_config: Controller,
+    command: BaseJujuCommand,
+    parsed_args: Namespace,
+    port_range: range,
+    deadline: Optional[float] = None,
+) -> RESULT_TYPE:
+    """Run controller target command and turn any failure into failed result.
+
+    This prevents failure of one controller from affecting the others, when the
+    command is running on multiple controllers at the same time.
+    """
+    try:
+        return await run_on_controller(
+            controller_config, command, parsed_args, port_range, deadline
+        )
+    except Exception as error:
+        logger.error(
+            "%s running command failed with error '%s'", controller_config.uuid, error
+        )
+        result = get_result(controller_config, Result(False, error=error))
+        return publish_result(
+            controller_config, attach_timings(controller_config, parsed_args, result)
+        )
+
+
+async def run_concurrently(
+    controllers: List[Controller],
+    command: BaseJujuCommand,
+    parsed_args: Namespace,
+    port_range: range,
+    limit: int,
+    deadline: Optional[float] = None,
+) -> RESULTS_TYPE:
+    """Run controller target command on controllers with limited concurrency.
+
+    The next controller starts as soon as any of the running controllers is done,
+    so there are at most `limit` controllers processed at the same time.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _run(controller_config: Controller) -> RESULT_TYPE:
+        async with semaphore:
+            logger.debug("%s running concurrently", controller_config.uuid)
+            return await run_on_controller_isolated(
+                controller_config, command, parsed_args, port_range, deadline
+            )
+
+    results = await asyncio.gather(*map(_run, controllers))
+    return list(results)
+
+
 async def run_parallel(
     config: Config, command: BaseJujuCommand, parsed_args: Namespace
 ) -> RESULTS_TYPE:
     """Run controller target command in parallel.
 
-    THIS FUNCTION IS NOT YET SUPPORTED.
+    The number of controllers processed at the same time is limited by the
+    `--parallel` argument or by `connection.max-concurrency` from config.
+
+    Parameters:
+        config(Config): application configuration
+        command(BaseJujuCommand): command to run
+        parsed_args(Namespace): Namespace from CLI
+    Returns:
+        results(Dict): Controller dict with result in the same order as
+            controllers in config.
     """
-    raise NotImplementedError("running in parallel is not yet supported")
+    return await run_concurrently(
+        config.controllers,
+        command,
+        parsed_args,
+        config.connection.get("port-range"),
+        get_max_concurrency(config, parsed_args),
+        get_deadline(parsed_args),
+    )
 
 
 async def run_serial(
@@ -57,22 +397,12 @@ async def run_serial(
     """
     results: RESULTS_TYPE = []
     port_range = config.connection.get("port-range")
+    deadline = get_deadline(parsed_args)
     for controller_config in config.controllers:
-        controller = await get_controller(controller_config, port_range)
-        logger.debug("%s running in serial", controller.controller_uuid)
-        command_kwargs = vars(parsed_args)
-        command_kwargs["controller_config"] = controller_config
-
-        pre_check = await command.pre_check(controller=controller, **command_kwargs)
-
-        if pre_check is not None:
-            output = pre_check
-        elif parsed_args.dry_run:
-            output = await command.dry_run(controller=controller, **command_kwargs)
-        else:
-            output = await command.run(controller=controller, **command_kwargs)
-
-        result = get_result(controller_config, output)
+        logger.debug("%s running in serial", controller_config.uuid)
+        result = await run_on_controller(
+            controller_config, command, parsed_args, port_range, deadline
+        )
         results.append(result)
 
     return results
@@ -83,9 +413,174 @@ async def run_batch(
 ) -> RESULTS_TYPE:
     """Run controller target command in batches.
 
-    THIS FUNCTION IS NOT YET SUPPORTED.
+    The size of batch is defined by the `--batch-size` argument, if it's not
+    provided the `get_max_concurrency` is used. There are two modes of batches:
+
+        - wave: the whole batch needs to be done before the next one starts, which
+                is suitable for risky commands
+        - window: sliding window, where the next controller starts as soon as any
+                  controller in batch is done
+
+    Parameters:
+        config(Config): application configuration
+        command(BaseJujuCommand): command to run
+        parsed_args(Namespace): Namespace from CLI
+    Returns:
+        results(Dict): Controller dict with result in the same order as
+            controllers in config.
+    """
+    port_range = config.connection.get("port-range")
+    batches, limit = get_batches(config, parsed_args)
+    deadline = get_deadline(parsed_args)
+    results: RESULTS_TYPE = []
+    for batch in batches:
+        results.extend(
+            await run_concurrently(
+                batch, command, parsed_args, port_range, limit, deadline
+            )
+        )
+
+    return results
+
+
+async def iter_concurrently(
+    controllers: List[Controller],
+    command: BaseJujuCommand,
+    parsed_args: Namespace,
+    port_range: range,
+    limit: int,
+    deadline: Optional[float] = None,
+) -> AsyncGenerator[RESULT_TYPE, None]:
+    """Run controller target command concurrently and yield results when ready.
+
+    Results are yielded in order in which controllers finished and they are not
+    referenced by this generator after that, so they can be garbage-collected
+    as soon as consumer process them.
     """
-    raise NotImplementedError("running in batches is not yet supported")
+    semaphore = asyncio.Semaphore(limit)
+    pending: Set[asyncio.Future] = set()
+
+    async def _run(controller_config: Controller) -> RESULT_TYPE:
+        async with semaphore:
+            logger.debug("%s running concurrently", controller_config.uuid)
+            return await run_on_controller_isolated(
+                controller_config, command, parsed_args, port_range, deadline
+            )
+
+    for controller_config in controllers:
+        task = asyncio.ensure_future(_run(controller_config))
+        task.add_done_callback(pending.discard)
+        pending.add(task)
+
+    try:
+        for next_result in asyncio.as_completed(list(pending)):
+            yield await next_result
+    finally:
+        # consumer stopped the iteration before all controllers were done
+        for task in pending:
+            task.cancel()
+
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def iter_serial(
+    controllers: List[Controller],
+    command: BaseJujuCommand,
+    parsed_args: Namespace,
+    port_range: range,
+    deadline: Optional[float] = None,
+) -> AsyncGenerator[RESULT_TYPE, None]:
+    """Run controller target command serially and yield results when ready."""
+    for controller_config in controllers:
+        logger.debug("%s running in serial", controller_config.uuid)
+        yield await run_on_controller(
+            controller_config, command, parsed_args, port_range, deadline
+        )
+
+
+async def iter_batch(
+    config: Config, command: BaseJujuCommand, parsed_args: Namespace
+) -> AsyncGenerator[RESULT_TYPE, None]:
+    """Run controller target command in batches and yield results when ready.
+
+    See `run_batch` for more details about batch modes.
+    """
+    port_range = config.connection.get("port-range")
+    batches, limit = get_batches(config, parsed_args)
+    deadline = get_deadline(parsed_args)
+    for batch in batches:
+        async for result in iter_concurrently(
+            batch, command, parsed_args, port_range, limit, deadline
+        ):
+            yield result
+
+
+def warm_up(config: Config, command: BaseJujuCommand, parsed_args: Namespace) -> None:
+    """Start connecting to all controllers in the background.
+
+    The controllers are then processed in the same way, but `get_controller` only
+    waits for connection, which is already in progress or done. Controllers with
+    cached output are skipped. Only parallel run and batches in window mode are
+    warmed up, since serial run and batches in wave mode should not connect to
+    controllers before they are processed.
+    """
+    run_type = parsed_args.run_type
+    batch_mode = getattr(parsed_args, "batch_mode", None)
+    if run_type == "parallel":
+        limit = get_max_concurrency(config, parsed_args)
+    elif run_type == "batch" and batch_mode == BATCH_MODE_WINDOW:
+        batch_size = getattr(parsed_args, "batch_size", None)
+        limit = batch_size or get_max_concurrency(config, parsed_args)
+    else:
+        return
+
+    controllers = [
+        controller_config
+        for controller_config in config.controllers
+        if get_cached_output(controller_config, command, parsed_args) is None
+    ]
+    if len(controllers) > 1:
+        port_range = config.connection.get("port-range")
+        connect_manager.warm_up(controllers, port_range, limit)
+
+
+async def iter_run(
+    config: Config,
+    command: BaseJujuCommand,
+    parsed_args: Namespace,
+    keep_connections: bool = False,
+) -> AsyncGenerator[RESULT_TYPE, None]:
+    """Run controller target command and yield results as soon as they are ready.
+
+    This is streaming variant of `run`, which does not keep results of all
+    controllers in memory. Results of parallel and batch run types are yielded
+    in order in which controllers finished. With `keep_connections` the connections
+    are not closed at the end, so they could be used by next run.
+    """
+    run_type = parsed_args.run_type
+    port_range = config.connection.get("port-range")
+    deadline = get_deadline(parsed_args)
+    logger.info("running with run_type: %s", run_type)
+    warm_up(config, command, parsed_args)
+    if run_type == "parallel":
+        limit = get_max_concurrency(config, parsed_args)
+        results = iter_concurrently(
+            config.controllers, command, parsed_args, port_range, limit, deadline
+        )
+    elif run_type == "batch":
+        results = iter_batch(config, command, parsed_args)
+    else:
+        results = iter_serial(
+            config.controllers, command, parsed_args, port_range, deadline
+        )
+
+    try:
+        async for result in results:
+            yield result
+    finally:
+        await results.aclose()
+        if not keep_connections:
+            await connect_manager.clean()
 
 
 async def run(
@@ -94,6 +589,7 @@ async def run(
     try:
         run_type = parsed_args.run_type
         logger.info("running with run_type: %s", run_type)
+        warm_up(config, command, parsed_args)
         if run_type == "parallel":
             return await run_parallel(config, command, parsed_args)
         if run_type == "batch":
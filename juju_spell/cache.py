@@ -0,0 +1,154 @@
+"""Disk-backed cache of results from read-only commands."""
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import time
+from argparse import Namespace
+from pathlib import Path
+from typing import Optional
+
+from juju_spell.commands.base import BaseJujuCommand, Result
+from juju_spell.config import Controller
+from juju_spell.settings import DEFAULT_CACHE_MAX_SIZE, RESULTS_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# arguments, which change how the command is run, but not its output
+IGNORED_ARGS = {
+    "run_type",
+    "parallel",
+    "batch_size",
+    "batch_mode",
+    "connect_timeout",
+    "timeout",
+    "deadline",
+    "filter",
+    "format",
+    "no_confirm",
+    "daemon",
+    "max_age",
+    "model_parallel",
+    "timings",
+}
+
+
+def get_cache_key(
+    controller_config: Controller, command: BaseJujuCommand, parsed_args: Namespace
+) -> str:
+    """Get cache key from controller uuid, command name and normalized arguments."""
+    args = {
+        name: value
+        for name, value in vars(parsed_args).items()
+        if name not in IGNORED_ARGS
+    }
+    key = json.dumps(
+        [controller_config.uuid, command.name, args], sort_keys=True, default=str
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class ResultCache:
+    """Disk-backed cache of command results with time to live.
+
+    Each result is stored in its own file `<path>/<key>.pickle` together with the
+    time when it was stored. The modification time of the file is updated each time
+    the result is used, so if the size of cache exceeds `max_size`, the least
+    recently used results are removed first.
+
+    The size of cache is tracked in memory, so the directory is scanned only by the
+    first write and when the size exceeds `max_size`. The cache is then reduced to
+    `evict_ratio` of `max_size`, so it's not scanned again by the next write. The
+    results stored by other processes are counted by the next scan.
+    """
+
+    evict_ratio = 0.75
+
+    def __init__(
+        self, path: Path = RESULTS_CACHE_DIR, max_size: int = DEFAULT_CACHE_MAX_SIZE
+    ):
+        """Initialize the cache.
+
+        :param path: directory with cached results
+        :param max_size: maximum size of all cached results in bytes
+        """
+        self.path = path
+        self.max_size = max_size
+        self._size: Optional[int] = None  # unknown until the first eviction
+
+    def _get_path(self, key: str) -> Path:
+        """Get path to cached result."""
+        return self.path / f"{key}.pickle"
+
+    def get(self, key: str, max_age: float) -> Optional[Result]:
+        """Get cached result, which is not older than `max_age` seconds."""
+        path = self._get_path(key)
+        try:
+            with open(path, "rb") as file:
+                created, output = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as error:
+            logger.warning("cached result %s could not be loaded: %s", key, error)
+            return None
+
+        if time.time() - created > max_age:
+            logger.debug("cached result %s is expired", key)
+            return None
+
+        # NOTE: the result could be evicted by another process in the meantime
+        with contextlib.suppress(OSError):
+            os.utime(path)  # mark result as recently used
+
+        return output
+
+    def set(self, key: str, output: Result) -> None:
+        """Store result to cache."""
+        self.path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        try:
+            data = pickle.dumps((time.time(), output))
+        except Exception as error:
+            logger.warning("result %s could not be cached: %s", key, error)
+            return
+
+        # NOTE: the result is written to temporary file first, so other processes
+        # could never read partially written result
+        with tempfile.NamedTemporaryFile(dir=self.path, delete=False) as file:
+            file.write(data)
+
+        os.replace(file.name, self._get_path(key))
+        if self._size is not None:
+            self._size += len(data)  # NOTE: replaced result is counted until scan
+            if self._size <= self.max_size:
+                return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used results if cache is too big."""
+        entries = []
+        for path in self.path.glob("*.pickle"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # removed by another process
+
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        if size > self.max_size:
+            for _, entry_size, path in sorted(entries):
+                if size <= self.max_size * self.evict_ratio:
+                    break
+
+                logger.debug("removing cached result %s", path.stem)
+                path.unlink(missing_ok=True)
+                size -= entry_size
+
+        self._size = size
+
+
+result_cache = ResultCache()
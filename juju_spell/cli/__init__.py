@@ -16,17 +16,23 @@
 
 """JujuSpell cli commands."""
 from .add_user import AddUserCMD
+from .daemon import DaemonCMD
+from .fleet_summary import FleetSummaryCMD
 from .grant import GrantCMD
 from .ping import PingCMD
 from .remove_user import RemoveUserCMD
 from .show_controller import ShowControllerInformationCMD
 from .status import StatusCMD
+from .validate_config import ValidateConfigCMD
 
 __all__ = [
     "AddUserCMD",
+    "DaemonCMD",
+    "FleetSummaryCMD",
     "GrantCMD",
     "RemoveUserCMD",
     "PingCMD",
     "StatusCMD",
     "ShowControllerInformationCMD",
+    "ValidateConfigCMD",
 ]
@@ -21,12 +21,12 @@ from getpass import getpass
 from typing import Any
 
 import craft_cli
-import yaml
-from craft_cli import emit
 from craft_cli.dispatcher import _CustomArgumentParser
 
 from juju_spell.cli.base import JujuWriteCMD
+from juju_spell.cli.utils import emit_debug
 from juju_spell.commands.add_user import AddUserCommand
+from juju_spell.serializer import dumps_yaml
 from juju_spell.settings import PERSONAL_CONFIG_PATH
 
 
@@ -116,7 +116,7 @@ class AddUserCMD(JujuWriteCMD):
                 },
             ]
         """
-        emit.debug(f"formatting `{retval}`")
+        emit_debug("formatting `%s`", retval)
 
         controllers = []
 
@@ -133,13 +133,7 @@ class AddUserCMD(JujuWriteCMD):
 
             controllers.append(output)
 
-        yaml_str = yaml.dump(
-            {"controllers": controllers},
-            default_flow_style=False,
-            allow_unicode=True,
-            encoding=None,
-            sort_keys=False,
-        )
+        yaml_str = dumps_yaml({"controllers": controllers})
         return (
             f"Please put user information to personal config({PERSONAL_CONFIG_PATH}):"
             f"{os.linesep}{os.linesep}{yaml_str}{os.linesep}"
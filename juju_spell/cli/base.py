@@ -17,30 +17,70 @@
 """JujuSpell base cli command."""
 import argparse
 import asyncio
-import json
+import functools
 import os
+import sys
 from abc import ABCMeta, abstractmethod
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Union
 
 from craft_cli import BaseCommand, emit
 from craft_cli.dispatcher import _CustomArgumentParser
 
-from juju_spell.assignment.runner import run
-from juju_spell.cli.utils import confirm, parse_comma_separated_str, parse_filter
+from juju_spell.assignment.runner import (
+    BATCH_MODE_WAVE,
+    BATCH_MODE_WINDOW,
+    BATCH_MODES,
+    RESULT_TYPE,
+    iter_run,
+    run,
+)
+from juju_spell.cli.utils import (
+    confirm,
+    emit_debug,
+    emit_trace,
+    parse_comma_separated_str,
+    parse_filter,
+    parse_positive_float,
+    parse_positive_int,
+)
 from juju_spell.commands.base import BaseJujuCommand
 from juju_spell.config import Config
+from juju_spell.daemon import is_daemon_running, run_on_daemon
 from juju_spell.exceptions import JujuSpellError
 from juju_spell.filter import get_filtered_config
+from juju_spell.serializer import dumps_json
+from juju_spell.timings import TIMINGS_TYPE, get_report, phase_timings
+
+OUTPUT_FORMAT_JSON = "json"
+OUTPUT_FORMAT_NDJSON = "ndjson"
+OUTPUT_FORMATS = [OUTPUT_FORMAT_JSON, OUTPUT_FORMAT_NDJSON]
 
 
 class BaseCMD(BaseCommand, metaclass=ABCMeta):
     """Base CLI command for handling contexts."""
 
-    def __init__(self, config: Optional[Config]) -> None:
-        """Initialize BaseCMD."""
-        self.config: Optional[Config] = None  # to overwrite config type hinting
+    def __init__(self, config: Union[Config, Callable[[], Config], None]) -> None:
+        """Initialize BaseCMD.
+
+        :param config: config or `functools.partial` loading it, which is called
+                       only when the config is accessed for the first time
+        """
+        self._config: Union[Config, Callable[[], Config], None] = None
         super().__init__(config)
 
+    @property
+    def config(self) -> Optional[Config]:
+        """Get config, which is loaded on first access."""
+        if isinstance(self._config, functools.partial):
+            self._config = self._config()
+
+        return self._config
+
+    @config.setter
+    def config(self, config: Union[Config, Callable[[], Config], None]) -> None:
+        """Set config or function loading it."""
+        self._config = config
+
     def run(self, parsed_args: argparse.Namespace) -> Optional[int]:
         """Execute CLI command.
 
@@ -50,9 +90,10 @@ class BaseCMD(BaseCommand, metaclass=ABCMeta):
             self.before(parsed_args)
             emit.trace(f"function 'before' was run for {self.name} command")
             retval = self.execute(parsed_args)
-            emit.trace(f"raw output of {self.name} command: {retval}")
+            emit_trace("raw output of %s command: %s", self.name, retval)
             message = self.format_output(retval)
-            emit.message(message)  # print the output
+            if message:
+                emit.message(message)  # print the output
             self.after(parsed_args)
             emit.trace(f"function 'after' was run for {self.name} command")
             return 0
@@ -63,11 +104,21 @@ class BaseCMD(BaseCommand, metaclass=ABCMeta):
 
     @staticmethod
     def format_output(retval: Any) -> str:
-        """Pretty formatter for output."""
-        emit.debug(f"formatting `{retval}`")
+        """Pretty formatter for output.
+
+        If the retval is an iterator, each record is printed as a single line JSON
+        (NDJSON) as soon as it's available and an empty string is returned.
+        """
+        emit_debug("formatting `%s`", retval)
+        if isinstance(retval, Iterator):
+            for record in retval:
+                emit.message(dumps_json(record))
+
+            return ""
+
         if isinstance(retval, (dict, list)):
             # TODO: add support for table, yaml, ... format
-            return json.dumps(retval, default=vars, indent=1)
+            return dumps_json(retval, pretty=True)
 
         return str(retval)
 
@@ -99,6 +150,8 @@ class BaseCMD(BaseCommand, metaclass=ABCMeta):
 class BaseJujuCMD(BaseCMD, metaclass=ABCMeta):
     """Base CLI command for handling any Juju commands."""
 
+    batch_mode = BATCH_MODE_WAVE  # default mode for `--run-type batch`
+
     @property
     @abstractmethod
     def command(self):  # pragma: no cover
@@ -123,6 +176,52 @@ class BaseJujuCMD(BaseCMD, metaclass=ABCMeta):
             default="serial",
             help="parallel, batch or serial",
         )
+        parser.add_argument(
+            "--parallel",
+            type=parse_positive_int,
+            required=False,
+            help=(
+                "Maximum number of controllers processed at the same time. Overrides "
+                "`connection.max-concurrency` from config."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=parse_positive_int,
+            required=False,
+            help="Number of controllers in one batch. Defaults to `--parallel`.",
+        )
+        parser.add_argument(
+            "--batch-mode",
+            type=str,
+            choices=BATCH_MODES,
+            default=self.batch_mode,
+            help=(
+                "wave: wait for the whole batch before starting next one, window: "
+                "start next controller as soon as any controller in batch is done"
+            ),
+        )
+        parser.add_argument(
+            "--connect-timeout",
+            type=parse_positive_float,
+            required=False,
+            help="Time limit in seconds to connect to single controller.",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=parse_positive_float,
+            required=False,
+            help="Time limit in seconds to run the command on single controller.",
+        )
+        parser.add_argument(
+            "--deadline",
+            type=parse_positive_float,
+            required=False,
+            help=(
+                "Time limit in seconds for the whole run. Controllers not done "
+                "before the deadline will fail with timeout error."
+            ),
+        )
         parser.add_argument(
             "--filter",
             type=parse_filter,
@@ -130,7 +229,7 @@ class BaseJujuCMD(BaseCMD, metaclass=ABCMeta):
             default="",
             help=(
                 "Key-value pair comma separated string in double quotes e.g., "
-                '"a=1,2,3 b=4,5,6". '
+                '"a=1,2,3 b!=4,5,6 c=prod-* d=/^prod-[0-9]+$/". '
             ),
         )
         parser.add_argument(
@@ -138,6 +237,25 @@ class BaseJujuCMD(BaseCMD, metaclass=ABCMeta):
             type=parse_comma_separated_str,
             help="model filter",
         )
+        parser.add_argument(
+            "--format",
+            type=str,
+            choices=OUTPUT_FORMATS,
+            default=OUTPUT_FORMAT_JSON,
+            help=(
+                "json: print results of all controllers at the end, ndjson: print "
+                "result of each controller as soon as it is ready"
+            ),
+        )
+        parser.add_argument(
+            "--timings",
+            default=False,
+            action="store_true",
+            help=(
+                "Add duration of each phase to results and print p50, p95 and max "
+                "duration of phases to stderr."
+            ),
+        )
 
     def execute(self, parsed_args: argparse.Namespace) -> Any:
         """Execute Juju Commands."""
@@ -145,15 +263,87 @@ class BaseJujuCMD(BaseCMD, metaclass=ABCMeta):
             raise RuntimeError(f"command `{self.command}` is incorrect")
 
         filtered_config = get_filtered_config(self.config, parsed_args.filter)
+        ndjson = getattr(parsed_args, "format", None) == OUTPUT_FORMAT_NDJSON
+        if getattr(parsed_args, "daemon", False):
+            if not is_daemon_running():
+                raise JujuSpellError("daemon is not running, see `juju-spell daemon`")
+
+            emit.debug("running command by daemon")
+            results = run_on_daemon(self.command, filtered_config, parsed_args)
+            if not ndjson:
+                results = list(results)
+        elif ndjson:
+            results = self.stream(filtered_config, parsed_args)
+        else:
+            loop = asyncio.get_event_loop()
+            task = loop.create_task(run(filtered_config, self.command(), parsed_args))
+            loop.run_until_complete(asyncio.gather(task))
+            results = task.result()
+
+        if getattr(parsed_args, "timings", False):
+            results = self.collect_timings(results)
+            if not ndjson:
+                results = list(results)
+
+        return results
+
+    def collect_timings(self, results: Iterable[RESULT_TYPE]) -> Iterator[RESULT_TYPE]:
+        """Collect timings from results, which are printed after the command."""
+        self.timings: List[TIMINGS_TYPE] = []
+        for result in results:
+            self.timings.append(result["context"].get("timings", {}))
+            yield result
+
+    def after(self, parsed_args: argparse.Namespace) -> None:
+        """Print report of timings if `--timings` is used."""
+        if getattr(parsed_args, "timings", False):
+            # NOTE: disconnect is done after all results, so it's not in any of them
+            timings = getattr(self, "timings", []) + list(
+                phase_timings.pop_all().values()
+            )
+            with emit.pause():
+                print(get_report(timings), file=sys.stderr)
+
+    def stream(
+        self, config: Config, parsed_args: argparse.Namespace
+    ) -> Iterator[RESULT_TYPE]:
+        """Execute Juju Commands and yield results as soon as they are ready."""
         loop = asyncio.get_event_loop()
-        task = loop.create_task(run(filtered_config, self.command(), parsed_args))
-        loop.run_until_complete(asyncio.gather(task))
-        return task.result()
+        results = iter_run(config, self.command(), parsed_args)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(results.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            loop.run_until_complete(results.aclose())
 
 
 class JujuReadCMD(BaseJujuCMD, metaclass=ABCMeta):
     """Base CLI command for handling Juju commands with read access."""
 
+    batch_mode = BATCH_MODE_WINDOW
+
+    def fill_parser(self, parser: _CustomArgumentParser) -> None:
+        """Define arguments for read commands."""
+        super().fill_parser(parser)
+        parser.add_argument(
+            "--max-age",
+            type=parse_positive_float,
+            required=False,
+            help=(
+                "Use result cached by previous run if it is not older than given "
+                "number of seconds."
+            ),
+        )
+        parser.add_argument(
+            "--daemon",
+            default=False,
+            action="store_true",
+            help="Run the command by daemon, which keeps connections between runs.",
+        )
+
 
 class JujuWriteCMD(BaseJujuCMD, metaclass=ABCMeta):
     """Base CLI command for handling Juju commands with write access."""
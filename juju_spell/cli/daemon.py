@@ -0,0 +1,59 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""JujuSpell daemon command."""
+import argparse
+import asyncio
+import textwrap
+from typing import Callable, Union
+
+from juju_spell.cli.base import BaseCMD
+from juju_spell.config import Config
+from juju_spell.daemon import Daemon
+
+
+class DaemonCMD(BaseCMD):
+    """JujuSpell daemon keeping connections to controllers between runs."""
+
+    name = "daemon"
+    help_msg = "Run daemon keeping connections to controllers between runs"
+    overview = textwrap.dedent(
+        """
+        The daemon command runs in foreground and keeps connections to controllers,
+        including ssh tunnels, alive between runs. Read-only commands are run by the
+        daemon if `--daemon` is used. The daemon uses its own config, so only UUIDs
+        of controllers are sent to it. The daemon is stopped by SIGINT (Ctrl+C) or
+        SIGTERM.
+
+        Example:
+        $ juju-spell daemon &
+        $ juju-spell ping --daemon  # connects to controllers
+        $ juju-spell status --daemon  # uses connections created by ping
+        """
+    )
+
+    def __init__(self, config: Union[Config, Callable[[], Config], None]) -> None:
+        """Initialize command with function loading config for each request."""
+        super().__init__(config)
+        self.config_loader = config if callable(config) else lambda: self.config
+
+    def fill_parser(self, parser) -> None:
+        """Daemon does not support dry-run."""
+
+    def execute(self, parsed_args: argparse.Namespace) -> None:
+        """Run daemon until it's stopped."""
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(Daemon(config_loader=self.config_loader).serve())
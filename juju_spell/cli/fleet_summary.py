@@ -0,0 +1,64 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright 2023 Canonical Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""JujuSpell fleet summary command."""
+import textwrap
+
+from juju_spell.cli.base import JujuReadCMD
+from juju_spell.commands.fleet_summary import FleetSummaryCommand
+
+
+class FleetSummaryCMD(JujuReadCMD):
+    """JujuSpell fleet summary command."""
+
+    name = "fleet-summary"
+    help_msg = "Show summary of all models in controller(s)"
+    overview = textwrap.dedent(
+        """
+        The fleet-summary command shows number of applications, units and machines
+        with life and machine status of all models in controller(s). It uses single
+        call to each controller and it does not connect to any model, so it's much
+        faster than the status command.
+
+        Example:
+        $ juju-spell fleet-summary
+        [
+         {
+          "context": {
+           "uuid": "e9fe93a8-b705-4067-8f30-6eec183eeb4f",
+           "name": "controller1",
+           "customer": "Gandalf"
+          },
+          "success": true,
+          "output": {
+           "openstack": {
+            "type": "iaas",
+            "life": "alive",
+            "application_count": 42,
+            "unit_count": 180,
+            "machine_count": 24,
+            "machine_status": {
+             "started": 23,
+             "down": 1
+            }
+           }
+          },
+          "error": null
+         }
+        ]
+        """
+    )
+    command = FleetSummaryCommand
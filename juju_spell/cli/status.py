@@ -20,6 +20,7 @@ import textwrap
 from craft_cli.dispatcher import _CustomArgumentParser
 
 from juju_spell.cli.base import JujuReadCMD
+from juju_spell.cli.utils import parse_comma_separated_str, parse_positive_int
 from juju_spell.commands.status import StatusCommand
 
 
@@ -30,7 +31,10 @@ class StatusCMD(JujuReadCMD):
     help_msg = "Gets the status of selected model"
     overview = textwrap.dedent(
         """
-        The status command shows the status of the selected model.
+        The status command shows the status of the selected model. The 'relations'
+        and 'storage' sections are shown only with `--relations` and `--storage`,
+        and `--patterns` limits the status to matching applications, units and
+        machines.
 
         Example:
         $ juju-spell status
@@ -58,6 +62,7 @@ class StatusCMD(JujuReadCMD):
         super().fill_parser(parser)
         parser.add_argument(
             "--relations",
+            action="store_true",
             default=False,
             help="Show 'relations' section",
         )
@@ -67,3 +72,21 @@ class StatusCMD(JujuReadCMD):
             default=False,
             help="Show 'storage' section",
         )
+        parser.add_argument(
+            "--patterns",
+            type=parse_comma_separated_str,
+            required=False,
+            help=(
+                "Show only applications, units or machines matching the patterns, "
+                "e.g. 'nova-*,ceph-osd/0'"
+            ),
+        )
+        parser.add_argument(
+            "--model-parallel",
+            type=parse_positive_int,
+            required=False,
+            help=(
+                "Maximum number of models of single controller processed at the same "
+                "time. The models are processed one by one by default."
+            ),
+        )
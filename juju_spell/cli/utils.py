@@ -22,10 +22,11 @@ from argparse import ArgumentTypeError
 from gettext import gettext
 from typing import List
 
-from craft_cli import emit
+from craft_cli import EmitterMode, emit
 
 from juju_spell.exceptions import Abort, JujuSpellError
-from juju_spell.filter import FILTER_EXPRESSION_REGEX
+from juju_spell.filter import FILTER_EXPRESSION_REGEX, compile_filter
+from juju_spell.utils import summarize
 
 visible_prompt_func: t.Callable[[str], str] = input
 
@@ -91,9 +92,55 @@ def parse_comma_separated_str(comma_separated_str: str) -> List[str]:
     return [obj.strip() for obj in result if obj]
 
 
+def parse_positive_int(value: str) -> int:
+    """Type check for positive integer argument."""
+    try:
+        result = int(value)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid int value: {value}") from None
+
+    if result <= 0:
+        raise ArgumentTypeError(f"value must be greater than 0: {value}")
+
+    return result
+
+
+def parse_positive_float(value: str) -> float:
+    """Type check for positive float argument."""
+    try:
+        result = float(value)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid float value: {value}") from None
+
+    if result <= 0:
+        raise ArgumentTypeError(f"value must be greater than 0: {value}")
+
+    return result
+
+
 def parse_filter(value: str) -> str:
     """Type check for argument filter."""
     if not (re.findall(FILTER_EXPRESSION_REGEX, value) or len(value) == 0):
         raise ArgumentTypeError(f"Argument filter format wrong: {value}")
 
+    try:
+        compile_filter(value)
+    except re.error as error:
+        raise ArgumentTypeError(f"Argument filter format wrong: {error}") from None
+
     return value
+
+
+def emit_debug(message: str, *args: t.Any) -> None:
+    """Emit debug message with arguments summarized to limited size.
+
+    The debug messages are always written to log file, so large arguments, e.g.
+    output of command, are only summarized.
+    """
+    emit.debug(message % tuple(summarize(arg) for arg in args))
+
+
+def emit_trace(message: str, *args: t.Any) -> None:
+    """Emit trace message, which is formatted only in trace mode."""
+    if emit.get_mode() == EmitterMode.TRACE:
+        emit.trace(message % args)
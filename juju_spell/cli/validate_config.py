@@ -0,0 +1,61 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright 2022 Canonical Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""JujuSpell validate-config command."""
+import argparse
+import functools
+import textwrap
+from typing import Callable, Union
+
+from juju_spell.cli.base import BaseCMD
+from juju_spell.config import Config, validate_config
+
+
+class ValidateConfigCMD(BaseCMD):
+    """JujuSpell command validating all controllers in config."""
+
+    name = "validate-config"
+    help_msg = "Validate all controllers in config"
+    overview = textwrap.dedent(
+        """
+        The validate-config command fully validates all controllers in config.
+        Other commands validate only controllers selected by `--filter`.
+
+        Example:
+        $ juju-spell validate-config
+        configuration of 2 controllers is valid
+        """
+    )
+
+    def __init__(self, config: Union[Config, Callable[[], Config], None]) -> None:
+        """Initialize command with config loaded with full validation.
+
+        The lazily loaded config skips validation of default section and the errors
+        do not contain path to invalid controller, so the config is loaded with
+        `lazy=False` instead.
+        """
+        if isinstance(config, functools.partial):
+            config = functools.partial(config, lazy=False)
+
+        super().__init__(config)
+
+    def fill_parser(self, parser) -> None:
+        """Validate-config does not support dry-run."""
+
+    def execute(self, parsed_args: argparse.Namespace) -> str:
+        """Validate all controllers."""
+        config = validate_config(self.config)
+        return f"configuration of {len(config.controllers)} controllers is valid"
@@ -1,10 +1,12 @@
 """Module combinates all the commands."""
 import argparse
 import contextlib
+import functools
 import inspect
 import logging
 import os
 import sys
+from typing import List
 
 from craft_cli import (
     ArgumentParsingError,
@@ -18,12 +20,14 @@ from craft_cli import (
 )
 
 from juju_spell import cli, utils
-from juju_spell.cli.base import JujuReadCMD, JujuWriteCMD
+from juju_spell.cli.base import BaseCMD, BaseJujuCMD, JujuReadCMD, JujuWriteCMD
 from juju_spell.config import load_config
 from juju_spell.exceptions import JujuSpellError
+from juju_spell.profiler import PROFILE_CPU, PROFILE_MODES, profile
 from juju_spell.settings import (
     APP_NAME,
     APP_VERSION,
+    CONFIG_DIR_PATH,
     CONFIG_PATH,
     CROSS_FINGERS,
     PERSONAL_CONFIG_PATH,
@@ -37,6 +41,13 @@ GLOBAL_ARGS = [
         "config", "option", "-c", "--config", "Set the path to custom config."
     ),
     GlobalArgument("cross-fingers", "flag", None, "--cross-fingers", argparse.SUPPRESS),
+    GlobalArgument(
+        "profile",
+        "option",
+        None,
+        "--profile",
+        "Profile the run by cpu (default), wall or alloc profiler.",
+    ),
 ]
 
 
@@ -48,9 +59,13 @@ def get_all_subclasses(cls):
 def get_command_groups():
     ro_commands = get_all_subclasses(JujuReadCMD)
     rw_commands = get_all_subclasses(JujuWriteCMD)
+    other_commands = [
+        obj for obj in get_all_subclasses(BaseCMD) if not issubclass(obj, BaseJujuCMD)
+    ]
     command_groups = [
         CommandGroup("ReadOnly", ro_commands),
         CommandGroup("ReadWrite", rw_commands),
+        CommandGroup("Other", other_commands),
     ]
 
     return command_groups
@@ -113,6 +128,19 @@ def get_dispatcher() -> Dispatcher:
     )
 
 
+def _set_default_profile_mode(sysargs: List[str]) -> List[str]:
+    """Use cpu profiler if `--profile` is used without mode."""
+    args = []
+    for index, arg in enumerate(sysargs):
+        next_arg = sysargs[index + 1] if index + 1 < len(sysargs) else None
+        if arg == "--profile" and next_arg not in PROFILE_MODES:
+            arg = f"--profile={PROFILE_CPU}"
+
+        args.append(arg)
+
+    return args
+
+
 def _run_dispatcher(dispatcher: Dispatcher) -> None:
     """Run Dispatcher for JujuSpell.
 
@@ -121,8 +149,10 @@ def _run_dispatcher(dispatcher: Dispatcher) -> None:
     on the contrary, if the flag is used alone, it will print a message and end the
     function. Next, dispatcher.pre_parse_args will be called, the app config will be
     loaded (from default path or via `--config` CLI argument), the command will be
-    loaded with dispatcher and finally the dispatcher will be run.
+    loaded with dispatcher and finally the dispatcher will be run. With `--profile`
+    the command is run by profiler, see `juju_spell.profiler`.
     """
+    sys.argv[1:] = _set_default_profile_mode(sys.argv[1:])
     # Check if -v or --version was provided
     args, filtered_params = dispatcher._parse_options(
         dispatcher.global_arguments, sys.argv[1:]
@@ -137,11 +167,38 @@ def _run_dispatcher(dispatcher: Dispatcher) -> None:
         sys.argv.append("--no-confirm")  # add --no-confirm
         print(CROSS_FINGERS, file=sys.stdout)
 
+    profile_mode = args.get("profile")
+    if profile_mode is not None and profile_mode not in PROFILE_MODES:
+        raise ArgumentParsingError(
+            f"cannot use profiler {profile_mode!r} (valid values are "
+            f"{utils.humanize_list(PROFILE_MODES, 'and', sort=False)})"
+        )
+
+    profiler = None
+    try:
+        with profile(profile_mode) as profiler:
+            _load_and_run_command(dispatcher)
+    finally:
+        if profiler is not None:
+            with emit.pause():
+                print(profiler.summary(), file=sys.stderr)
+
+
+def _load_and_run_command(dispatcher: Dispatcher) -> None:
+    """Load command with lazily loaded config and run it."""
     global_args = dispatcher.pre_parse_args(sys.argv[1:])
+    # NOTE: controllers are validated only after filtering, see `validate_config`
+    # and config is loaded only when command access it, see `BaseCMD.config`
     if global_args.get("config"):
-        config = load_config(global_args["config"])
+        config = functools.partial(load_config, global_args["config"], lazy=True)
     else:
-        config = load_config(CONFIG_PATH, PERSONAL_CONFIG_PATH)
+        config = functools.partial(
+            load_config,
+            CONFIG_PATH,
+            PERSONAL_CONFIG_PATH,
+            lazy=True,
+            config_dir_path=CONFIG_DIR_PATH,
+        )
 
     dispatcher.load_command(config)
     dispatcher.run()
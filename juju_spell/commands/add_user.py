@@ -1,8 +1,13 @@
-from juju.controller import Controller
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
 from juju_spell.commands.base import BaseJujuCommand
 from juju_spell.utils import random_password
 
+if TYPE_CHECKING:
+    from juju.controller import Controller
+
 __all__ = ["AddUserCommand"]
 
 
@@ -15,13 +15,30 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 """JujuSpell base juju command."""
+from __future__ import annotations
+
+import asyncio
 import dataclasses
 import logging
 from abc import ABCMeta, abstractmethod
-from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
-
-from juju.controller import Controller
-from juju.model import Model
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from juju_spell.assignment.events import ModelClose, ModelOpen, event_bus
+from juju_spell.settings import DEFAULT_MODEL_CONCURRENCY
+
+if TYPE_CHECKING:
+    from juju.controller import Controller
+    from juju.model import Model
 
 
 @dataclasses.dataclass(frozen=True)
@@ -36,6 +53,8 @@ class Result:
 class BaseJujuCommand(metaclass=ABCMeta):
     """Base Juju commands."""
 
+    read_only = False  # only read-only commands could be run by daemon
+
     def __init__(self):
         """Init for command."""
         self.name = getattr(self.__class__, "__name__", "unknown")
@@ -53,15 +72,47 @@ class BaseJujuCommand(metaclass=ABCMeta):
         If the model_mapping[model] exits for specific model it will be replaced by the
         list of values from model_mapping[model] from config.
         """
-        if models is None or len(models) <= 0:
-            all_models = await controller.list_models()
-        else:
-            all_models = _apply_model_mappings(models, model_mappings)
-
-        for model_name in all_models:
-            model = await controller.get_model(model_name)
+        for model_name in await _get_model_names(controller, model_mappings, models):
+            model = await _open_model(controller, model_name)
             yield model_name, model
-            await model.disconnect()
+            await _close_model(controller, model_name, model)
+
+    @staticmethod
+    async def iter_models_concurrently(
+        controller: Controller,
+        func: Callable[[str, Model], Awaitable[Any]],
+        model_mappings: Dict[str, List[str]],
+        models: Optional[List[str]] = None,
+        limit: int = DEFAULT_MODEL_CONCURRENCY,
+        ordered: bool = False,
+    ) -> AsyncGenerator[Tuple[str, Any], None]:
+        """Run function on filtered models concurrently.
+
+        The models are selected in same way as in `get_filtered_models`. At most
+        `limit` models are connected at the same time and each model is disconnected
+        as soon as the function is done. The model name with output of the function
+        is yielded as soon as it's ready, or in order of models if `ordered` is True.
+        """
+        semaphore = asyncio.Semaphore(limit)
+
+        async def _run(model_name: str) -> Tuple[str, Any]:
+            async with semaphore:
+                model = await _open_model(controller, model_name)
+                try:
+                    return model_name, await func(model_name, model)
+                finally:
+                    await _close_model(controller, model_name, model)
+
+        model_names = await _get_model_names(controller, model_mappings, models)
+        tasks = [asyncio.ensure_future(_run(model_name)) for model_name in model_names]
+        try:
+            for next_done in tasks if ordered else asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()  # cancel models, which are not done, e.g. on failure
+
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     async def pre_check(self, controller: Controller, **kwargs) -> Optional[Result]:
         """Run pre-check for command."""
@@ -122,6 +173,35 @@ class BaseJujuCommand(metaclass=ABCMeta):
         ...
 
 
+async def _open_model(controller: Controller, model_name: str) -> Model:
+    """Connect to model and publish the ModelOpen event."""
+    model = await controller.get_model(model_name)
+    event_bus.publish(
+        ModelOpen, controller_uuid=controller.controller_uuid, model_name=model_name
+    )
+    return model
+
+
+async def _close_model(controller: Controller, model_name: str, model: Model) -> None:
+    """Disconnect from model and publish the ModelClose event."""
+    await model.disconnect()
+    event_bus.publish(
+        ModelClose, controller_uuid=controller.controller_uuid, model_name=model_name
+    )
+
+
+async def _get_model_names(
+    controller: Controller,
+    model_mappings: Dict[str, List[str]],
+    models: Optional[List[str]] = None,
+) -> List[str]:
+    """Get names of filtered models for controller."""
+    if models is None or len(models) <= 0:
+        return await controller.list_models()
+
+    return _apply_model_mappings(models, model_mappings)
+
+
 def _apply_model_mappings(
     models: List[str], model_mappings: Dict[str, List[str]]
 ) -> List[str]:
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from juju_spell.commands.base import BaseJujuCommand, _apply_model_mappings
+from juju_spell.utils import Summary, lazy_import
+
+if TYPE_CHECKING:
+    from juju.controller import Controller
+
+client = lazy_import("juju.client.client")
+tag = lazy_import("juju.tag")
+
+__all__ = ["FleetSummaryCommand"]
+
+
+class FleetSummaryCommand(BaseJujuCommand):
+    """Command to show summary of all models in controller."""
+
+    read_only = True
+
+    async def execute(
+        self, controller: Controller, models: Optional[List[str]] = None, **kwargs
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get summary of selected models with single call to controller.
+
+        The summary is provided by controller's ModelManager facade, so no model
+        connection is needed.
+        """
+        model_uuids = await controller.model_uuids()
+        if models:
+            model_mappings = kwargs["controller_config"].model_mapping
+            selected_models = _apply_model_mappings(models, model_mappings)
+            model_uuids = {
+                name: uuid
+                for name, uuid in model_uuids.items()
+                if name in selected_models
+            }
+
+        facade = client.ModelManagerFacade.from_connection(controller.connection())
+        entities = [client.Entity(tag.model(uuid)) for uuid in model_uuids.values()]
+        statuses = await facade.ModelStatus(entities=entities)
+        self.logger.debug(
+            "%s models status: %s", controller.controller_uuid, Summary(statuses.models)
+        )
+        return {
+            name: _get_summary(status)
+            for name, status in zip(model_uuids.keys(), statuses.models)
+        }
+
+
+def _get_summary(status: client.ModelStatus) -> Dict[str, Any]:
+    """Get summary from model status."""
+    if status.error is not None:
+        return {"error": status.error.message}
+
+    machines = status.machines or []
+    return {
+        "type": status.type_,
+        "life": status.life,
+        "application_count": status.application_count,
+        "unit_count": status.unit_count,
+        "machine_count": status.hosted_machine_count,
+        "machine_status": dict(Counter(machine.status for machine in machines)),
+    }
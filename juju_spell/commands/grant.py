@@ -13,10 +13,15 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
-from juju.controller import Controller
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
 from juju_spell.commands.base import BaseJujuCommand
 
+if TYPE_CHECKING:
+    from juju.controller import Controller
+
 __all__ = ["GrantCommand", "ACL_CHOICES"]
 
 ACL_CHOICES = ["login", "add-model", "superuser"]
@@ -1,9 +1,16 @@
-from juju.controller import Controller
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
 from juju_spell.commands.base import BaseJujuCommand
 
+if TYPE_CHECKING:
+    from juju.controller import Controller
+
 
 class PingCommand(BaseJujuCommand):
+    read_only = True
+
     async def execute(self, controller: Controller, **kwargs) -> str:
         """Check if controller is connected."""
         connected = controller.is_connected()
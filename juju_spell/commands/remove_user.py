@@ -14,12 +14,15 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """JujuSpell juju remove user command."""
-from typing import Optional
+from __future__ import annotations
 
-from juju.controller import Controller
+from typing import TYPE_CHECKING, Optional
 
 from juju_spell.commands.base import BaseJujuCommand
 
+if TYPE_CHECKING:
+    from juju.controller import Controller
+
 __all__ = ["RemoveUserCommand"]
 
 
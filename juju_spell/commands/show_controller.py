@@ -1,12 +1,20 @@
-from juju.client._definitions import ControllerAPIInfoResults
-from juju.controller import Controller
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
 from juju_spell.commands.base import BaseJujuCommand
+from juju_spell.utils import Summary
+
+if TYPE_CHECKING:
+    from juju.client._definitions import ControllerAPIInfoResults
+    from juju.controller import Controller
 
 
 class ShowControllerCommand(BaseJujuCommand):
     """Command to show a controller."""
 
+    read_only = True
+
     async def execute(
         self, controller: Controller, **kwargs
     ) -> ControllerAPIInfoResults:
@@ -15,5 +23,5 @@ class ShowControllerCommand(BaseJujuCommand):
         Changed name because this has to override base_command.
         """
         info = await controller.info()
-        self.logger.debug("%s info: %s", controller.controller_uuid, info)
+        self.logger.debug("%s info: %s", controller.controller_uuid, Summary(info))
         return info
@@ -1,28 +1,75 @@
-from typing import Dict, List, Optional
+from __future__ import annotations
 
-from juju.client._definitions import FullStatus
-from juju.controller import Controller
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from juju_spell.commands.base import BaseJujuCommand
+from juju_spell.utils import Summary, lazy_import
+
+if TYPE_CHECKING:
+    from juju.controller import Controller
+    from juju.model import Model
+
+client = lazy_import("juju.client.client")
 
 
 class StatusCommand(BaseJujuCommand):
     """Command to show status for models."""
 
+    read_only = True
+
+    @staticmethod
+    async def get_storage(model: Model) -> List[Any]:
+        """Get storage details for model."""
+        facade = client.StorageFacade.from_connection(model.connection())
+        storage = await facade.ListStorageDetails(filters=[client.StorageFilter()])
+        return [
+            details for result in storage.results for details in result.result or []
+        ]
+
     async def execute(
-        self, controller: Controller, models: Optional[List[str]] = None, **kwargs
-    ) -> Dict[str, FullStatus]:
-        """Get status for selected models in controller."""
+        self,
+        controller: Controller,
+        models: Optional[List[str]] = None,
+        model_parallel: Optional[int] = None,
+        patterns: Optional[List[str]] = None,
+        relations: bool = False,
+        storage: bool = False,
+        **kwargs,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get status for selected models in controller.
+
+        Only applications, units and machines matching the patterns are requested
+        from the controller. The relations and storage sections are part of the
+        output only if they were requested. The models are processed one by one,
+        unless `model_parallel` is set, and the output is in order of models.
+        """
+
+        async def _get_status(name: str, model: Model) -> Dict[str, Any]:
+            status = await model.get_status(filters=patterns)
+            self.logger.debug(
+                "%s model %s status: %s",
+                controller.controller_uuid,
+                name,
+                Summary(status),
+            )
+            output = vars(status).copy()
+            if not relations:
+                output.pop("relations", None)
+
+            if storage:
+                output["storage"] = await self.get_storage(model)
+
+            return output
+
         output = {}
-        async for name, model in self.get_filtered_models(
+        async for name, status in self.iter_models_concurrently(
             controller=controller,
+            func=_get_status,
             models=models,
             model_mappings=kwargs["controller_config"].model_mapping,
+            limit=model_parallel or 1,
+            ordered=True,
         ):
-            status = await model.get_status()
-            self.logger.debug(
-                "%s model %s status: %s", controller.controller_uuid, name, status
-            )
             output[name] = status
 
         return output
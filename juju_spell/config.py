@@ -1,21 +1,38 @@
 """Configuration loader."""
+import contextlib
 import dataclasses
+import hashlib
 import logging
+import os
+import pickle
 import re
+import tempfile
 import uuid
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import confuse
 import yaml
-from confuse import ConfigError, RootView
+from confuse import ConfigError
 
 from juju_spell.exceptions import JujuSpellError
-from juju_spell.settings import DEFAULT_PORT_RANGE
+from juju_spell.settings import (
+    APP_VERSION,
+    CONFIG_CACHE_DIR,
+    CONFIG_CACHE_FORMAT,
+    CONFIG_SHARDS_CACHE_DIR,
+    DEFAULT_CONFIG_CACHE_FILES,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PORT_RANGE,
+)
 from juju_spell.utils import merge_list_of_dict_by_key
+from juju_spell.validator import compile_template
 
 logger = logging.getLogger(__name__)
 
+# use libyaml C loader if available, since it's much faster
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 ENDPOINT_REGEX = (
     r"^(?:http)s?://"  # http:// or https://
     # host
@@ -67,7 +84,7 @@ class String(confuse.Template):
 
     def convert(self, value: Any, view: confuse.ConfigView) -> str:
         """Check that the value is valid url."""
-        if isinstance(value, str) and re.match(self._regex, value) is not None:
+        if isinstance(value, str) and self._regex.match(value) is not None:
             return value
 
         self.fail(self._message, view, True)
@@ -83,22 +100,42 @@ class PortRange(String):
         return range(int(start_port), int(end_port))
 
 
+class PositiveInteger(confuse.Integer):
+    """A template used to validate integer greater than 0."""
+
+    def convert(self, value: Any, view: confuse.ConfigView) -> int:
+        """Check that the value is integer greater than 0."""
+        value = super().convert(value, view)
+        if value < 1:
+            self.fail("must be greater than 0", view)
+
+        return value
+
+
 class ControllerDict(confuse.MappingTemplate):
     """Controller template."""
 
+    def build(self, output: Dict[str, Any]) -> "Controller":
+        """Build Controller object from validated dict."""
+        return Controller(**output)
+
     def value(self, view, template=None):
         """Get Controller object from dict."""
         output = super().value(view, template)
-        return Controller(**output)
+        return self.build(output)
 
 
 class ConnectionDict(confuse.MappingTemplate):
     """Connection template."""
 
+    def build(self, output: Dict[str, Any]) -> "Connection":
+        """Build Connection object from validated dict."""
+        return Connection(**output)
+
     def value(self, view, template=None):
         """Get Connection object from dict."""
         output = super().value(view, template)
-        return Connection(**output)
+        return self.build(output)
 
 
 DEFAULT_KEY = "default"
@@ -152,6 +189,9 @@ JUJUSPELL_CONECTION_TEMPLATE = confuse.MappingTemplate(
                 default=DEFAULT_PORT_RANGE,
             )
         ),
+        "max-concurrency": confuse.Optional(
+            PositiveInteger(), default=DEFAULT_MAX_CONCURRENCY
+        ),
     }
 )
 
@@ -270,17 +310,25 @@ class Controller:
 class Config:
     controllers: List[Controller]
     connection: Optional[Dict[str, Any]] = None
+    # controllers were not validated yet, see `load_config` and `validate_config`
+    lazy: bool = dataclasses.field(default=False, repr=False, compare=False)
+    # index of controllers used by filter, see `juju_spell.filter.get_index`
+    _index: Optional[Any] = dataclasses.field(
+        default=None, init=False, repr=False, compare=False
+    )
 
 
 def validate_source_match_template(
     source: Dict[str, Any],
     template: confuse.MappingTemplate,
 ) -> Config:
-    """Return valid config if source match template, else raise ConfigError."""
+    """Return valid config if source match template, else raise ConfigError.
+
+    The template is compiled once, see `juju_spell.validator.compile_template`.
+    """
     try:
-        _config = RootView([source])
-        valid_config = _config.get(template)
-        return valid_config
+        # NOTE: the source is converted to dict in same way as in `confuse.RootView`
+        return compile_template(template)(dict(source))
     except ConfigError as error:
         logger.error("configuration file validation failed with error: %s", error)
         raise JujuSpellError("configuration file validation failed") from error
@@ -295,6 +343,81 @@ def _validate_config(source: Dict[str, Any]) -> Config:
     return Config(**valid_config)
 
 
+def _preparse_dataclass(cls: Any, source: Any, path: str) -> Any:
+    """Create dataclass object from dictionary with only structural checks."""
+    fields = dataclasses.fields(cls)
+    if not isinstance(source, dict):
+        logger.error("configuration file validation failed with error: %s", path)
+        raise JujuSpellError("configuration file validation failed")
+
+    missing = [
+        field.name
+        for field in fields
+        if field.default is dataclasses.MISSING and field.name not in source
+    ]
+    if missing:
+        logger.error(
+            "configuration file validation failed with error: %s.%s not found",
+            path,
+            missing[0],
+        )
+        raise JujuSpellError("configuration file validation failed")
+
+    return cls(
+        **{field.name: source[field.name] for field in fields if field.name in source}
+    )
+
+
+def _preparse_config(source: Dict[str, Any]) -> Config:
+    """Create config without validation of controllers.
+
+    Only the structure of controllers is checked, so they could be filtered, and
+    they need to be validated with `validate_config` before they are used.
+    """
+    valid_config = validate_source_match_template(
+        source, confuse.MappingTemplate({"connection": JUJUSPELL_CONECTION_TEMPLATE})
+    )
+    raw_controllers = source.get("controllers")
+    if not isinstance(raw_controllers, list):
+        logger.error("configuration file validation failed with error: controllers")
+        raise JujuSpellError("configuration file validation failed")
+
+    controllers = []
+    for index, raw_controller in enumerate(raw_controllers):
+        controller = _preparse_dataclass(
+            Controller, raw_controller, f"controllers#{index}"
+        )
+        if controller.connection is not None:
+            controller.connection = _preparse_dataclass(
+                Connection, controller.connection, f"controllers#{index}.connection"
+            )
+
+        controllers.append(controller)
+
+    return Config(controllers, valid_config["connection"], lazy=True)
+
+
+def validate_config(config: Config) -> Config:
+    """Validate controllers of config loaded with `lazy=True`."""
+    if not config.lazy:
+        return config
+
+    controllers = []
+    for controller in config.controllers:
+        try:
+            controllers.append(
+                validate_source_match_template(
+                    dataclasses.asdict(controller), JUJUSPELL_CONTROLLER_TEMPLATE
+                )
+            )
+        except JujuSpellError as error:
+            raise JujuSpellError(
+                f"configuration of controller {controller.name} is invalid"
+            ) from error
+
+    return dataclasses.replace(config, controllers=controllers, lazy=False)
+
+
 def _apply_default_dict(source: Dict[Any, Any], default: Dict[Any, Any]):
     new_dict = source.copy()
     for k in default:
@@ -318,7 +441,7 @@ def _apply_default_list(source: List[Any], default):
     return new_list
 
 
-def _apply_default(source: Dict[str, Any]) -> Dict[str, Any]:
+def _apply_default(source: Dict[str, Any], validate: bool = True) -> Dict[str, Any]:
     """Apply default value to every elements in list.
 
     If the config look like this:
@@ -333,9 +456,11 @@ def _apply_default(source: Dict[str, Any]) -> Dict[str, Any]:
         ...
     ```
     The values in default.controller will be apply to every elements in controllers
-    if the value is not exists.
+    if the value is not exists. The validation could be skipped, if the controllers
+    are validated later.
     """
-    validate_source_match_template(source, JUJUSPELL_DEFAULT_CONFIG_TEMPLATE)
+    if validate:
+        validate_source_match_template(source, JUJUSPELL_DEFAULT_CONFIG_TEMPLATE)
 
     default = source.pop(DEFAULT_KEY, None)
     if default is None:
@@ -360,7 +485,7 @@ def merge_configs(config: Dict, personal_config: Dict):
     # Get set of all keys in default
     default_keys = set().union(*[config_defualt, personal_defualt])
     for key in default_keys:
-        config[DEFAULT_KEY][key] = {
+        config.setdefault(DEFAULT_KEY, {})[key] = {
             **config_defualt.get(key, {}),
             **personal_defualt.get(key, {}),
         }
@@ -383,7 +508,7 @@ def load_config_file(path):
     """
     try:
         with open(path, "r") as file:
-            source = yaml.safe_load(file)
+            source = yaml.load(file, Loader=SafeLoader)
             logger.info("load config file from %s path", path)
             return source
     except FileNotFoundError as error:
@@ -397,18 +522,209 @@ def load_config_file(path):
         raise JujuSpellError("configuration file validation failed") from error
 
 
+def _get_config_shards(config_dir_path: Optional[Path]) -> List[Path]:
+    """Get sorted list of config files in config directory."""
+    if config_dir_path is None or not Path(config_dir_path).is_dir():
+        return []
+
+    return sorted(Path(config_dir_path).glob("*.yaml"))
+
+
+def _write_cache(path: Path, data: bytes) -> None:
+    """Write cache file readable only by the owner."""
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # NOTE: the temporary file is created with 0600 mode, because the config
+    # contains passwords
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as file:
+        file.write(data)
+
+    os.replace(file.name, path)
+
+
+def _load_config_shard(path: Path) -> Dict[str, Any]:
+    """Load single file from config directory.
+
+    The parsed file is cached and used until its modification time or size is
+    changed.
+    """
+    stat = path.stat()
+    name = hashlib.sha256(str(path.resolve()).encode()).hexdigest()
+    cache_path = CONFIG_SHARDS_CACHE_DIR / f"{name}.pickle"
+    try:
+        with open(cache_path, "rb") as file:
+            mtime, size, source = pickle.load(file)
+
+        if (mtime, size) == (stat.st_mtime_ns, stat.st_size):
+            return source
+    except FileNotFoundError:
+        pass
+    except Exception as error:
+        logger.warning("cached config file %s could not be loaded: %s", path, error)
+
+    source = load_config_file(path) or {}
+    try:
+        _write_cache(cache_path, pickle.dumps((stat.st_mtime_ns, stat.st_size, source)))
+    except OSError as error:
+        logger.warning("config file %s could not be cached: %s", path, error)
+
+    return source
+
+
+def _merge_config_shards(
+    source: Dict[str, Any], shards: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Merge controllers from config directory to global config.
+
+    The default values from each file are applied only to controllers from the
+    same file, before the global default values.
+    """
+    controllers = [source.get("controllers") or []]
+    for shard in shards:
+        shard_controllers = shard.get("controllers") or []
+        shard_default = (shard.get(DEFAULT_KEY) or {}).get("controller")
+        if shard_default:
+            shard_controllers = _apply_default_list(shard_controllers, shard_default)
+
+        controllers.append(shard_controllers)
+
+    source["controllers"] = merge_list_of_dict_by_key(key="uuid", lists=controllers)
+    return source
+
+
+def _get_config_cache_key(
+    config_path: Path,
+    personal_config_path: Optional[Path] = None,
+    lazy: bool = False,
+    shards: Optional[List[Path]] = None,
+) -> Optional[str]:
+    """Get hash of JujuSpell version, content of config files and lazy flag.
+
+    The files from config directory are identified only by modification time and
+    size, so they do not need to be read. The format of cache and modification time
+    of this module are part of the key, so the config cached by different code is
+    never unpickled.
+    """
+    source_mtime = Path(__file__).stat().st_mtime_ns
+    digest = hashlib.sha256(
+        f"{APP_VERSION}:{CONFIG_CACHE_FORMAT}:{source_mtime}:{lazy}".encode()
+    )
+    for path in (config_path, personal_config_path):
+        digest.update(b"\0")  # separate content of files
+        if path is None or not Path(path).exists():
+            continue
+
+        try:
+            digest.update(Path(path).read_bytes())
+        except OSError:
+            return None  # error is raised when the config file is loaded
+
+    for path in shards or []:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        digest.update(f"\0{path}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+
+    return digest.hexdigest()
+
+
+def _get_cached_config_path(key: str) -> Path:
+    """Get path to cached config, each key has its own file."""
+    return CONFIG_CACHE_DIR / f"{key}.pickle"
+
+
+def _load_cached_config(key: str) -> Optional[Config]:
+    """Load validated config from cache if it was created from same files."""
+    path = _get_cached_config_path(key)
+    try:
+        with open(path, "rb") as file:
+            config = pickle.load(file)
+    except FileNotFoundError:
+        logger.debug("config is not cached")
+        return None
+    except Exception as error:
+        logger.warning("cached config could not be loaded: %s", error)
+        return None
+
+    with contextlib.suppress(OSError):
+        os.utime(path)  # mark as recently used, so it's not removed
+
+    logger.info("load config from cache %s", path)
+    return config
+
+
+def _remove_outdated_configs() -> None:
+    """Remove cached configs, except the most recently used ones."""
+    paths = []
+    for path in CONFIG_CACHE_DIR.glob("*.pickle"):
+        with contextlib.suppress(OSError):
+            paths.append((path.stat().st_mtime_ns, path))
+
+    paths.sort(reverse=True)
+    for _, path in paths[DEFAULT_CONFIG_CACHE_FILES:]:
+        logger.debug("removing outdated cached config %s", path)
+        path.unlink(missing_ok=True)
+
+
+def _store_cached_config(key: str, config: Config) -> None:
+    """Store validated config to cache readable only by the owner."""
+    try:
+        data = pickle.dumps(config)
+    except Exception as error:
+        logger.warning("config could not be cached: %s", error)
+        return
+
+    try:
+        _write_cache(_get_cached_config_path(key), data)
+        _remove_outdated_configs()
+    except OSError as error:
+        logger.warning("config could not be cached: %s", error)
+
+
 def load_config(
-    config_path: Path, personal_config_path: Optional[Path] = None
+    config_path: Path,
+    personal_config_path: Optional[Path] = None,
+    lazy: bool = False,
+    config_dir_path: Optional[Path] = None,
 ) -> Config:
-    """Load ad validate yaml config file."""
-    source = load_config_file(config_path)
+    """Load ad validate yaml config file.
+
+    The controllers from `*.yaml` files in config directory are merged to the
+    global config, which could be omitted in such case. Each of these files is
+    cached separately, so only changed files are parsed again.
+
+    With `lazy=True` only the structure of controllers is checked and they need to
+    be validated with `validate_config`, e.g. after filtering.
+
+    The validated config is cached and used until any of config files is changed.
+    """
+    shards = _get_config_shards(config_dir_path)
+    key = _get_config_cache_key(config_path, personal_config_path, lazy, shards)
+    if key is not None:
+        config = _load_cached_config(key)
+        if config is not None:
+            return config
+
+    if shards and not Path(config_path).exists():
+        source: Dict[str, Any] = {}
+    else:
+        source = load_config_file(config_path)
+
+    if shards:
+        shard_sources = [_load_config_shard(path) for path in shards]
+        source = _merge_config_shards(source, shard_sources)
+
     if personal_config_path and personal_config_path.exists():
         personal_source = load_config_file(personal_config_path)
         # Merge personal and default config
         source = merge_configs(source, personal_source)
 
-    source = _apply_default(source)
-    config = _validate_config(source)
+    source = _apply_default(source, validate=not lazy)
+    config = _preparse_config(source) if lazy else _validate_config(source)
+    if key is not None:
+        _store_cached_config(key, config)
+
     return config
 
 
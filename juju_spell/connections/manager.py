@@ -1,23 +1,40 @@
+from __future__ import annotations
+
 import asyncio
 import dataclasses
+import functools
 import logging
 import time
-from typing import Dict, Union
+from typing import Dict, List, Optional, Tuple, Union
 from uuid import UUID
 
-from juju import juju
 from juju.errors import JujuConnectionError
 
 from juju_spell.config import Controller
-from juju_spell.connections.network import BaseConnection, get_connection
+from juju_spell.connections.network import (
+    BaseConnection,
+    get_connection,
+    get_connections,
+)
+from juju_spell.exceptions import PortCollisionError
 from juju_spell.settings import (
     DEFAULT_CONNECTIN_TIMEOUT,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PORT_COLLISION_RETRIES,
     DEFAULT_PORT_RANGE,
     DEFAULT_RETRY_BACKOFF,
     DEFUALT_MAX_FRAME_SIZE,
 )
+from juju_spell.timings import (
+    PHASE_DISCONNECT,
+    PHASE_LOGIN,
+    PHASE_TUNNEL,
+    phase_timings,
+)
+from juju_spell.utils import lazy_import
 
 logger = logging.getLogger(__name__)
+juju = lazy_import("juju.juju")
 
 
 @dataclasses.dataclass
@@ -26,6 +43,37 @@ class Connection:
     connection_process: BaseConnection
 
 
+def _get_key(controller_config: Controller) -> str:
+    """Get key of connection to controller.
+
+    The name of controller is not unique, e.g. the daemon could get configs with same
+    name for different controllers, so the connections are identified by UUID,
+    endpoint and user.
+    """
+    return (
+        f"{controller_config.uuid}/{controller_config.user}@"
+        f"{controller_config.endpoint}"
+    )
+
+
+def _clean_when_done(future: asyncio.Future, name: Optional[str] = None) -> None:
+    """Clean connection prepared in executor, which will not be used.
+
+    The executor could not be cancelled, so the connection, including its leased
+    port, is cleaned as soon as it is prepared. The `name` selects connection from
+    result of `get_connections`.
+    """
+
+    def _clean(done: asyncio.Future) -> None:
+        if done.cancelled() or done.exception() is not None:
+            return
+
+        connection = done.result() if name is None else done.result()[name]
+        connection[1].clean()
+
+    future.add_done_callback(_clean)
+
+
 def _get_wait_time(attempt: int, retry_backoff: Union[int, float]) -> float:
     """Calculate wait time for reconnection."""
     return retry_backoff ** (attempt - 2)  # exponential wait y^(x-2)
@@ -39,11 +87,13 @@ async def controller_direct_connection(
     username: str,
     password: str,
     cacert: str,
+    connection_process: Optional[BaseConnection] = None,
 ):
     """Direct connection to controller without JUJU_DATA.
 
     This is a helper function for connecting to a controller with simple exponential
-    retry and with fix for missing controller_name and controller_uuid.
+    retry and with fix for missing controller_name and controller_uuid. The retries
+    end immediately if the `connection_process`, e.g. the ssh tunnel, failed.
     """
     start = time.time()
     attempt: int = 0
@@ -65,8 +115,14 @@ async def controller_direct_connection(
             # is unreachable. This can happen, for example, when port forwarding is
             # through a subprocess and the process has not yet started.
             logger.info("%s connection to controller %s failed", uuid, name)
+            if connection_process is not None:
+                connection_process.check()
+
             wait = _get_wait_time(attempt, DEFAULT_RETRY_BACKOFF)
             await asyncio.sleep(wait)
+            if connection_process is not None:
+                connection_process.check()
+
             if time.time() - start >= DEFAULT_CONNECTIN_TIMEOUT:
                 raise
 
@@ -112,10 +168,25 @@ class ConnectManager(object):
             controller = await connect_manager.get_controller(controller_config)
             ...
         ```
+
+        example 3
+
+        ```python
+        from juju_spell.connection import connect_manager
+
+        async def task(...):
+            # connect to all controllers concurrently in the background
+            connect_manager.warm_up(controllers)
+            for controller_config in controllers:
+                # wait only for connection to this controller
+                controller = await connect_manager.get_controller(controller_config)
+                ...
+        ```
     """
 
     _manager = None
     _connections = {}
+    _pending = {}
 
     def __new__(cls):
         if getattr(cls, "_manager") is None:
@@ -125,40 +196,189 @@ class ConnectManager(object):
 
     @property
     def connections(self) -> Dict[str, Connection]:
-        """Return list of connections ."""
+        """Return connections by key created by `_get_key`."""
         return self._connections
 
     async def _connect(
-        self, controller_config: Controller, port_range: range, sshuttle: bool = False
+        self,
+        controller_config: Controller,
+        port_range: range,
+        sshuttle: bool = False,
+        connection: Optional[Tuple[str, BaseConnection]] = None,
     ) -> juju.Controller:
-        """Prepare connection to Controller and return it."""
+        """Prepare connection to Controller and return it.
+
+        The `connection` is endpoint with connection process prepared in advance, if
+        it is not provided or it's not usable, e.g. shared connection failed, a new
+        one is created. If local port of the connection is already used by another
+        process, the new connection with another port is created.
+        """
         logger.info("getting a new connection to controller %s", controller_config.name)
+        loop = asyncio.get_running_loop()
         controller = juju.Controller(max_frame_size=DEFUALT_MAX_FRAME_SIZE)
-        controller_endpoint, connection_process = get_connection(
-            controller_config, port_range, sshuttle
-        )
-        connection_process.connect()
-        self.connections[controller_config.name] = Connection(
-            controller, connection_process
-        )
-        await controller_direct_connection(
-            controller,
-            uuid=controller_config.uuid,
-            name=controller_config.name,
-            endpoint=controller_endpoint,
-            username=controller_config.user,
-            password=controller_config.password,
-            cacert=controller_config.ca_cert,
-        )
+        with phase_timings.span(controller_config.name, PHASE_TUNNEL):
+            for attempt in range(DEFAULT_PORT_COLLISION_RETRIES + 1):
+                if connection is not None and not connection[1].is_usable:
+                    logger.info(
+                        "%s prepared connection is not usable, creating a new one",
+                        controller_config.uuid,
+                    )
+                    connection[1].clean()
+                    connection = None
+
+                if connection is None:
+                    # NOTE: leasing a port could block, so it's not done in event loop
+                    future = loop.run_in_executor(
+                        None, get_connection, controller_config, port_range, sshuttle
+                    )
+                    try:
+                        connection = await asyncio.shield(future)
+                    except asyncio.CancelledError:
+                        _clean_when_done(future)
+                        raise
+
+                controller_endpoint, connection_process = connection
+                connection_process.connect()
+                self.connections[_get_key(controller_config)] = Connection(
+                    controller, connection_process
+                )
+                try:
+                    await connection_process.wait_ready()
+                    break
+                except PortCollisionError:
+                    connection_process.clean()
+                    if attempt == DEFAULT_PORT_COLLISION_RETRIES:
+                        raise
+
+                    logger.info(
+                        "%s port collision, connecting with another port",
+                        controller_config.uuid,
+                    )
+                    connection = None
+
+        with phase_timings.span(controller_config.name, PHASE_LOGIN):
+            await controller_direct_connection(
+                controller,
+                uuid=controller_config.uuid,
+                name=controller_config.name,
+                endpoint=controller_endpoint,
+                username=controller_config.user,
+                password=controller_config.password,
+                cacert=controller_config.ca_cert,
+                connection_process=connection_process,
+            )
         logger.info("controller %s was connected", controller.controller_name)
         return controller
 
+    @property
+    def pending(self) -> Dict[str, asyncio.Task]:
+        """Return connections, which are still in progress."""
+        return self._pending
+
+    def _is_connected_or_pending(self, key: str) -> bool:
+        """Check if controller is already connected or connecting.
+
+        The failed connection, which was not consumed by `get_controller`, is not
+        considered as pending, so it's replaced by a new one.
+        """
+        connection = self.connections.get(key)
+        if connection and connection.controller.is_connected():
+            return True
+
+        pending = self.pending.get(key)
+        return pending is not None and not pending.done()
+
+    def _on_pending_done(self, key: str, task: asyncio.Task) -> None:
+        """Remove successful or cancelled connection from pending.
+
+        The failed connection is kept, so `get_controller` raises its error instead
+        of connecting again.
+        """
+        if task.cancelled() or task.exception() is None:
+            if self.pending.get(key) is task:
+                del self.pending[key]
+
+    async def _close(self, key: str) -> None:
+        """Disconnect controller and clean its connection process."""
+        connection = self.connections.pop(key, None)
+        if connection is None:
+            return
+
+        await connection.controller.disconnect()
+        connection.connection_process.clean()
+
+    def warm_up(
+        self,
+        controllers: List[Controller],
+        port_range: range = DEFAULT_PORT_RANGE,
+        limit: int = DEFAULT_MAX_CONCURRENCY,
+        sshuttle: bool = False,
+    ) -> asyncio.Future:
+        """Connect to multiple controllers concurrently.
+
+        The connections, including the tunnels, are started concurrently with at
+        most `limit` of them in progress at the same time, so the latency of SSH
+        handshakes and logins overlaps instead of adding up. Controllers behind the
+        same destination share a single tunnel. The connections are
+        scheduled immediately and `get_controller` waits for the one in progress
+        instead of starting a new one, so the returned future does not need to be
+        awaited. Errors are not raised here, but by `get_controller`.
+        """
+        semaphore = asyncio.Semaphore(limit)
+        controllers = [
+            controller_config
+            for controller_config in controllers
+            if not self._is_connected_or_pending(_get_key(controller_config))
+        ]
+        # NOTE: leasing ports could block, so it's not done in event loop
+        connections = asyncio.get_running_loop().run_in_executor(
+            None, get_connections, controllers, port_range, sshuttle
+        )
+
+        async def _connect(controller_config: Controller) -> juju.Controller:
+            try:
+                # NOTE: connections are shared by all controllers, so it's shielded
+                connection = (await asyncio.shield(connections))[controller_config.name]
+            except asyncio.CancelledError:
+                _clean_when_done(connections, controller_config.name)
+                raise
+
+            try:
+                async with semaphore:
+                    # NOTE: connection could be dropped, e.g. if it's kept by daemon
+                    await self._close(_get_key(controller_config))
+                    return await self._connect(
+                        controller_config, port_range, sshuttle, connection
+                    )
+            except asyncio.CancelledError:
+                # NOTE: the lease of connection, which was not used, is released
+                connection[1].clean()
+                raise
+
+        tasks = []
+        for controller_config in controllers:
+            key = _get_key(controller_config)
+            task = asyncio.ensure_future(_connect(controller_config))
+            task.add_done_callback(functools.partial(self._on_pending_done, key))
+            self.pending[key] = task
+            tasks.append(task)
+
+        logger.info("warming up connections to %d controllers", len(tasks))
+        return asyncio.gather(*tasks, return_exceptions=True)
+
     async def clean(self):
         """Close all connections."""
-        for name in self.connections.keys():
-            connection = self.connections[name]
-            await connection.controller.disconnect()  # disconnect controller
-            connection.connection_process.clean()  # clean connection process
+        pending = list(self.pending.values())
+        for task in pending:
+            task.cancel()  # cancel connections in progress
+
+        await asyncio.gather(*pending, return_exceptions=True)
+        self.pending.clear()
+        for key, connection in self.connections.items():
+            with phase_timings.span(key, PHASE_DISCONNECT):
+                await connection.controller.disconnect()  # disconnect controller
+                connection.connection_process.clean()  # clean connection process
+
             logger.info(
                 "%s connection was closed", connection.controller.controller_uuid
             )
@@ -177,13 +397,24 @@ class ConnectManager(object):
             controller_config, Controller
         ), "Not supported format of controller config"
 
-        connection = self.connections.get(controller_config.name)
+        key = _get_key(controller_config)
+        pending = self.pending.get(key)
+        if pending is not None and not reconnect:
+            logger.info("%s waiting for connection in progress", controller_config.uuid)
+            try:
+                # NOTE: the connection is shielded, since it could be shared by others
+                return await asyncio.shield(pending)
+            finally:
+                if pending.done() and self.pending.get(key) is pending:
+                    del self.pending[key]  # failure was consumed
+
+        connection = self.connections.get(key)
         if connection and connection.controller.is_connected() and not reconnect:
             logger.info(
                 "%s using controller from cache", connection.controller.controller_uuid
             )
             return connection.controller
-        elif connection and reconnect:
-            await connection.controller.disconnect()
 
+        # NOTE: previous connection needs to be cleaned, so its tunnel does not leak
+        await self._close(key)
         return await self._connect(controller_config, port_range, sshuttle)
@@ -1,12 +1,25 @@
 import abc
+import asyncio
+import fcntl
 import logging
+import os
 import random
 import socket
 import subprocess
-from typing import List, Optional, Tuple
+import tempfile
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Set, Tuple
 
 from juju_spell.config import Controller
-from juju_spell.settings import DEFAULT_PORT_RANGE
+from juju_spell.exceptions import PortCollisionError, TunnelError
+from juju_spell.settings import (
+    DEFAULT_CONNECTIN_TIMEOUT,
+    DEFAULT_PORT_COLLISION_RETRIES,
+    DEFAULT_PORT_RANGE,
+    DEFAULT_TUNNEL_POLL_INTERVAL,
+    DEFAULT_TUNNEL_TERMINATE_TIMEOUT,
+    PORT_LEASE_DIR,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,21 +32,89 @@ def _is_port_free(port: int) -> bool:
     return result != 0
 
 
-def get_free_tcp_port(port_range: range) -> int:
-    """Get free TCP port from range.
+class PortLease:
+    """Local TCP port leased by this process.
 
-    This function will return free port on local system. This port will be used to
-    port-forward remote controller to localhost:<port>.
+    The port is leased by holding an exclusive lock on `<PORT_LEASE_DIR>/<port>.lock`,
+    so no other JujuSpell process (or other controller in the same run) could lease
+    it until it's released. The lock is released by the system if the process exits.
+    The lock file is removed when the lease is released, so the files of ephemeral
+    ports do not pile up.
+    """
+
+    def __init__(self, port: int, lock_file: IO):
+        """Initialize the lease.
+
+        :param port: leased port
+        :param lock_file: locked file representing the lease
+        """
+        self.port = port
+        self._lock_file = lock_file
+
+    def release(self) -> None:
+        """Release the port and remove its lock file."""
+        if not self._lock_file.closed:
+            # NOTE: the file is removed before unlocking, so nobody could lock it
+            # after it was removed, see `_try_lease_port`
+            Path(self._lock_file.name).unlink(missing_ok=True)
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            logger.debug("port %d was released", self.port)
+
+
+def _try_lease_port(port: int) -> Optional[PortLease]:
+    """Try to lease port, return None if it's leased or used by another process."""
+    PORT_LEASE_DIR.mkdir(parents=True, exist_ok=True)
+    path = PORT_LEASE_DIR / f"{port}.lock"
+    lock_file = open(path, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        # the file could be removed by released lease, before it was locked here
+        if os.fstat(lock_file.fileno()).st_ino != os.stat(path).st_ino:
+            raise FileNotFoundError(path)
+    except OSError:
+        lock_file.close()
+        return None  # port is leased by another process or controller
+
+    lease = PortLease(port, lock_file)
+    if not _is_port_free(port):
+        lease.release()
+        return None
+
+    return lease
+
+
+def _get_ephemeral_port() -> int:
+    """Get port from ephemeral range assigned by system."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as tcp:
+        tcp.bind(("localhost", 0))
+        return tcp.getsockname()[1]
+
+
+def lease_tcp_port(port_range: range) -> PortLease:
+    """Lease free TCP port.
+
+    Ports from range are tried in random order. If all of them are leased or used,
+    a port from ephemeral range is leased, so number of tunnels is not limited by
+    size of the range.
     """
     list_of_ports = list(port_range)
     random.shuffle(list_of_ports)  # randomly shuffle list of ports
 
     for port in list_of_ports:
-        if _is_port_free(port):
-            logger.debug("free port %d was found", port)
-            return port
+        lease = _try_lease_port(port)
+        if lease is not None:
+            logger.debug("port %d was leased", port)
+            return lease
+
+    logger.info("no free port in range %s, using ephemeral port", port_range)
+    for _ in range(DEFAULT_PORT_COLLISION_RETRIES):
+        lease = _try_lease_port(_get_ephemeral_port())
+        if lease is not None:
+            logger.debug("ephemeral port %d was leased", lease.port)
+            return lease
 
-    raise ValueError(f"Could not find a free port in range {port_range}")
+    raise ValueError(f"Could not lease a free port in range {port_range}")
 
 
 class BaseConnection(metaclass=abc.ABCMeta):
@@ -56,6 +137,17 @@ class BaseConnection(metaclass=abc.ABCMeta):
         """Clean/terminate/close connection."""
         ...
 
+    @property
+    def is_usable(self) -> bool:
+        """Return False if connection could not be connected anymore."""
+        return True
+
+    def check(self) -> None:
+        """Raise TunnelError if connection failed, e.g. the tunnel exited."""
+
+    async def wait_ready(self, timeout: float = DEFAULT_CONNECTIN_TIMEOUT) -> None:
+        """Wait until connection is ready to use."""
+
 
 class EmptyConnection(BaseConnection):
     """Empty connection for controller with direct access."""
@@ -75,10 +167,99 @@ class EmptyConnection(BaseConnection):
         self._connected = False
 
 
+class SharedState:
+    """State shared by all users of the shared connection."""
+
+    def __init__(self) -> None:
+        """Initialize the state."""
+        self.users: Set["SharedConnection"] = set()  # users connected at the moment
+        self.started: List["SharedConnection"] = []  # users, which ever connected
+        self.usable = True
+
+
+class SharedConnection(BaseConnection):
+    """Connection shared by multiple controllers.
+
+    Each controller gets its own SharedConnection object, but all of them use the same
+    connection, which is created by the first user and cleaned by the last one. The
+    connection is not usable after it failed or was cleaned, so the users, which did
+    not connect yet, need to create their own connection.
+    """
+
+    def __init__(
+        self,
+        connection: BaseConnection,
+        state: SharedState,
+        lease: Optional[PortLease] = None,
+    ):
+        """Initialize the connection.
+
+        :param connection: connection shared by all users
+        :param state: state, which is shared by all users of the connection
+        :param lease: lease of local port used by this user, which is released
+                      together with the shared connection if user connected to it,
+                      otherwise by clean
+        """
+        self.connection = connection
+        self.state = state
+        self.lease = lease
+
+    @property
+    def is_connected(self) -> bool:
+        return self in self.state.users and self.connection.is_connected
+
+    @property
+    def is_usable(self) -> bool:
+        return self.state.usable
+
+    def connect(self) -> None:
+        if not self.state.usable:
+            raise TunnelError("shared connection could not be used anymore")
+
+        if not self.state.users:
+            self.connection.connect()
+
+        self.state.users.add(self)
+        if self not in self.state.started:
+            self.state.started.append(self)
+
+    def _release(self) -> None:
+        """Release leased port."""
+        if self.lease is not None:
+            self.lease.release()
+
+    def clean(self) -> None:
+        if self not in self.state.started:
+            self._release()  # the shared connection was never used by this user
+            return
+
+        self.state.users.discard(self)
+        if not self.state.users:
+            self.state.usable = False
+            self.connection.clean()
+            for user in self.state.started:
+                user._release()
+
+    def check(self) -> None:
+        try:
+            self.connection.check()
+        except TunnelError:
+            self.state.usable = False
+            raise
+
+    async def wait_ready(self, timeout: float = DEFAULT_CONNECTIN_TIMEOUT) -> None:
+        try:
+            await self.connection.wait_ready(timeout)
+        except TunnelError:
+            self.state.usable = False
+            raise
+
+
 class BaseSubprocessConnection(BaseConnection):
     def __init__(self):
         """Define empty process."""
         self.process: Optional[subprocess.Popen] = None
+        self._stderr: Optional[IO[bytes]] = None
 
     @property
     def is_connected(self) -> bool:
@@ -91,10 +272,80 @@ class BaseSubprocessConnection(BaseConnection):
     def connect(self) -> None:
         raise NotImplementedError
 
+    def _start(self, cmd: List[str]) -> None:
+        """Start connection subprocess.
+
+        The stdout is not used and stderr is written to temporary file, so the
+        subprocess, which could run as long as the daemon, is never blocked by full
+        pipe.
+        """
+        logger.debug("cmd `%s` will be executed", cmd)
+        self._stderr = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            cmd, stdout=subprocess.DEVNULL, stderr=self._stderr
+        )
+
     def clean(self) -> None:
-        """Terminate connection subprocess."""
+        """Terminate connection subprocess and wait for it to exit."""
         if self.process is not None:
             self.process.terminate()
+            try:
+                self.process.wait(DEFAULT_TUNNEL_TERMINATE_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                logger.warning("connection subprocess did not exit, killing it")
+                self.process.kill()
+                self.process.wait()
+
+        if self._stderr is not None:
+            self._stderr.close()
+
+    async def is_ready(self) -> bool:
+        """Check if the connection is ready to use.
+
+        By default, the connection is ready as soon as the subprocess is running.
+        """
+        return True
+
+    def _get_error(self) -> str:
+        """Get error from stderr of exited subprocess."""
+        if self._stderr is None or self._stderr.closed:
+            return ""
+
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors="replace").strip()
+
+    def check(self) -> None:
+        """Raise TunnelError if the subprocess was not started or exited."""
+        if self.process is None:
+            raise TunnelError("connection subprocess was not started")
+
+        returncode = self.process.poll()
+        if returncode is not None:
+            error = self._get_error()
+            message = f"connection subprocess exited with code {returncode}: {error}"
+            if "Address already in use" in error:
+                raise PortCollisionError(message)
+
+            raise TunnelError(message)
+
+    async def wait_ready(self, timeout: float = DEFAULT_CONNECTIN_TIMEOUT) -> None:
+        """Wait until connection is ready to use.
+
+        The subprocess state is polled together with `is_ready`, so the waiting ends
+        as soon as the connection is ready or immediately fails if the subprocess
+        exited.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            self.check()
+            if await self.is_ready():
+                return
+
+            if loop.time() >= deadline:
+                raise TunnelError(f"connection was not ready in {timeout} seconds")
+
+            await asyncio.sleep(DEFAULT_TUNNEL_POLL_INTERVAL)
 
 
 class SshPortForwardSubprocess(BaseSubprocessConnection):
@@ -104,6 +355,7 @@ class SshPortForwardSubprocess(BaseSubprocessConnection):
         remote_target: str,
         destination: str,
         jumps: Optional[List[str]] = None,
+        lease: Optional[PortLease] = None,
     ):
         """Configure SshPortForward subprocess.
 
@@ -121,7 +373,10 @@ class SshPortForwardSubprocess(BaseSubprocessConnection):
         ```bash
         ssh -N -L localhost:17071:10.1.1.99:17070 -J bastion gandalf@customer
         ```
-        and it will port-forward the `10.1.1.99:17070` to `localhost:17071`.
+        and it will port-forward the `10.1.1.99:17070` to `localhost:17071`. More
+        targets could be port-forwarded by the same ssh process with `add_forward`.
+        The ssh always runs with `ExitOnForwardFailure=yes`, so it exits if any
+        port-forward could not be created.
 
         :param local_target: bind_address:port to which remote target will be
                              port-forwarded
@@ -131,35 +386,72 @@ class SshPortForwardSubprocess(BaseSubprocessConnection):
                             `ssh://[user@]hostname[:port]`
         :param jumps: connect to the destination by first making a ssh connection via
                       list of jumps host described by destination
+        :param lease: lease of local port, which will be released by clean
         """
         super().__init__()
         self.local_target = local_target
         self.remote_target = remote_target
         self.destination = destination
         self.jumps = jumps
+        self.forwards: List[Tuple[str, str]] = [(local_target, remote_target)]
+        self.leases: List[PortLease] = [lease] if lease else []
+
+    def add_forward(
+        self, local_target: str, remote_target: str, lease: Optional[PortLease] = None
+    ) -> None:
+        """Add another target, which will be port-forwarded by the same ssh process.
+
+        :param local_target: bind_address:port to which remote target will be
+                             port-forwarded
+        :param remote_target: remote host and port, which will be port-forwarded
+        :param lease: lease of local port, which will be released by clean
+        """
+        self.forwards.append((local_target, remote_target))
+        if lease:
+            self.leases.append(lease)
+
+    def clean(self) -> None:
+        """Terminate ssh tunnel and release leased ports."""
+        super().clean()
+        for lease in self.leases:
+            lease.release()
 
     def connect(self) -> None:
         """Create ssh tunnel."""
-        logger.info(
-            "port forwarding %s to %s via %s",
-            self.remote_target,
-            self.local_target,
-            self.destination,
-        )
-        cmd = [
-            "ssh",
-            self.destination,
-            "-N",
-            "-L",
-            f"{self.local_target}:{self.remote_target}",
-        ]
+        cmd = ["ssh", self.destination, "-N"]
+        for local_target, remote_target in self.forwards:
+            logger.info(
+                "port forwarding %s to %s via %s",
+                remote_target,
+                local_target,
+                self.destination,
+            )
+            cmd.extend(["-L", f"{local_target}:{remote_target}"])
+
+        # exit instead of running without port-forward, e.g. if port is already used
+        cmd.extend(["-o", "ExitOnForwardFailure=yes"])
+
         if self.jumps:
             cmd.append(" ".join(f"-J {jump}" for jump in self.jumps))
 
-        logger.debug("cmd `%s` will be executed", cmd)
-        self.process = subprocess.Popen(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
+        self._start(cmd)
+
+    async def is_ready(self) -> bool:
+        """Check if all local targets accept connections.
+
+        The ssh binds the local targets after successful authentication, so any
+        accepted connection means that the port-forward is up.
+        """
+        for local_target, _ in self.forwards:
+            host, _, port = local_target.rpartition(":")
+            try:
+                _, writer = await asyncio.open_connection(host or "localhost", port)
+            except OSError:
+                return False
+
+            writer.close()
+
+        return True
 
 
 class SshuttleSubprocess(BaseSubprocessConnection):
@@ -204,10 +496,7 @@ class SshuttleSubprocess(BaseSubprocessConnection):
             jumps_option = " ".join(f"-J {jump}" for jump in self.jumps)
             cmd.append(f"-e 'ssh {jumps_option}'")
 
-        logger.debug("cmd `%s` will be executed", cmd)
-        self.process = subprocess.Popen(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
+        self._start(cmd)
 
 
 def get_connection(
@@ -220,13 +509,14 @@ def get_connection(
     process = EmptyConnection()  # controller has direct access
 
     if controller_config.connection and not sshuttle:
-        port = get_free_tcp_port(port_range)
-        controller_endpoint = f"localhost:{port}"
+        lease = lease_tcp_port(port_range)
+        controller_endpoint = f"localhost:{lease.port}"
         process = SshPortForwardSubprocess(
             controller_endpoint,
             controller_config.endpoint,
             controller_config.connection.destination,
             controller_config.connection.jumps,
+            lease,
         )
     elif controller_config.connection and sshuttle:
         process = SshuttleSubprocess(
@@ -236,3 +526,69 @@ def get_connection(
         )
 
     return controller_endpoint, process
+
+
+def get_connections(
+    controllers: List[Controller],
+    port_range: range = DEFAULT_PORT_RANGE,
+    sshuttle: bool = False,
+) -> Dict[str, Tuple[str, BaseConnection]]:
+    """Get connections for multiple controllers.
+
+    Controllers behind the same destination and jumps share a single ssh process with
+    a port-forward for each of them (or a single sshuttle process with all subnets),
+    so SSH handshake is done only once per destination.
+
+    Returns dictionary with controller name as key and endpoint with connection as
+    value.
+    """
+    connections = {}
+    shared: Dict[Tuple[str, Tuple[str, ...]], Tuple[BaseConnection, SharedState]] = {}
+    for controller_config in controllers:
+        if controller_config.connection is None:
+            connections[controller_config.name] = (
+                controller_config.endpoint,
+                EmptyConnection(),  # controller has direct access
+            )
+            continue
+
+        controller_endpoint = controller_config.endpoint
+        destination = controller_config.connection.destination
+        jumps = controller_config.connection.jumps
+        key = (destination, tuple(jumps or []))
+        lease = None
+        if not sshuttle:
+            lease = lease_tcp_port(port_range)
+            controller_endpoint = f"localhost:{lease.port}"
+
+        if key in shared:
+            process, _ = shared[key]
+            if sshuttle:
+                for subnet in controller_config.connection.subnets or []:
+                    if subnet not in process.subnets:
+                        process.subnets.append(subnet)
+            else:
+                process.add_forward(controller_endpoint, controller_config.endpoint)
+        elif sshuttle:
+            subnets = list(controller_config.connection.subnets or [])
+            shared[key] = SshuttleSubprocess(subnets, destination, jumps), SharedState()
+        else:
+            shared[key] = (
+                SshPortForwardSubprocess(
+                    controller_endpoint, controller_config.endpoint, destination, jumps
+                ),
+                SharedState(),
+            )
+
+        # NOTE: the leases are owned by users, so only the leases of users, which
+        # used the shared connection, are released together with it
+        process, state = shared[key]
+        connections[controller_config.name] = (
+            controller_endpoint,
+            SharedConnection(process, state, lease),
+        )
+
+    logger.debug(
+        "%d controllers will use %d shared connections", len(controllers), len(shared)
+    )
+    return connections
@@ -0,0 +1,220 @@
+"""JujuSpell daemon keeping connections to controllers between runs.
+
+The daemon listens on a unix socket and runs read-only commands with connections,
+which are kept alive after each run, so repeated runs do not need to create tunnels
+and log in to controllers again. The request contains only UUIDs of controllers,
+which are loaded from config of daemon, so no credentials are sent. The protocol is
+a single JSON request per connection followed by responses as single line JSON
+objects (NDJSON):
+
+    -> {"command": "<module>:<class>", "controllers": ["<uuid>", ...], "args": {...}}
+    <- {"result": {...}}
+    <- {"result": {...}}
+    <- {"error": "<message>"}  # only if the request failed
+"""
+import argparse
+import asyncio
+import dataclasses
+import importlib
+import json
+import logging
+import os
+import signal
+import socket
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Type
+
+from juju_spell.assignment.runner import iter_run
+from juju_spell.commands.base import BaseJujuCommand
+from juju_spell.config import Config, load_config, validate_config
+from juju_spell.connections import connect_manager
+from juju_spell.exceptions import JujuSpellError
+from juju_spell.serializer import dumps_json
+from juju_spell.settings import (
+    CONFIG_DIR_PATH,
+    CONFIG_PATH,
+    DAEMON_SOCKET_PATH,
+    PERSONAL_CONFIG_PATH,
+)
+from juju_spell.timings import phase_timings
+
+logger = logging.getLogger(__name__)
+
+
+def _dump(data: Dict[str, Any]) -> bytes:
+    """Convert data to single line JSON.
+
+    The data are serialized in same way as output of command run without daemon.
+    """
+    return dumps_json(data).encode() + b"\n"
+
+
+def _load_default_config() -> Config:
+    """Load config from default paths without validation of controllers."""
+    return load_config(
+        CONFIG_PATH, PERSONAL_CONFIG_PATH, lazy=True, config_dir_path=CONFIG_DIR_PATH
+    )
+
+
+def _select_controllers(config: Config, uuids: List[str]) -> Config:
+    """Select controllers from config of daemon by UUIDs sent by client."""
+    controllers = {
+        str(controller.uuid): controller for controller in config.controllers
+    }
+    unknown = [uuid for uuid in uuids if uuid not in controllers]
+    if unknown:
+        raise JujuSpellError(
+            f"controllers {', '.join(unknown)} are not in configuration of daemon"
+        )
+
+    selected = [controllers[uuid] for uuid in uuids]
+    return validate_config(dataclasses.replace(config, controllers=selected))
+
+
+def _get_command_path(command: Type[BaseJujuCommand]) -> str:
+    """Get path to command, which is sent to daemon."""
+    return f"{command.__module__}:{command.__qualname__}"
+
+
+def _load_command(path: str) -> Type[BaseJujuCommand]:
+    """Load command from path created by `_get_command_path`."""
+    module_name, _, name = path.partition(":")
+    if not module_name.startswith("juju_spell.commands."):
+        raise JujuSpellError(f"command `{path}` is not supported")
+
+    command = getattr(importlib.import_module(module_name), name, None)
+    if not isinstance(command, type) or not issubclass(command, BaseJujuCommand):
+        raise JujuSpellError(f"command `{path}` is not supported")
+
+    if not command.read_only:
+        raise JujuSpellError(f"command `{path}` is not read-only")
+
+    return command
+
+
+def is_daemon_running(path: Path = DAEMON_SOCKET_PATH) -> bool:
+    """Check if daemon is listening on socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(str(path))
+        except OSError:
+            return False
+
+    return True
+
+
+def run_on_daemon(
+    command: Type[BaseJujuCommand],
+    config: Config,
+    parsed_args: argparse.Namespace,
+    path: Path = DAEMON_SOCKET_PATH,
+) -> Iterator[Dict[str, Any]]:
+    """Run command on daemon and yield results as soon as they are ready.
+
+    Only UUIDs of controllers are sent, so the daemon needs to use same config.
+    """
+    request = {
+        "command": _get_command_path(command),
+        "controllers": [str(controller.uuid) for controller in config.controllers],
+        "args": vars(parsed_args),
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(path))
+        client.sendall(_dump(request))
+        with client.makefile("r", encoding="utf-8") as file:
+            for line in file:
+                response = json.loads(line)
+                if "error" in response:
+                    raise JujuSpellError(f"daemon failed: {response['error']}")
+
+                yield response["result"]
+
+
+class Daemon:
+    """Daemon running commands with connections kept between runs."""
+
+    def __init__(
+        self,
+        path: Path = DAEMON_SOCKET_PATH,
+        config_loader: Callable[[], Config] = _load_default_config,
+    ):
+        """Initialize the daemon.
+
+        :param path: path to unix socket on which the daemon listens
+        :param config_loader: function loading config, which is called for each
+                              request, so changes of config are used without restart
+        """
+        self.path = path
+        self.config_loader = config_loader
+        self._stop: Optional[asyncio.Event] = None
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Handle single request."""
+        try:
+            line = await reader.readline()
+            if not line:
+                return  # client only checked that daemon is running
+
+            request = json.loads(line)
+            command = _load_command(request["command"])
+            config = _select_controllers(self.config_loader(), request["controllers"])
+            parsed_args = argparse.Namespace(**request["args"])
+            logger.info(
+                "running %s on %d controllers",
+                command.__name__,
+                len(config.controllers),
+            )
+            # NOTE: requests run concurrently, so each of them has its own timings
+            with phase_timings.scope():
+                results = iter_run(
+                    config, command(), parsed_args, keep_connections=True
+                )
+                try:
+                    async for result in results:
+                        writer.write(_dump({"result": result}))
+                        await writer.drain()
+                finally:
+                    await results.aclose()
+        except ConnectionError:
+            logger.info("client disconnected")
+        except Exception as error:
+            logger.error("request failed with error: %s", error)
+            writer.write(_dump({"error": str(error)}))
+        finally:
+            writer.close()
+
+    def stop(self) -> None:
+        """Stop the daemon."""
+        logger.info("stopping daemon")
+        if self._stop is not None:
+            self._stop.set()
+
+    async def serve(self) -> None:
+        """Serve requests until the daemon is stopped."""
+        if is_daemon_running(self.path):
+            raise JujuSpellError(f"daemon is already running on {self.path}")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self.path.unlink()  # remove socket left by daemon, which was killed
+
+        self._stop = asyncio.Event()
+        server = await asyncio.start_unix_server(self.handle, path=str(self.path))
+        os.chmod(self.path, 0o600)  # only owner could use the connections
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self.stop)
+
+        logger.info("daemon is listening on %s", self.path)
+        try:
+            await self._stop.wait()
+        finally:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(signum)
+
+            server.close()
+            await server.wait_closed()
+            await connect_manager.clean()
+            self.path.unlink(missing_ok=True)
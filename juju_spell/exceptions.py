@@ -23,3 +23,11 @@ class JujuSpellError(Exception):
 
 class Abort(JujuSpellError):
     """An internal signalling exception that signals JujuSpell to abort."""
+
+
+class TunnelError(JujuSpellError):
+    """Tunnel to controller could not be created."""
+
+
+class PortCollisionError(TunnelError):
+    """Local port of tunnel is already used by another process."""
@@ -1,12 +1,127 @@
 """Filter logic."""
+import dataclasses
+import fnmatch
+import functools
 import re
 import typing as t
-from dataclasses import asdict
+from collections import defaultdict
 
-from .config import Config, Controller
+from .config import Config, Controller, validate_config
 
-# --filter "a=v1,v2,v3 b=v4,v5,v6"
-FILTER_EXPRESSION_REGEX = r"([A-Za-z]+)=([^=]+)(?:\s|$)"
+# --filter "a=v1,v2,v3 b!=v4,v5,v6 c=v7-* d=/^v8-[0-9]+$/"
+FILTER_EXPRESSION_REGEX = r"([A-Za-z_]+)(!?=)([^=]+)(?:\s|$)"
+# controller attributes, which are indexed for filtering
+INDEXED_KEYS = ("customer", "owner", "tags", "risk", "name")
+
+
+def _get_values(controller: Controller, key: str) -> t.List[str]:
+    """Get controller attribute as list of strings."""
+    value = getattr(controller, key, None)
+    if value is None or value == "":
+        return []
+
+    if isinstance(value, list):
+        return [str(item) for item in value]
+
+    return [str(value)]
+
+
+class FilterCondition(t.NamedTuple):
+    """Single compiled condition of filter expression, e.g. `a!=v1,v2-*`."""
+
+    key: str
+    negate: bool
+    values: t.FrozenSet[str]
+    patterns: t.Tuple[t.Pattern, ...]
+
+    def match_pattern(self, value: str) -> bool:
+        """Check if value match any glob or regex pattern."""
+        return any(pattern.fullmatch(value) for pattern in self.patterns)
+
+    def match(self, controller: Controller) -> bool:
+        """Check if controller match the condition."""
+        matched = any(
+            value in self.values or self.match_pattern(value)
+            for value in _get_values(controller, self.key)
+        )
+        return matched is not self.negate
+
+
+@functools.lru_cache(maxsize=None)
+def compile_filter(filter_expression: str) -> t.Tuple[FilterCondition, ...]:
+    """Compile filter expression to conditions.
+
+    The values of each key are separated by comma. The value between slashes
+    is a regular expression, e.g. `/^prod-[0-9]+$/`, the value with any of
+    `*?[` is a glob pattern and the rest are exact values. The `key!=values`
+    selects controllers, which do not match any of the values.
+    """
+    conditions = []
+    for key, operator, raw_values in re.findall(
+        FILTER_EXPRESSION_REGEX, filter_expression
+    ):
+        values, patterns = set(), []
+        for value in raw_values.split(","):
+            if len(value) > 1 and value.startswith("/") and value.endswith("/"):
+                patterns.append(re.compile(value[1:-1]))
+            elif any(char in value for char in "*?["):
+                patterns.append(re.compile(fnmatch.translate(value)))
+            elif value:
+                values.add(value)
+
+        conditions.append(
+            FilterCondition(key, operator == "!=", frozenset(values), tuple(patterns))
+        )
+
+    return tuple(conditions)
+
+
+class ControllerIndex:
+    """Inverted index of controllers by values of `INDEXED_KEYS`.
+
+    Each value is mapped to positions of controllers with such value, so
+    conditions on indexed keys are evaluated as set operations.
+    """
+
+    def __init__(self, controllers: t.List[Controller]):
+        """Build the index.
+
+        :param controllers: list of indexed controllers
+        """
+        self.controllers = controllers
+        self.positions = frozenset(range(len(controllers)))
+        self.index: t.Dict[str, t.Dict[str, t.Set[int]]] = {
+            key: defaultdict(set) for key in INDEXED_KEYS
+        }
+        for position, controller in enumerate(controllers):
+            for key in INDEXED_KEYS:
+                for value in _get_values(controller, key):
+                    self.index[key][value].add(position)
+
+    def select(self, condition: FilterCondition) -> t.Set[int]:
+        """Get positions of controllers, which match the condition."""
+        values = self.index[condition.key]
+        positions: t.Set[int] = set()
+        for value in condition.values & values.keys():
+            positions |= values[value]
+
+        if condition.patterns:
+            for value, value_positions in values.items():
+                if condition.match_pattern(value):
+                    positions |= value_positions
+
+        if condition.negate:
+            return self.positions - positions
+
+        return positions
+
+
+def get_index(config: Config) -> ControllerIndex:
+    """Get index of config controllers, which is built only once."""
+    if config._index is None or config._index.controllers is not config.controllers:
+        config._index = ControllerIndex(config.controllers)
+
+    return config._index
 
 
 def make_controllers_filter(filter_expression):
@@ -17,45 +132,38 @@ def make_controllers_filter(filter_expression):
     inside controller match the values list a in [v1,v2,v3]
     and b in [v4,v5,v6].
     """
-
-    def serialize(values):
-        if isinstance(values, str):
-            return set(values.split(","))
-        if isinstance(values, list):
-            return set(values)
-        return values
+    conditions = compile_filter(filter_expression)
 
     def filter(controller: Controller):
         """Filter controllers."""
-        controller_asdict = asdict(controller)
-        for key, values in re.findall(
-            FILTER_EXPRESSION_REGEX,
-            filter_expression,
-        ):
-            target_val: t.Union[t.List[str], str] = controller_asdict.get(key)
-            if not target_val:
-                return False
-            if (
-                isinstance(target_val, list)
-                and len(serialize(target_val) & serialize(values)) <= 0
-            ):
-                return False
-            if isinstance(target_val, str) and asdict(controller).get(
-                key
-            ) not in serialize(values):
-                return False
-        return True
+        return all(condition.match(controller) for condition in conditions)
 
     return filter
 
 
 def get_filtered_config(config: Config, filter_expression: str) -> Config:
+    """Get config with controllers selected by filter expression.
+
+    If the config was loaded with `lazy=True`, only the selected controllers are
+    validated.
+    """
     if filter_expression == "":
-        return config
+        return validate_config(config)
+
+    index = get_index(config)
+    selected = set(index.positions)
+    for condition in compile_filter(filter_expression):
+        if condition.key in INDEXED_KEYS:
+            selected &= index.select(condition)
+        else:
+            selected = {
+                position
+                for position in selected
+                if condition.match(config.controllers[position])
+            }
 
-    controller_filter = make_controllers_filter(filter_expression)
-    config.controllers = list(filter(controller_filter, config.controllers))
-    if len(config.controllers) <= 0:
+    if len(selected) <= 0:
         raise ValueError("No match controller")
 
-    return config
+    controllers = [config.controllers[position] for position in sorted(selected)]
+    return validate_config(dataclasses.replace(config, controllers=controllers))
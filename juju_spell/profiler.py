@@ -0,0 +1,252 @@
+"""Profiling of the whole run.
+
+Provides different profilers:
+
+    - cpu: cProfile, the output is pstats file
+    - wall: sampling of all asyncio tasks, the output is collapsed stacks for flame
+            graph, e.g. `flamegraph.pl` or speedscope
+    - alloc: tracemalloc, the output is snapshot of allocations
+"""
+import abc
+import asyncio
+import contextlib
+import cProfile
+import io
+import logging
+import os
+import pstats
+import signal
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+from juju_spell.settings import (
+    DEFAULT_PROFILE_INTERVAL,
+    DEFAULT_PROFILE_TOP,
+    PROFILES_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+PROFILE_CPU = "cpu"
+PROFILE_WALL = "wall"
+PROFILE_ALLOC = "alloc"
+PROFILE_MODES = [PROFILE_CPU, PROFILE_WALL, PROFILE_ALLOC]
+
+
+def _get_frame_name(frame: FrameType) -> str:
+    """Get name of frame as `function (file:line)`."""
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def _get_frame_stack(frame: Optional[FrameType]) -> List[str]:
+    """Get stack of frame from the outermost frame."""
+    stack = []
+    while frame is not None:
+        stack.append(_get_frame_name(frame))
+        frame = frame.f_back
+
+    return stack[::-1]
+
+
+def _get_task_stack(task: asyncio.Task) -> List[str]:
+    """Get stack of suspended task by following awaited coroutines."""
+    stack = [f"task {task.get_name()}"]
+    awaitable: Any = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(
+            awaitable, "gi_frame", None
+        )
+        if frame is None:
+            break
+
+        stack.append(_get_frame_name(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(
+            awaitable, "gi_yieldfrom", None
+        )
+
+    return stack
+
+
+class BaseProfiler(metaclass=abc.ABCMeta):
+    """Base profiler, which writes its output to file."""
+
+    mode: str
+    extension: str
+
+    def __init__(self, path: Path = PROFILES_DIR, top: int = DEFAULT_PROFILE_TOP):
+        """Initialize the profiler.
+
+        :param path: directory with profiles
+        :param top: number of top offenders in summary
+        """
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        self.path = path / f"{timestamp}-{os.getpid()}-{self.mode}.{self.extension}"
+        self.top = top
+
+    @abc.abstractmethod
+    def start(self) -> None:  # pragma: no cover
+        """Start profiling."""
+        ...
+
+    @abc.abstractmethod
+    def stop(self) -> None:  # pragma: no cover
+        """Stop profiling and write output to file."""
+        ...
+
+    @abc.abstractmethod
+    def summary(self) -> str:  # pragma: no cover
+        """Get summary with top offenders."""
+        ...
+
+
+class CPUProfiler(BaseProfiler):
+    """Profiler of CPU time by cProfile."""
+
+    mode = PROFILE_CPU
+    extension = "pstats"
+
+    def start(self) -> None:
+        """Start cProfile."""
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self) -> None:
+        """Stop cProfile and dump stats."""
+        self._profile.disable()
+        self._profile.dump_stats(self.path)
+
+    def summary(self) -> str:
+        """Get functions with the highest cumulative time."""
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        return stream.getvalue().strip()
+
+
+class WallProfiler(BaseProfiler):
+    """Sampling profiler of wall time, which includes all asyncio tasks.
+
+    The stacks are sampled by `SIGALRM` handler, which runs in the main thread, so
+    it could safely access tasks of the running event loop. Each sample contains
+    stack of the main thread and stacks of all suspended tasks, so the time spent
+    by waiting in tasks, e.g. for controller, is also included.
+    """
+
+    mode = PROFILE_WALL
+    extension = "folded"
+
+    def __init__(
+        self,
+        path: Path = PROFILES_DIR,
+        top: int = DEFAULT_PROFILE_TOP,
+        interval: float = DEFAULT_PROFILE_INTERVAL,
+    ):
+        """Initialize the profiler.
+
+        :param path: directory with profiles
+        :param top: number of top offenders in summary
+        :param interval: time between samples in seconds
+        """
+        super().__init__(path, top)
+        self.interval = interval
+        self.samples: Counter = Counter()
+
+    def _sample(self, _: int, frame: Optional[FrameType]) -> None:
+        """Record stacks of main thread and all suspended tasks."""
+        self.samples[";".join(["main", *_get_frame_stack(frame)])] += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # event loop is not running
+
+        current = asyncio.current_task(loop)
+        for task in asyncio.all_tasks(loop):
+            if task is not current:
+                self.samples[";".join(_get_task_stack(task))] += 1
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._handler = signal.signal(signal.SIGALRM, self._sample)
+        signal.setitimer(signal.ITIMER_REAL, self.interval, self.interval)
+
+    def stop(self) -> None:
+        """Stop sampling and write collapsed stacks."""
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, self._handler)
+        with open(self.path, "w") as file:
+            for stack, count in self.samples.items():
+                file.write(f"{stack} {count}{os.linesep}")
+
+    def summary(self) -> str:
+        """Get functions with the highest inclusive wall time."""
+        inclusive: Dict[str, int] = Counter()
+        for stack, count in self.samples.items():
+            for name in set(stack.split(";")[1:]):
+                inclusive[name] += count
+
+        lines = [f"{'seconds':>10}  function"]
+        for name, count in inclusive.most_common(self.top):
+            lines.append(f"{count * self.interval:>10.3f}  {name}")
+
+        return os.linesep.join(lines)
+
+
+class AllocProfiler(BaseProfiler):
+    """Profiler of memory allocations by tracemalloc."""
+
+    mode = PROFILE_ALLOC
+    extension = "tracemalloc"
+
+    def start(self) -> None:
+        """Start tracing of allocations."""
+        tracemalloc.start(25)
+
+    def stop(self) -> None:
+        """Take snapshot of allocations and dump it."""
+        self._snapshot = tracemalloc.take_snapshot()
+        self._peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self._snapshot.dump(str(self.path))
+
+    def summary(self) -> str:
+        """Get lines with the highest allocated memory."""
+        lines = [f"peak memory: {self._peak / 1024**2:.1f} MiB"]
+        for statistic in self._snapshot.statistics("lineno")[: self.top]:
+            lines.append(str(statistic))
+
+        return os.linesep.join(lines)
+
+
+PROFILERS: Dict[str, Type[BaseProfiler]] = {
+    profiler.mode: profiler for profiler in (CPUProfiler, WallProfiler, AllocProfiler)
+}
+
+
+@contextlib.contextmanager
+def profile(
+    mode: Optional[str], path: Path = PROFILES_DIR
+) -> Iterator[Optional[BaseProfiler]]:
+    """Profile the code inside context by profiler selected by mode.
+
+    Nothing is profiled if the mode is None. The profiler is stopped and its output
+    is written to `path` directory even if the code failed.
+    """
+    if mode is None:
+        yield None
+        return
+
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    profiler = PROFILERS[mode](path)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        logger.info("profile was written to %s", profiler.path)
@@ -0,0 +1,123 @@
+"""Serialization of command outputs to JSON and YAML.
+
+The python-libjuju definitions, e.g. `FullStatus`, are converted to dictionaries
+by fields, which are collected only once for each class. The JSON is encoded by
+`orjson` if it's installed and the YAML by libyaml `CSafeDumper` if available.
+"""
+import datetime
+import enum
+import functools
+import json
+import re
+import uuid
+from typing import Any, Optional, Tuple
+
+import yaml
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# use libyaml C dumper if available, since it's much faster
+SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+JSON_INDENT = 1
+# orjson supports only indentation with two spaces, which is halved
+_ORJSON_INDENT = re.compile(r"\n +")
+
+
+@functools.lru_cache(maxsize=None)
+def _get_fields(cls: type) -> Optional[Tuple[str, ...]]:
+    """Get fields of python-libjuju definition.
+
+    The definitions are recognized by `_toSchema` mapping, so python-libjuju does
+    not need to be imported.
+    """
+    schema = getattr(cls, "_toSchema", None)
+    if not isinstance(schema, dict):
+        return None
+
+    return (*schema, "unknown_fields")
+
+
+def _default(obj: Any) -> Any:
+    """Convert object, which is not JSON serializable, to dictionary.
+
+    The types natively supported by orjson are converted in the same way as by
+    orjson, so the output does not depend on whether orjson is installed. The
+    exceptions are converted to their message.
+    """
+    if isinstance(obj, BaseException):
+        return str(obj)
+
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+
+    if isinstance(obj, enum.Enum):
+        return obj.value
+
+    fields = _get_fields(type(obj))
+    if fields is not None:
+        try:
+            return {field: getattr(obj, field) for field in fields}
+        except AttributeError:
+            pass  # object without some of the fields
+
+    return vars(obj)
+
+
+def to_plain(obj: Any) -> Any:
+    """Convert object to data, which contains only dictionaries, lists and scalars."""
+    if isinstance(obj, dict):
+        return {key: to_plain(value) for key, value in obj.items()}
+
+    if isinstance(obj, (list, tuple)):
+        return [to_plain(item) for item in obj]
+
+    if obj is None or isinstance(obj, (str, int, float)):
+        return obj
+
+    return to_plain(_default(obj))
+
+
+def dumps_json(data: Any, pretty: bool = False) -> str:
+    """Serialize data to JSON.
+
+    :param data: data, which could contain python-libjuju definitions
+    :param pretty: indent the JSON, otherwise it's serialized as single line
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+
+        output = orjson.dumps(data, default=_default, option=option).decode()
+        if pretty:
+            # NOTE: new lines in strings are escaped, so only indentation is matched
+            output = _ORJSON_INDENT.sub(
+                lambda match: match.group()[: len(match.group()) // 2 + 1], output
+            )
+
+        return output
+
+    # NOTE: the output is same as output of orjson
+    if pretty:
+        return json.dumps(
+            data, default=_default, ensure_ascii=False, indent=JSON_INDENT
+        )
+
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps_yaml(data: Any) -> str:
+    """Serialize data to YAML with keys in original order."""
+    return yaml.dump(
+        to_plain(data),
+        Dumper=SafeDumper,
+        default_flow_style=False,
+        allow_unicode=True,
+        sort_keys=False,
+    )
@@ -24,10 +24,31 @@ CONFIG_PATH = os.environ.get(
 PERSONAL_CONFIG_PATH = os.environ.get(
     "JUJUSPELL_PERSONAL_CONFIG", pathlib.Path(JUJUSPELL_DATA / "config.personal.yaml")
 )
+CONFIG_DIR_PATH = os.environ.get(
+    "JUJUSPELL_CONFIG_DIR", pathlib.Path(JUJUSPELL_DATA / "config.d")
+)
+PORT_LEASE_DIR = pathlib.Path(JUJUSPELL_DATA / "ports")
+DAEMON_SOCKET_PATH = pathlib.Path(JUJUSPELL_DATA / "daemon.sock")
+CACHE_DIR = pathlib.Path(JUJUSPELL_DATA / "cache")
+RESULTS_CACHE_DIR = pathlib.Path(CACHE_DIR / "results")
+CONFIG_CACHE_DIR = pathlib.Path(CACHE_DIR / "config")
+CONFIG_SHARDS_CACHE_DIR = pathlib.Path(CONFIG_CACHE_DIR / "config.d")
+PROFILES_DIR = pathlib.Path(JUJUSPELL_DATA / "profiles")
+DEFAULT_CACHE_MAX_SIZE = 64 * 1024**2  # bytes
+CONFIG_CACHE_FORMAT = 1  # increase if cached config is incompatible with new code
+DEFAULT_CONFIG_CACHE_FILES = 4  # cached configs, e.g. lazy and full load
 DEFAULT_PORT_RANGE = range(17071, 17170)
+DEFAULT_PORT_COLLISION_RETRIES = 3
 DEFAULT_RETRY_BACKOFF = 1.5  # seconds
 DEFAULT_CONNECTIN_TIMEOUT = 60  # seconds
 DEFUALT_MAX_FRAME_SIZE = 6**24
+DEFAULT_MAX_CONCURRENCY = 10  # controllers processed at the same time
+DEFAULT_MODEL_CONCURRENCY = 5  # models of single controller processed at the same time
+DEFAULT_TUNNEL_POLL_INTERVAL = 0.05  # seconds
+DEFAULT_TUNNEL_TERMINATE_TIMEOUT = 5  # seconds to wait for tunnel to exit
+DEFAULT_SUMMARY_LENGTH = 1000  # characters of objects in debug messages
+DEFAULT_PROFILE_INTERVAL = 0.005  # seconds between samples of wall profiler
+DEFAULT_PROFILE_TOP = 20  # number of top offenders in profile summary
 
 
 CROSS_FINGERS = """
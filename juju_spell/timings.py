@@ -0,0 +1,111 @@
+"""Timings of phases of run on each controller."""
+import contextlib
+import contextvars
+import math
+import os
+from collections import defaultdict
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+PHASE_TUNNEL = "tunnel"
+PHASE_LOGIN = "login"
+PHASE_PRE_CHECK = "pre_check"
+PHASE_EXECUTE = "execute"
+PHASE_DISCONNECT = "disconnect"
+
+TIMINGS_TYPE = Dict[str, float]
+
+
+class PhaseTimings:
+    """Durations of phases in seconds for each controller.
+
+    The durations are recorded by controller name, since the connection to
+    controller could be created in the background before the command is run on it,
+    e.g. by `ConnectManager.warm_up`. The timings could be recorded separately
+    inside `scope`, e.g. for each request of daemon.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty timings."""
+        self._default: Dict[str, TIMINGS_TYPE] = defaultdict(dict)
+        self._scoped: contextvars.ContextVar[Optional[Dict[str, TIMINGS_TYPE]]] = (
+            contextvars.ContextVar("phase_timings", default=None)
+        )
+
+    @property
+    def _timings(self) -> Dict[str, TIMINGS_TYPE]:
+        """Get timings of current scope."""
+        timings = self._scoped.get()
+        return self._default if timings is None else timings
+
+    @contextlib.contextmanager
+    def scope(self) -> Iterator[None]:
+        """Record timings separately inside the context.
+
+        The tasks created inside the context record timings to same scope, since
+        they inherit the context.
+        """
+        token = self._scoped.set(defaultdict(dict))
+        try:
+            yield
+        finally:
+            self._scoped.reset(token)
+
+    @contextlib.contextmanager
+    def span(self, name: str, phase: str) -> Iterator[None]:
+        """Measure duration of phase, which is recorded even if the phase failed."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, phase, perf_counter() - start)
+
+    def record(self, name: str, phase: str, duration: float) -> None:
+        """Record duration of phase, e.g. reconnection is added to previous one."""
+        timings = self._timings[name]
+        timings[phase] = timings.get(phase, 0.0) + duration
+
+    def pop(self, name: str) -> TIMINGS_TYPE:
+        """Get and remove timings of controller."""
+        return self._timings.pop(name, {})
+
+    def pop_all(self) -> Dict[str, TIMINGS_TYPE]:
+        """Get and remove timings of all controllers."""
+        timings = dict(self._timings)
+        self._timings.clear()
+        return timings
+
+
+def get_percentile(values: List[float], percent: float) -> float:
+    """Get percentile of sorted values by nearest-rank method."""
+    rank = math.ceil(percent / 100 * len(values))
+    return values[max(rank - 1, 0)]
+
+
+def get_report(timings: Iterable[TIMINGS_TYPE]) -> str:
+    """Get table with p50, p95 and max duration of each phase.
+
+    The phases are sorted by p95 duration, so the slowest phase is first.
+    """
+    durations = defaultdict(list)
+    for controller_timings in timings:
+        for phase, duration in controller_timings.items():
+            durations[phase].append(duration)
+
+    rows = []
+    for phase, values in durations.items():
+        values.sort()
+        p50, p95 = get_percentile(values, 50), get_percentile(values, 95)
+        rows.append((phase, len(values), p50, p95, values[-1]))
+
+    rows.sort(key=lambda row: row[3], reverse=True)
+    lines = [f"{'phase':<12}{'count':>7}{'p50':>10}{'p95':>10}{'max':>10}"]
+    for phase, count, p50, p95, max_duration in rows:
+        lines.append(
+            f"{phase:<12}{count:>7}{p50:>9.3f}s{p95:>9.3f}s{max_duration:>9.3f}s"
+        )
+
+    return os.linesep.join(lines)
+
+
+phase_timings = PhaseTimings()
@@ -15,9 +15,16 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 """Utilities for JujuSpell."""
+import importlib.util
+import itertools
+import reprlib
 import secrets
+import sys
 from collections import defaultdict
-from typing import Dict, Iterable, List
+from types import ModuleType
+from typing import Any, Dict, Iterable, List
+
+from juju_spell.settings import DEFAULT_SUMMARY_LENGTH
 
 
 def strtobool(value: str) -> bool:
@@ -96,3 +103,86 @@ def merge_list_of_dict_by_key(key: str, lists: List[List[Dict]]):
 def random_password(length: int = 30):
     """Generate random password."""
     return secrets.token_urlsafe(length)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Import module, which is executed on first access to any of its attributes.
+
+    This is used for python-libjuju modules, which take long time to import, so the
+    CLI could start without them.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class _SummaryRepr(reprlib.Repr):
+    """Representation limited in size, which shows fields of objects.
+
+    The python-libjuju objects, e.g. `FullStatus`, have `__repr__` with all nested
+    objects, so they are represented only by limited number of their fields.
+    """
+
+    def __init__(self) -> None:
+        """Initialize limits of representation."""
+        super().__init__()
+        self.maxlevel = 3
+        self.maxdict = self.maxlist = self.maxtuple = self.maxset = 10
+        self.maxstring = self.maxother = 80
+
+    def repr_instance(self, obj: Any, level: int) -> str:
+        """Get representation of object by its fields."""
+        fields = getattr(obj, "__dict__", None)
+        if not isinstance(fields, dict) or not fields or isinstance(obj, BaseException):
+            return super().repr_instance(obj, level)
+
+        name = type(obj).__name__
+        if level <= 0:
+            return f"{name}(...)"
+
+        items = [
+            f"{key}={self.repr1(value, level - 1)}"
+            for key, value in itertools.islice(fields.items(), self.maxdict)
+        ]
+        if len(fields) > self.maxdict:
+            items.append("...")
+
+        return f"{name}({', '.join(items)})"
+
+
+_summary_repr = _SummaryRepr()
+
+
+def summarize(obj: Any, max_length: int = DEFAULT_SUMMARY_LENGTH) -> str:
+    """Get representation of object, which is limited to `max_length` characters."""
+    text = obj if isinstance(obj, str) else _summary_repr.repr(obj)
+    if len(text) > max_length:
+        return f"{text[:max_length]}... ({len(text) - max_length} more characters)"
+
+    return text
+
+
+class Summary:
+    """Lazy summary of object, which is created only if the message is formatted.
+
+    e.g. `logger.debug("status: %s", Summary(status))`
+    """
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any):
+        """Initialize summary of object."""
+        self.obj = obj
+
+    def __str__(self) -> str:
+        """Get summary of object."""
+        return summarize(self.obj)
@@ -0,0 +1,147 @@
+"""Compiled validator of confuse templates.
+
+The confuse library validates values through `RootView` and `Subview` objects,
+which resolve each value from the root of the config again. The `compile_template`
+function converts the template once into nested functions, which validate plain
+values directly, but still produce the same values and raise the same errors as
+the confuse library.
+"""
+import functools
+from typing import Any, Callable, Optional, Union
+
+import confuse
+from confuse.exceptions import ConfigTypeError, NotFoundError
+from confuse.templates import REQUIRED
+
+# marker of value, which is missing in the source
+MISSING = object()
+ROOT_NAME = "root"
+
+Name = Union[str, int]
+Validator = Callable[[Any, Optional[str]], Any]
+
+
+class _View:
+    """Minimal view, which is passed to `confuse.Template.convert`."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: Optional[str]):
+        self.name = name if name is not None else ROOT_NAME
+
+
+def _get_name(parent: Optional[str], key: Name) -> str:
+    """Get human-readable name of the value in the same way as `confuse.Subview`."""
+    if isinstance(key, int):
+        return f"{parent or ''}#{key}"
+
+    return key if parent is None else f"{parent}.{key}"
+
+
+def _compile_mapping(template: confuse.MappingTemplate) -> Validator:
+    """Compile mapping template, which could define `build` method."""
+    subtemplates = [
+        (key, compile_template(subtemplate))
+        for key, subtemplate in template.subtemplates.items()
+    ]
+    build = getattr(template, "build", None)
+
+    def validate(value: Any, name: Optional[str] = None) -> Any:
+        output = confuse.AttrDict()
+        for key, subvalidate in subtemplates:
+            subvalue = MISSING
+            if value is not MISSING:
+                try:
+                    subvalue = value[key]
+                except (KeyError, IndexError):
+                    pass
+                except TypeError:
+                    raise ConfigTypeError(
+                        f"{name or ROOT_NAME} must be a collection, "
+                        f"not {type(value).__name__}"
+                    ) from None
+
+            output[key] = subvalidate(subvalue, _get_name(name, key))
+
+        return output if build is None else build(output)
+
+    return validate
+
+
+def _compile_sequence(template: confuse.Sequence) -> Validator:
+    """Compile sequence template."""
+    subvalidate = compile_template(template.subtemplate)
+
+    def validate(value: Any, name: Optional[str] = None) -> Any:
+        if value is MISSING:
+            return []
+
+        if not isinstance(value, (list, tuple)):
+            raise ConfigTypeError(
+                f"{name or ROOT_NAME} must be a list, not {type(value).__name__}"
+            )
+
+        return [
+            subvalidate(item, _get_name(name, index))
+            for index, item in enumerate(value)
+        ]
+
+    return validate
+
+
+def _compile_optional(template: confuse.Optional) -> Validator:
+    """Compile optional template."""
+    subvalidate = compile_template(template.subtemplate)
+
+    def validate(value: Any, name: Optional[str] = None) -> Any:
+        if value is MISSING:
+            if template.allow_missing:
+                return template.default
+
+            raise NotFoundError(f"{name} not found")
+
+        if value is None:
+            return template.default
+
+        return subvalidate(value, name)
+
+    return validate
+
+
+def _compile_value(template: confuse.Template) -> Validator:
+    """Compile template of single value, which is checked by its `convert` method."""
+    default = getattr(template, "default", REQUIRED)
+
+    def validate(value: Any, name: Optional[str] = None) -> Any:
+        if value is MISSING:
+            if default is REQUIRED:
+                raise NotFoundError(f"{name} not found")
+
+            return default
+
+        return template.convert(value, _View(name))
+
+    return validate
+
+
+@functools.lru_cache(maxsize=None)
+def compile_template(template: Any) -> Validator:
+    """Compile confuse template to function validating plain values.
+
+    The returned function takes value and its name used in errors, e.g.
+    `compile_template(template)(source)`.
+    """
+    template = confuse.as_template(template)
+    if isinstance(template, confuse.MappingTemplate):
+        return _compile_mapping(template)
+
+    if isinstance(template, confuse.Sequence):
+        return _compile_sequence(template)
+
+    if isinstance(template, confuse.Optional):
+        return _compile_optional(template)
+
+    if type(template).value is not confuse.Template.value:
+        raise TypeError(f"template {template!r} is not supported")
+
+    return _compile_value(template)
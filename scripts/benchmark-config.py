@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Compare config validation by confuse and by compiled templates."""
+import copy
+import timeit
+import uuid
+
+import click
+from confuse import RootView
+
+from juju_spell.config import JUJUSPELL_CONFIG_TEMPLATE
+from juju_spell.validator import compile_template
+
+CA_CERT = "-----BEGIN CERTIFICATE-----\n1234\n-----END CERTIFICATE-----"
+
+
+def get_source(count):
+    """Get config source with given number of controllers."""
+    return {
+        "connection": {"port-range": "17071:17170", "max-concurrency": 10},
+        "controllers": [
+            {
+                "uuid": str(uuid.uuid4()),
+                "name": f"controller-{index}",
+                "customer": f"customer-{index % 100}",
+                "owner": "Gandalf",
+                "tags": ["test", f"tag-{index % 10}"],
+                "risk": index % 5 + 1,
+                "endpoint": (
+                    f"10.{index // 65536 % 256}.{index // 256 % 256}."
+                    f"{index % 256}:17070"
+                ),
+                "ca_cert": CA_CERT,
+                "user": "admin",
+                "password": "pass1234",
+                "model_mapping": {"lma": ["monitoring"], "default": ["production"]},
+                "connection": {
+                    "destination": "ubuntu@10.1.1.99",
+                    "subnets": ["10.1.1.0/24"],
+                    "jumps": ["bastion"],
+                },
+            }
+            for index in range(count)
+        ],
+    }
+
+
+@click.command()
+@click.option("--controllers", default=10000, help="Number of controllers.")
+@click.option("--repeat", default=3, help="Number of repeats.")
+def main(controllers, repeat):
+    source = get_source(controllers)
+    validate = compile_template(JUJUSPELL_CONFIG_TEMPLATE)
+    assert validate(copy.deepcopy(source)) == RootView([source]).get(
+        JUJUSPELL_CONFIG_TEMPLATE
+    )
+
+    confuse_time = min(
+        timeit.repeat(
+            lambda: RootView([source]).get(JUJUSPELL_CONFIG_TEMPLATE),
+            number=1,
+            repeat=repeat,
+        )
+    )
+    compiled_time = min(
+        timeit.repeat(lambda: validate(source), number=1, repeat=repeat)
+    )
+    click.echo(f"controllers: {controllers}")
+    click.echo(f"confuse:     {confuse_time:.3f}s")
+    click.echo(f"compiled:    {compiled_time:.3f}s")
+    click.echo(f"speedup:     {confuse_time / compiled_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
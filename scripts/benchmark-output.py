@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Compare serialization of status output by `json.dumps` and by serializer."""
+import json
+import timeit
+
+import click
+from juju.client import client
+
+from juju_spell.serializer import dumps_json
+
+
+def get_status(applications, units):
+    """Get python-libjuju status of model."""
+    return client.FullStatus.from_json(
+        {
+            "applications": {
+                f"app-{app}": {
+                    "charm": f"app-{app}",
+                    "status": {"status": "active", "info": "ready"},
+                    "units": {
+                        f"app-{app}/{unit}": {
+                            "machine": str(unit),
+                            "public-address": f"10.1.{app}.{unit}",
+                            "workload-status": {"status": "active"},
+                            "agent-status": {"status": "idle"},
+                        }
+                        for unit in range(units)
+                    },
+                }
+                for app in range(applications)
+            },
+            "machines": {
+                str(unit): {"id": str(unit), "series": "jammy"} for unit in range(units)
+            },
+            "model": {"name": "production", "version": "2.9.42"},
+        }
+    )
+
+
+def get_output(controllers, applications, units):
+    """Get output of status command from controllers."""
+    status = get_status(applications, units)
+    return [
+        {
+            "context": {"uuid": str(index), "name": f"controller-{index}"},
+            "success": True,
+            "output": {"production": status},
+            "error": None,
+        }
+        for index in range(controllers)
+    ]
+
+
+@click.command()
+@click.option("--controllers", default=300, help="Number of controllers.")
+@click.option("--applications", default=20, help="Number of applications.")
+@click.option("--units", default=10, help="Number of units of each application.")
+@click.option("--repeat", default=3, help="Number of repeats.")
+def main(controllers, applications, units, repeat):
+    output = get_output(controllers, applications, units)
+    assert json.loads(dumps_json(output, pretty=True)) == json.loads(
+        json.dumps(output, default=vars)
+    )
+
+    json_time = min(
+        timeit.repeat(
+            lambda: json.dumps(output, default=vars, indent=1),
+            number=1,
+            repeat=repeat,
+        )
+    )
+    serializer_time = min(
+        timeit.repeat(lambda: dumps_json(output, pretty=True), number=1, repeat=repeat)
+    )
+    click.echo(f"controllers: {controllers}")
+    click.echo(f"json:        {json_time:.3f}s")
+    click.echo(f"serializer:  {serializer_time:.3f}s")
+    click.echo(f"speedup:     {json_time / serializer_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
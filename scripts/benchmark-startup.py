@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Measure startup time of juju-spell CLI."""
+import subprocess
+import sys
+import time
+
+import click
+
+LIBJUJU_MODULES = ("juju.controller", "juju.model", "juju.client.client")
+IMPORT_CODE = "import juju_spell.cmd"
+HELP_CODE = (
+    "import sys; from juju_spell.cmd import exec_cmd; "
+    "sys.argv = ['juju-spell', '--help']; exec_cmd()"
+)
+
+
+def measure(code, repeat):
+    """Get the best wall time of running code in new interpreter."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", code],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+@click.command()
+@click.option("--repeat", default=5, help="Number of repeats.")
+@click.option(
+    "--limit",
+    default=0.2,
+    help="Maximum time of `--help` without interpreter startup in seconds.",
+)
+def main(repeat, limit):
+    baseline_time = measure("pass", repeat)
+    import_time = measure(IMPORT_CODE, repeat)
+    help_time = measure(HELP_CODE, repeat)
+    libjuju_time = measure("; ".join(f"import {name}" for name in LIBJUJU_MODULES), 1)
+    click.echo(f"interpreter: {baseline_time:.3f}s")
+    click.echo(f"import:      {import_time:.3f}s")
+    click.echo(f"--help:      {help_time:.3f}s")
+    click.echo(f"libjuju:     {libjuju_time:.3f}s (not imported on startup)")
+    if help_time - baseline_time > limit:
+        raise click.ClickException(f"--help took more than {limit:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Tests for assignment.events."""
+from unittest import mock
+
+import pytest
+
+from juju_spell.assignment.events import (
+    CommandStart,
+    Event,
+    EventBus,
+    ModelClose,
+    ModelOpen,
+)
+
+
+def test_publish_without_subscribers():
+    """Test event is not created if there is no subscriber."""
+    bus = EventBus()
+    event_type = mock.MagicMock()
+
+    bus.publish(event_type, model_name="test")
+
+    assert bus.has_subscribers(ModelOpen) is False
+    event_type.assert_not_called()
+
+
+def test_publish():
+    """Test delivering events to subscribers of event type and all events."""
+    bus = EventBus()
+    model_open, all_events = mock.MagicMock(), mock.MagicMock()
+    bus.subscribe(ModelOpen, model_open)
+    bus.subscribe(Event, all_events)
+
+    bus.publish(ModelOpen, controller_uuid="1", model_name="test")
+    bus.publish(ModelClose, controller_uuid="1", model_name="test")
+
+    model_open.assert_called_once_with(ModelOpen("1", "test"))
+    all_events.assert_has_calls(
+        [mock.call(ModelOpen("1", "test")), mock.call(ModelClose("1", "test"))]
+    )
+
+
+def test_unsubscribe():
+    """Test subscriber does not receive events after unsubscribe."""
+    bus = EventBus()
+    subscriber = mock.MagicMock()
+
+    with bus.subscribed(ModelOpen, subscriber):
+        assert bus.has_subscribers(ModelOpen) is True
+        assert bus.has_subscribers(ModelClose) is False
+
+    bus.publish(ModelOpen, controller_uuid="1", model_name="test")
+    bus.unsubscribe(ModelOpen, subscriber)  # unknown subscriber is ignored
+
+    assert bus.has_subscribers(ModelOpen) is False
+    subscriber.assert_not_called()
+
+
+def test_publish_subscriber_failure(caplog):
+    """Test failure of subscriber does not affect other subscribers."""
+    bus = EventBus()
+    failed = mock.MagicMock(side_effect=ValueError("failed"))
+    subscriber = mock.MagicMock()
+    bus.subscribe(CommandStart, failed)
+    bus.subscribe(CommandStart, subscriber)
+
+    bus.publish(CommandStart, controller_config="config", command="command")
+
+    subscriber.assert_called_once_with(CommandStart("config", "command"))
+    assert "failed with error 'failed'" in caplog.text
+
+
+def test_event_frozen():
+    """Test event can't be changed by subscriber."""
+    event = ModelOpen("1", "test")
+
+    with pytest.raises(AttributeError):
+        event.model_name = "other"
@@ -15,13 +15,35 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Tests for assignment.runner."""
 import argparse
+import asyncio
 from unittest import mock
 from unittest.mock import MagicMock
 
 import pytest
 
-from juju_spell.assignment.runner import get_result, run_serial
+from juju_spell.assignment.events import (
+    CommandEnd,
+    CommandStart,
+    ControllerConnectEnd,
+    ControllerConnectStart,
+    Event,
+    ResultReady,
+    event_bus,
+)
+from juju_spell.assignment.runner import (
+    get_deadline,
+    get_max_concurrency,
+    get_result,
+    iter_run,
+    run_batch,
+    run_on_controller,
+    run_parallel,
+    run_serial,
+    warm_up,
+)
 from juju_spell.commands.base import Result
+from juju_spell.config import Config
+from juju_spell.timings import PhaseTimings
 
 
 @pytest.mark.parametrize(
@@ -70,6 +92,15 @@ def test_get_result(controller_config, output, exp_result):
     assert result == exp_result
 
 
+def test_get_result_not_copied(controller_config):
+    """Test result references command output instead of copying it."""
+    output = Result(True, {"applications": {"app": {"units": {"app/0": {}}}}})
+
+    result = get_result(controller_config, output)
+
+    assert result["output"] is output.output
+
+
 @pytest.mark.asyncio
 @mock.patch("juju_spell.assignment.runner.get_controller", new_callable=mock.AsyncMock)
 @mock.patch("juju_spell.assignment.runner.get_result")
@@ -169,3 +200,443 @@ async def test_run_serial(mock_get_result, mock_get_controller, steps, parsed_ar
             )
 
         mock_get_result.assert_has_calls([mock.call(controller_config, exp_output)])
+
+
+@pytest.mark.parametrize(
+    "parallel, connection, exp_limit",
+    [
+        (None, None, 10),
+        (None, {}, 10),
+        (None, {"max-concurrency": 3}, 3),
+        (5, {"max-concurrency": 3}, 5),
+        (5, None, 5),
+        (None, {"max-concurrency": None}, 10),
+    ],
+)
+def test_get_max_concurrency(parallel, connection, exp_limit):
+    """Test getting maximum number of controllers processed at the same time."""
+    config = Config(controllers=[], connection=connection)
+    parsed_args = argparse.Namespace(parallel=parallel)
+
+    assert get_max_concurrency(config, parsed_args) == exp_limit
+
+
+@pytest.mark.parametrize(
+    "parallel, connection",
+    [(None, {"max-concurrency": 0}), (None, {"max-concurrency": -1}), (0, None)],
+)
+def test_get_max_concurrency_invalid(parallel, connection):
+    """Test getting invalid maximum number of controllers."""
+    config = Config(controllers=[], connection=connection)
+    parsed_args = argparse.Namespace(parallel=parallel)
+
+    with pytest.raises(ValueError, match="must be greater than 0"):
+        get_max_concurrency(config, parsed_args)
+
+
+@pytest.mark.asyncio
+@mock.patch("juju_spell.assignment.runner.get_controller", new_callable=mock.AsyncMock)
+@mock.patch("juju_spell.assignment.runner.get_result")
+async def test_run_parallel(mock_get_result, mock_get_controller):
+    """Test run in parallel keeps order of controllers and limit of concurrency."""
+    running, max_running = 0, 0
+
+    async def _run(controller, **kwargs):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01 * (10 - len(kwargs["controller_config"].name)))
+        running -= 1
+        return kwargs["controller_config"].name
+
+    config = Config(
+        controllers=[MagicMock(name=f"c{i}") for i in range(7)],
+        connection={"port-range": range(17071, 17170), "max-concurrency": 3},
+    )
+    for i, controller_config in enumerate(config.controllers):
+        controller_config.name = "c" * (i + 1)
+    command = mock.AsyncMock()
+    command.pre_check.return_value = None
+    command.run.side_effect = _run
+    mock_get_result.side_effect = lambda controller_config, output: output
+    parsed_args = argparse.Namespace(dry_run=False, parallel=None)
+
+    results = await run_parallel(config, command, parsed_args)
+
+    assert results == [controller.name for controller in config.controllers]
+    assert max_running == 3
+    assert command.run.await_count == 7
+
+
+@pytest.mark.asyncio
+@mock.patch("juju_spell.assignment.runner.get_controller", new_callable=mock.AsyncMock)
+async def test_run_parallel_failure_isolation(mock_get_controller):
+    """Test run in parallel with one failing controller."""
+    exp_error = ConnectionError("unreachable")
+    config = Config(
+        controllers=[MagicMock(), MagicMock(), MagicMock()],
+        connection={"port-range": range(17071, 17170)},
+    )
+    mock_get_controller.side_effect = [MagicMock(), exp_error, MagicMock()]
+    command = mock.AsyncMock()
+    command.pre_check.return_value = None
+    command.run.return_value = Result(True, "OK")
+    parsed_args = argparse.Namespace(dry_run=False, parallel=2)
+
+    results = await run_parallel(config, command, parsed_args)
+
+    assert [result["success"] for result in results] == [True, False, True]
+    assert repr(results[1]["error"]) == repr(exp_error)
+    assert command.run.await_count == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "batch_size, batch_mode, exp_events",
+    [
+        # wave: controller 2 waits for the slowest controller from first batch
+        (2, "wave", ["s0", "s1", "e1", "e0", "s2", "s3", "e2", "e3", "s4", "e4"]),
+        # window: controller 2 starts as soon as controller 1 is done
+        (2, "window", ["s0", "s1", "e1", "s2", "e0", "s3", "e2", "s4", "e4", "e3"]),
+        (None, "wave", ["s0", "s1", "s2", "s3", "s4", "e1", "e4", "e0", "e2", "e3"]),
+    ],
+)
+@mock.patch("juju_spell.assignment.runner.get_controller", new_callable=mock.AsyncMock)
+@mock.patch("juju_spell.assignment.runner.get_result")
+async def test_run_batch(
+    mock_get_result, mock_get_controller, batch_size, batch_mode, exp_events
+):
+    """Test run in batches with wave and window mode."""
+    durations = [3, 1, 4, 6, 2]  # durations of run for each controller
+    events = []
+
+    async def _run(controller, **kwargs):
+        index = kwargs["controller_config"].index
+        events.append(f"s{index}")
+        await asyncio.sleep(0.01 * durations[index])
+        events.append(f"e{index}")
+        return index
+
+    config = Config(
+        controllers=[MagicMock(index=index) for index in range(len(durations))],
+        connection={"port-range": range(17071, 17170)},
+    )
+    command = mock.AsyncMock()
+    command.pre_check.return_value = None
+    command.run.side_effect = _run
+    mock_get_result.side_effect = lambda controller_config, output: output
+    parsed_args = argparse.Namespace(
+        dry_run=False, parallel=None, batch_size=batch_size, batch_mode=batch_mode
+    )
+
+    results = await run_batch(config, command, parsed_args)
+
+    assert results == list(range(len(durations)))
+    assert events == exp_events
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "run_type, exp_outputs, exp_warm_up",
+    [
+        ("serial", [0, 1, 2, 3], False),
+        ("parallel", [1, 3, 0, 2], True),
+        ("batch", [1, 0, 3, 2], False),
+    ],
+)
+@mock.patch("juju_spell.assignment.runner.connect_manager", new_callable=mock.AsyncMock)
+@mock.patch("juju_spell.assignment.runner.get_controller", new_callable=mock.AsyncMock)
+@mock.patch("juju_spell.assignment.runner.get_result")
+async def test_iter_run(
+    mock_get_result,
+    mock_get_controller,
+    mock_connect_manager,
+    run_type,
+    exp_outputs,
+    exp_warm_up,
+):
+    """Test yielding results as soon as they are ready."""
+    durations = [3, 1, 4, 2]
+
+    async def _run(controller, **kwargs):
+        index = kwargs["controller_config"].index
+        await asyncio.sleep(0.01 * durations[index])
+        return index
+
+    config = Config(
+        controllers=[MagicMock(index=index) for index in range(len(durations))],
+        connection={"port-range": range(17071, 17170)},
+    )
+    command = mock.AsyncMock()
+    command.pre_check.return_value = None
+    command.run.side_effect = _run
+    mock_get_result.side_effect = lambda controller_config, output: output
+    parsed_args = argparse.Namespace(
+        dry_run=False, run_type=run_type, parallel=None, batch_size=2
+    )
+
+    mock_connect_manager.warm_up = MagicMock()
+
+    outputs = [output async for output in iter_run(config, command, parsed_args)]
+
+    assert outputs == exp_outputs
+    if exp_warm_up:
+        mock_connect_manager.warm_up.assert_called_once_with(
+            config.controllers, range(17071, 17170), 10
+        )
+    else:
+        mock_connect_manager.warm_up.assert_not_called()
+
+    mock_connect_manager.clean.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@mock.patch("juju_spell.assignment.runner.connect_manager", new_callable=mock.AsyncMock)
+@mock.patch("juju_spell.assignment.runner.get_controller", new_callable=mock.AsyncMock)
+@mock.patch("juju_spell.assignment.runner.get_result")
+async def test_iter_run_stopped(
+    mock_get_result, mock_get_controller, mock_connect_manager
+):
+    """Test stopping iteration cancels running controllers and cleans connections."""
+    config = Config(
+        controllers=[MagicMock(), MagicMock()],
+        connection={"port-range": range(17071, 17170)},
+    )
+    cancelled = asyncio.Event()
+
+    async def _run(controller, **kwargs):
+        if kwargs["controller_config"] is config.controllers[0]:
+            return Result(True, "fast")
+
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    command = mock.AsyncMock()
+    command.pre_check.return_value = None
+    command.run.side_effect = _run
+    mock_get_result.side_effect = lambda controller_config, output: output
+    parsed_args = argparse.Namespace(dry_run=False, run_type="parallel", parallel=2)
+    mock_connect_manager.warm_up = MagicMock()
+
+    results = iter_run(config, command, parsed_args)
+    assert await results.__anext__() == Result(True, "fast")
+    await results.aclose()
+
+    assert cancelled.is_set()
+    mock_connect_manager.clean.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "parsed_args, connect_delay, run_delay, exp_success, exp_error",
+    [
+        ({}, 0, 0, True, None),
+        ({"connect_timeout": 0.01}, 1, 0, False, "connection to controller"),
+        ({"timeout": 0.01}, 0, 1, False, "command on controller"),
+        ({"deadline": 0.01}, 1, 0, False, "connection to controller"),
+        ({"deadline": 0.01}, 0, 1, False, "command on controller"),
+        ({"timeout": 1, "deadline": 0.01}, 0, 1, False, "command on controller"),
+    ],
+)
+@mock.patch("juju_spell.assignment.runner.get_controller")
+async def test_run_on_controller_timeout(
+    mock_get_controller, parsed_args, connect_delay, run_delay, exp_success, exp_error
+):
+    """Test run on controller with connect and execute timeouts."""
+
+    async def _get_controller(*args):
+        await asyncio.sleep(connect_delay)
+        return MagicMock()
+
+    async def _run(*args, **kwargs):
+        await asyncio.sleep(run_delay)
+        return Result(True, "OK")
+
+    mock_get_controller.side_effect = _get_controller
+    command = mock.AsyncMock()
+    command.pre_check.return_value = None
+    command.run.side_effect = _run
+    parsed_args = argparse.Namespace(dry_run=False, **parsed_args)
+    deadline = get_deadline(parsed_args)
+
+    result = await run_on_controller(
+        MagicMock(), command, parsed_args, range(17071, 17170), deadline
+    )
+
+    assert result["success"] is exp_success
+    if exp_error:
+        assert isinstance(result["error"], TimeoutError)
+        assert str(result["error"]).startswith(exp_error)
+
+
+@pytest.mark.asyncio
+@mock.patch("juju_spell.assignment.runner.get_controller", new_callable=mock.AsyncMock)
+async def test_run_serial_deadline(mock_get_controller):
+    """Test controllers not started before deadline fail with timeout error."""
+    config = Config(
+        controllers=[MagicMock(), MagicMock(), MagicMock()],
+        connection={"port-range": range(17071, 17170)},
+    )
+    command = mock.AsyncMock()
+
+    async def _run(*args, **kwargs):
+        await asyncio.sleep(0.05 if command.run.await_count > 1 else 0)
+        return Result(True, "OK")
+
+    command.pre_check.return_value = None
+    command.run.side_effect = _run
+    parsed_args = argparse.Namespace(dry_run=False, deadline=0.02)
+
+    results = await run_serial(config, command, parsed_args)
+
+    assert [result["success"] for result in results] == [True, False, False]
+    assert command.run.await_count == 2  # third controller did not even run
+
+
+@pytest.mark.asyncio
+@mock.patch("juju_spell.assignment.runner.get_controller", new_callable=mock.AsyncMock)
+async def test_run_on_controller_cache(mock_get_controller, controller_config):
+    """Test using cached result without connecting to controller."""
+    command = mock.AsyncMock()
+    command.name = "status"
+    command.pre_check.return_value = None
+    command.run.return_value = Result(True, "OK")
+    parsed_args = argparse.Namespace(dry_run=False, max_age=60)
+
+    first = await run_on_controller(controller_config, command, parsed_args, None)
+    second = await run_on_controller(controller_config, command, parsed_args, None)
+
+    assert first == second
+    assert second["output"] == "OK"
+    mock_get_controller.assert_awaited_once()
+    command.run.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "parsed_args, output",
+    [
+        ({"max_age": None}, Result(True, "OK")),
+        ({"max_age": 60}, Result(False, error=ValueError("failed"))),
+        ({"max_age": 60, "dry_run": True}, Result(True, "OK")),
+    ],
+)
+@mock.patch("juju_spell.assignment.runner.get_controller", new_callable=mock.AsyncMock)
+async def test_run_on_controller_not_cached(
+    mock_get_controller, controller_config, parsed_args, output
+):
+    """Test result is not cached without `--max-age`, for failure or dry-run."""
+    command = mock.AsyncMock()
+    command.name = "status"
+    command.pre_check.return_value = None
+    command.run.return_value = output
+    command.dry_run.return_value = output
+    parsed_args = argparse.Namespace(**{"dry_run": False, **parsed_args})
+
+    await run_on_controller(controller_config, command, parsed_args, None)
+    await run_on_controller(controller_config, command, parsed_args, None)
+
+    assert mock_get_controller.await_count == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("timings", [True, False])
+@mock.patch("juju_spell.assignment.runner.phase_timings", new_callable=PhaseTimings)
+@mock.patch("juju_spell.assignment.runner.get_controller", new_callable=mock.AsyncMock)
+async def test_run_on_controller_timings(
+    _, mock_phase_timings, controller_config, timings
+):
+    """Test attaching timings of phases to result context with `--timings`."""
+    command = mock.AsyncMock()
+    command.pre_check.return_value = None
+    command.run.return_value = Result(True, "OK")
+    mock_phase_timings.record(controller_config.name, "tunnel", 1.0)
+    parsed_args = argparse.Namespace(dry_run=False, timings=timings)
+
+    result = await run_on_controller(controller_config, command, parsed_args, None)
+
+    if timings:
+        assert set(result["context"]["timings"]) == {"tunnel", "pre_check", "execute"}
+        assert result["context"]["timings"]["tunnel"] == 1.0
+    else:
+        assert "timings" not in result["context"]
+
+    assert mock_phase_timings.pop_all() == {}  # timings are not left for next run
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("connect_error", [False, True])
+@mock.patch("juju_spell.assignment.runner.get_controller", new_callable=mock.AsyncMock)
+async def test_run_on_controller_events(
+    mock_get_controller, controller_config, connect_error
+):
+    """Test publishing events of run on controller in order."""
+    error = ValueError("failed")
+    if connect_error:
+        mock_get_controller.side_effect = error
+
+    command = mock.AsyncMock()
+    command.pre_check.return_value = None
+    command.run.return_value = output = Result(True, "OK")
+    parsed_args = argparse.Namespace(dry_run=False)
+    subscriber = MagicMock()
+
+    with event_bus.subscribed(Event, subscriber):
+        result = await run_parallel(
+            Config(controllers=[controller_config], connection={}),
+            command,
+            parsed_args,
+        )
+
+    if connect_error:
+        exp_events = [
+            ControllerConnectStart(controller_config),
+            ControllerConnectEnd(controller_config, error=error),
+            ResultReady(controller_config, result[0]),
+        ]
+    else:
+        exp_events = [
+            ControllerConnectStart(controller_config),
+            ControllerConnectEnd(controller_config),
+            CommandStart(controller_config, command),
+            CommandEnd(controller_config, command, output=output),
+            ResultReady(controller_config, result[0]),
+        ]
+
+    assert [args[0] for args, _ in subscriber.call_args_list] == exp_events
+
+
+@pytest.mark.parametrize(
+    "run_type, batch_mode, batch_size, exp_limit",
+    [
+        ("serial", None, None, None),
+        ("batch", None, 2, None),
+        ("batch", "wave", 2, None),
+        ("batch", "window", 2, 2),
+        ("batch", "window", None, 10),
+        ("parallel", None, None, 10),
+    ],
+)
+@mock.patch("juju_spell.assignment.runner.get_cached_output", return_value=None)
+@mock.patch("juju_spell.assignment.runner.connect_manager")
+def test_warm_up(mock_connect_manager, _, run_type, batch_mode, batch_size, exp_limit):
+    """Test warming up connections only for parallel run and window batches."""
+    config = Config(
+        controllers=[MagicMock(), MagicMock()],
+        connection={"port-range": range(17071, 17170)},
+    )
+    parsed_args = argparse.Namespace(
+        run_type=run_type, parallel=None, batch_mode=batch_mode, batch_size=batch_size
+    )
+
+    warm_up(config, MagicMock(), parsed_args)
+
+    if exp_limit is None:
+        mock_connect_manager.warm_up.assert_not_called()
+    else:
+        mock_connect_manager.warm_up.assert_called_once_with(
+            config.controllers, range(17071, 17170), exp_limit
+        )
@@ -15,12 +15,15 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Tests for base cli functions."""
 import argparse
+import asyncio
+import functools
 import os
 from unittest import mock
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from juju_spell.cli.utils import parse_positive_float, parse_positive_int
 from juju_spell.config import Controller
 from juju_spell.exceptions import JujuSpellError
 
@@ -33,6 +36,17 @@ def test_base_cmd_fill_parser(base_cmd):
     parser.assert_not_called()
 
 
+def test_base_cmd_lazy_config(base_cmd):
+    """Test config is loaded only on first access."""
+    load_config = MagicMock()
+    base_cmd.config = functools.partial(load_config, "config.yaml", lazy=True)
+
+    load_config.assert_not_called()
+    assert base_cmd.config == load_config.return_value
+    assert base_cmd.config == load_config.return_value
+    load_config.assert_called_once_with("config.yaml", lazy=True)
+
+
 def test_base_cmd_run(base_cmd):
     """Test run from BaseCMD."""
     parsed_args = argparse.Namespace(**{"test": True})
@@ -79,6 +93,32 @@ def test_base_cmd_format_output(output, exp_formatted_output, base_cmd):
     assert base_cmd.format_output(output) == exp_formatted_output
 
 
+@patch("juju_spell.cli.base.emit")
+def test_base_cmd_format_output_ndjson(mock_emit, base_cmd):
+    """Test formatter for output printing each record as soon as it is ready."""
+    records = iter([{"success": True, "output": 1}, {"success": False, "output": 2}])
+
+    assert base_cmd.format_output(records) == ""
+    mock_emit.message.assert_has_calls(
+        [
+            mock.call('{"success":true,"output":1}'),
+            mock.call('{"success":false,"output":2}'),
+        ]
+    )
+
+
+def test_base_cmd_run_empty_message(base_cmd):
+    """Test run from BaseCMD not printing empty message."""
+    base_cmd.before = base_cmd.after = MagicMock()
+    base_cmd.execute = MagicMock()
+    base_cmd.format_output = MagicMock(return_value="")
+
+    with patch("juju_spell.cli.base.emit") as mock_emit:
+        assert base_cmd.run(argparse.Namespace()) == 0
+
+    mock_emit.message.assert_not_called()
+
+
 @patch("juju_spell.cli.base.parse_filter")
 @patch("juju_spell.cli.base.parse_comma_separated_str")
 def test_base_juju_cmd_fill_parser(
@@ -103,6 +143,52 @@ def test_base_juju_cmd_fill_parser(
                 default="serial",
                 help="parallel, batch or serial",
             ),
+            mock.call(
+                "--parallel",
+                type=parse_positive_int,
+                required=False,
+                help=(
+                    "Maximum number of controllers processed at the same time. "
+                    "Overrides `connection.max-concurrency` from config."
+                ),
+            ),
+            mock.call(
+                "--batch-size",
+                type=parse_positive_int,
+                required=False,
+                help="Number of controllers in one batch. Defaults to `--parallel`.",
+            ),
+            mock.call(
+                "--batch-mode",
+                type=str,
+                choices=["wave", "window"],
+                default="wave",
+                help=(
+                    "wave: wait for the whole batch before starting next one, window: "
+                    "start next controller as soon as any controller in batch is done"
+                ),
+            ),
+            mock.call(
+                "--connect-timeout",
+                type=parse_positive_float,
+                required=False,
+                help="Time limit in seconds to connect to single controller.",
+            ),
+            mock.call(
+                "--timeout",
+                type=parse_positive_float,
+                required=False,
+                help="Time limit in seconds to run the command on single controller.",
+            ),
+            mock.call(
+                "--deadline",
+                type=parse_positive_float,
+                required=False,
+                help=(
+                    "Time limit in seconds for the whole run. Controllers not done "
+                    "before the deadline will fail with timeout error."
+                ),
+            ),
             mock.call(
                 "--filter",
                 type=mock_parse_filter,
@@ -110,12 +196,31 @@ def test_base_juju_cmd_fill_parser(
                 default="",
                 help=(
                     "Key-value pair comma separated string in double quotes e.g., "
-                    '"a=1,2,3 b=4,5,6". '
+                    '"a=1,2,3 b!=4,5,6 c=prod-* d=/^prod-[0-9]+$/". '
                 ),
             ),
             mock.call(
                 "--models", type=mock_parse_comma_separated_str, help="model filter"
             ),
+            mock.call(
+                "--format",
+                type=str,
+                choices=["json", "ndjson"],
+                default="json",
+                help=(
+                    "json: print results of all controllers at the end, ndjson: print "
+                    "result of each controller as soon as it is ready"
+                ),
+            ),
+            mock.call(
+                "--timings",
+                default=False,
+                action="store_true",
+                help=(
+                    "Add duration of each phase to results and print p50, p95 and max "
+                    "duration of phases to stderr."
+                ),
+            ),
         ]
     )
 
@@ -141,6 +246,162 @@ async def test_base_juju_cmd_execute(
     assert result == task.result.return_value
 
 
+@pytest.mark.parametrize(
+    "cmd_fixture, exp_batch_mode",
+    [
+        ("base_juju_cmd", "wave"),
+        ("juju_read_cmd", "window"),
+        ("juju_write_cmd", "wave"),
+    ],
+)
+def test_juju_cmd_default_batch_mode(cmd_fixture, exp_batch_mode, request):
+    """Test default batch mode for read and write commands."""
+    cmd = request.getfixturevalue(cmd_fixture)
+    parser = argparse.ArgumentParser()
+    cmd.fill_parser(parser)
+
+    assert parser.parse_args([]).batch_mode == exp_batch_mode
+
+
+@pytest.mark.parametrize(
+    "cmd_fixture, exp_max_age",
+    [("juju_read_cmd", True), ("juju_write_cmd", False)],
+)
+def test_juju_cmd_max_age(cmd_fixture, exp_max_age, request):
+    """Test only read commands could use cached results."""
+    cmd = request.getfixturevalue(cmd_fixture)
+    parser = argparse.ArgumentParser()
+    cmd.fill_parser(parser)
+
+    assert hasattr(parser.parse_args([]), "max_age") is exp_max_age
+
+
+@patch("juju_spell.cli.base.iter_run")
+@patch("juju_spell.cli.base.get_filtered_config")
+def test_base_juju_cmd_execute_ndjson(
+    mock_get_filtered_config, mock_iter_run, base_juju_cmd
+):
+    """Test BaseJujuCMD execute yielding results one by one."""
+    records = [{"output": 1}, {"output": 2}]
+
+    async def _iter_run(*args):
+        for record in records:
+            yield record
+
+    mock_iter_run.side_effect = _iter_run
+    parsed_args = argparse.Namespace(filter=None, format="ndjson")
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    results = base_juju_cmd.execute(parsed_args)
+
+    mock_iter_run.assert_not_called()  # nothing is run until results are consumed
+    assert list(results) == records
+    loop.close()
+    mock_iter_run.assert_called_once_with(
+        mock_get_filtered_config.return_value, mock.ANY, parsed_args
+    )
+
+
+@pytest.mark.parametrize(
+    "output_format, exp_type", [("json", list), ("ndjson", mock.MagicMock)]
+)
+@patch("juju_spell.cli.base.run_on_daemon")
+@patch("juju_spell.cli.base.is_daemon_running", return_value=True)
+@patch("juju_spell.cli.base.get_filtered_config")
+def test_base_juju_cmd_execute_daemon(
+    mock_get_filtered_config,
+    _,
+    mock_run_on_daemon,
+    output_format,
+    exp_type,
+    base_juju_cmd,
+):
+    """Test BaseJujuCMD execute running the command by daemon."""
+    mock_run_on_daemon.return_value = records = MagicMock()
+    records.__iter__.return_value = iter([{"output": 1}])
+    parsed_args = argparse.Namespace(filter=None, format=output_format, daemon=True)
+
+    result = base_juju_cmd.execute(parsed_args)
+
+    mock_run_on_daemon.assert_called_once_with(
+        base_juju_cmd.command, mock_get_filtered_config.return_value, parsed_args
+    )
+    assert isinstance(result, exp_type)
+
+
+@pytest.mark.parametrize("output_format", ["json", "ndjson"])
+@patch("juju_spell.cli.base.phase_timings")
+@patch("juju_spell.cli.base.run_on_daemon")
+@patch("juju_spell.cli.base.is_daemon_running", return_value=True)
+@patch("juju_spell.cli.base.get_filtered_config")
+def test_base_juju_cmd_timings(
+    _, __, mock_run_on_daemon, mock_phase_timings, output_format, base_juju_cmd, capsys
+):
+    """Test BaseJujuCMD printing timings report after the command."""
+    records = [
+        {"context": {"name": "controller-1", "timings": {"execute": 2.0}}},
+        {"context": {"name": "controller-2", "timings": {"execute": 1.0}}},
+    ]
+    mock_run_on_daemon.return_value = iter(records)
+    mock_phase_timings.pop_all.return_value = {"controller-1": {"disconnect": 0.5}}
+    parsed_args = argparse.Namespace(
+        filter=None, format=output_format, daemon=True, timings=True
+    )
+
+    assert list(base_juju_cmd.execute(parsed_args)) == records
+    base_juju_cmd.after(parsed_args)
+
+    assert capsys.readouterr().err.splitlines() == [
+        "phase         count       p50       p95       max",
+        "execute           2    1.000s    2.000s    2.000s",
+        "disconnect        1    0.500s    0.500s    0.500s",
+    ]
+
+
+@pytest.mark.parametrize("daemon, daemon_running", [(False, True), (None, True)])
+@patch("juju_spell.cli.base.run", new_callable=MagicMock)
+@patch("juju_spell.cli.base.asyncio")
+@patch("juju_spell.cli.base.run_on_daemon")
+@patch("juju_spell.cli.base.is_daemon_running")
+@patch("juju_spell.cli.base.get_filtered_config")
+def test_base_juju_cmd_execute_without_daemon(
+    _,
+    mock_is_daemon_running,
+    mock_run_on_daemon,
+    mock_asyncio,
+    mock_run,
+    daemon,
+    daemon_running,
+    base_juju_cmd,
+):
+    """Test BaseJujuCMD execute running the command without daemon by default."""
+    mock_is_daemon_running.return_value = daemon_running
+    parsed_args = argparse.Namespace(filter=None)
+    if daemon is not None:
+        parsed_args.daemon = daemon  # write commands do not have `--daemon`
+
+    base_juju_cmd.execute(parsed_args)
+
+    mock_run_on_daemon.assert_not_called()
+    mock_run.assert_called_once()
+
+
+@patch("juju_spell.cli.base.run_on_daemon")
+@patch("juju_spell.cli.base.is_daemon_running", return_value=False)
+@patch("juju_spell.cli.base.get_filtered_config")
+def test_base_juju_cmd_execute_daemon_not_running(
+    _, __, mock_run_on_daemon, base_juju_cmd
+):
+    """Test BaseJujuCMD execute failing if `--daemon` is used without daemon."""
+    parsed_args = argparse.Namespace(filter=None, daemon=True)
+
+    with pytest.raises(JujuSpellError, match="daemon is not running"):
+        base_juju_cmd.execute(parsed_args)
+
+    mock_run_on_daemon.assert_not_called()
+
+
 def test_base_juju_cmd_execute_exception(base_juju_cmd):
     """Test add additional CLI arguments with BaseJujuCMD."""
     parsed_args = argparse.Namespace(**{"filter": None})
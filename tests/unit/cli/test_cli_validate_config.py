@@ -0,0 +1,45 @@
+import argparse
+import functools
+
+import pytest
+import yaml
+
+from juju_spell.cli import ValidateConfigCMD
+from juju_spell.config import Config, load_config
+from juju_spell.exceptions import JujuSpellError
+
+
+def test_validate_config_cmd(controller_config):
+    """Test validating all controllers."""
+    controller_config.connection = None
+    config = Config(controllers=[controller_config, controller_config], lazy=True)
+    cmd = ValidateConfigCMD(config)
+
+    assert (
+        cmd.execute(argparse.Namespace()) == "configuration of 2 controllers is valid"
+    )
+
+
+def test_validate_config_cmd_invalid(controller_config):
+    """Test validating config with invalid controller."""
+    controller_config.connection = None
+    controller_config.endpoint = "not an endpoint"
+    cmd = ValidateConfigCMD(Config(controllers=[controller_config], lazy=True))
+
+    with pytest.raises(JujuSpellError, match="is invalid"):
+        cmd.execute(argparse.Namespace())
+
+
+def test_validate_config_cmd_not_lazy(tmp_path, test_config_dict):
+    """Test validating config loaded with full validation."""
+    test_config_dict["controllers"][0]["model_mapping"]["lma"] = {"lma": "lma"}
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(test_config_dict))
+    cmd = ValidateConfigCMD(functools.partial(load_config, path, lazy=True))
+
+    with pytest.raises(JujuSpellError) as exc_info:
+        cmd.execute(argparse.Namespace())
+
+    assert "controllers#0.model_mapping.lma must be a list" in str(
+        exc_info.value.__cause__
+    )
@@ -2,12 +2,17 @@ from argparse import ArgumentTypeError
 from unittest import mock
 
 import pytest
+from craft_cli import EmitterMode
 
 from juju_spell.cli.utils import (
     _get_value_from_prompt,
     confirm,
+    emit_debug,
+    emit_trace,
     parse_comma_separated_str,
     parse_filter,
+    parse_positive_float,
+    parse_positive_int,
 )
 from juju_spell.exceptions import Abort, JujuSpellError
 
@@ -93,6 +98,32 @@ def test_parse_comma_separated_str(string, exp_list):
     assert result == exp_list
 
 
+@pytest.mark.parametrize("value, exp_result", [("1", 1), ("10", 10), ("300", 300)])
+def test_parse_positive_int(value, exp_result):
+    """Test parsing positive integer."""
+    assert parse_positive_int(value) == exp_result
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "a", "1.5"])
+def test_parse_positive_int_exception(value):
+    """Test parse_positive_int raising exception."""
+    with pytest.raises(ArgumentTypeError):
+        parse_positive_int(value)
+
+
+@pytest.mark.parametrize("value, exp_result", [("1", 1.0), ("0.5", 0.5), ("30", 30.0)])
+def test_parse_positive_float(value, exp_result):
+    """Test parsing positive float."""
+    assert parse_positive_float(value) == exp_result
+
+
+@pytest.mark.parametrize("value", ["0", "-1.5", "a"])
+def test_parse_positive_float_exception(value):
+    """Test parse_positive_float raising exception."""
+    with pytest.raises(ArgumentTypeError):
+        parse_positive_float(value)
+
+
 @pytest.mark.parametrize(
     "value", ["a=1", "a=1,b=2,c='Gandalf'", "a=v1,v2,v3 b=v4,v5,v6"]
 )
@@ -108,3 +139,43 @@ def test_parse_filter_exception(value):
     """Test parse_filter raising exception."""
     with pytest.raises(ArgumentTypeError):
         parse_filter(value)
+
+
+def test_parse_filter_invalid_regex():
+    """Test parse_filter raising exception for invalid regular expression."""
+    with pytest.raises(ArgumentTypeError):
+        parse_filter("name=/[a/")
+
+
+@mock.patch("juju_spell.cli.utils.emit")
+def test_emit_debug(mock_emit):
+    """Test emitting debug message with summarized arguments."""
+    emit_debug("output of %s: %s", "status", {"models": list(range(100))})
+
+    mock_emit.debug.assert_called_once_with(
+        "output of status: {'models': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, ...]}"
+    )
+
+
+@pytest.mark.parametrize(
+    "mode, exp_formatted",
+    [
+        (EmitterMode.QUIET, False),
+        (EmitterMode.BRIEF, False),
+        (EmitterMode.DEBUG, False),
+        (EmitterMode.TRACE, True),
+    ],
+)
+@mock.patch("juju_spell.cli.utils.emit")
+def test_emit_trace(mock_emit, mode, exp_formatted):
+    """Test emitting trace message, which is formatted only in trace mode."""
+    output = mock.MagicMock()
+    mock_emit.get_mode.return_value = mode
+
+    emit_trace("raw output: %s", output)
+
+    if exp_formatted:
+        mock_emit.trace.assert_called_once_with(f"raw output: {output}")
+    else:
+        mock_emit.trace.assert_not_called()
+        output.__str__.assert_not_called()
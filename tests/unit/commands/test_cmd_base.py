@@ -1,7 +1,10 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, call
 
 import pytest
 
+from juju_spell.assignment.events import Event, ModelClose, ModelOpen, event_bus
+
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
@@ -65,6 +68,117 @@ async def test_get_filtered_models_mapping(
     assert mock_model.disconnect.await_count == len(models)
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [1, 2, 5])
+async def test_iter_models_concurrently(limit, test_juju_command):
+    """Test running function on models concurrently with limit."""
+    durations = {"model1": 3, "model2": 1, "model3": 2}
+    running, max_running = 0, 0
+    mock_controller = AsyncMock()
+    mock_controller.list_models.return_value = list(durations)
+    mock_controller.get_model.side_effect = lambda name: AsyncMock(name=name)
+
+    async def _func(name, model):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(running, max_running)
+        await asyncio.sleep(0.01 * durations[name])
+        running -= 1
+        return durations[name]
+
+    outputs = [
+        output
+        async for output in test_juju_command.iter_models_concurrently(
+            mock_controller, _func, {}, limit=limit
+        )
+    ]
+
+    assert dict(outputs) == durations
+    assert max_running == min(limit, len(durations))
+    if limit >= len(durations):
+        # outputs are yielded as soon as they are ready
+        assert [name for name, _ in outputs] == ["model2", "model3", "model1"]
+
+
+@pytest.mark.asyncio
+async def test_iter_models_concurrently_ordered(test_juju_command):
+    """Test running function on models concurrently with outputs in order."""
+    durations = {"model1": 3, "model2": 1, "model3": 2}
+    mock_controller = AsyncMock()
+    mock_controller.list_models.return_value = list(durations)
+    mock_controller.get_model.side_effect = lambda name: AsyncMock(name=name)
+
+    async def _func(name, model):
+        await asyncio.sleep(0.01 * durations[name])
+        return durations[name]
+
+    outputs = [
+        output
+        async for output in test_juju_command.iter_models_concurrently(
+            mock_controller, _func, {}, limit=3, ordered=True
+        )
+    ]
+
+    assert outputs == list(durations.items())
+
+
+@pytest.mark.asyncio
+async def test_models_events(test_juju_command):
+    """Test publishing events when model is opened and closed."""
+    mock_controller = AsyncMock()
+    mock_controller.controller_uuid = "1"
+    subscriber = MagicMock()
+
+    with event_bus.subscribed(Event, subscriber):
+        async for _ in test_juju_command.get_filtered_models(
+            mock_controller, {}, ["model1"]
+        ):
+            subscriber.assert_called_once_with(ModelOpen("1", "model1"))
+
+        async for _ in test_juju_command.iter_models_concurrently(
+            mock_controller, AsyncMock(), {}, ["model2"]
+        ):
+            pass
+
+    subscriber.assert_has_calls(
+        [
+            call(ModelOpen("1", "model1")),
+            call(ModelClose("1", "model1")),
+            call(ModelOpen("1", "model2")),
+            call(ModelClose("1", "model2")),
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_iter_models_concurrently_exception(test_juju_command):
+    """Test running function on models, which failed on one model."""
+    models = {name: AsyncMock() for name in ["model1", "model2"]}
+    mock_controller = AsyncMock()
+    mock_controller.get_model.side_effect = lambda name: models[name]
+    cancelled = asyncio.Event()
+
+    async def _func(name, model):
+        if name == "model1":
+            raise ValueError("failed")
+
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(ValueError):
+        async for _ in test_juju_command.iter_models_concurrently(
+            mock_controller, _func, {}, list(models)
+        ):
+            pass
+
+    assert cancelled.is_set()
+    for model in models.values():
+        model.disconnect.assert_awaited_once()
+
+
 @pytest.mark.asyncio
 async def test_run(test_juju_command):
     """Test run for any juju command."""
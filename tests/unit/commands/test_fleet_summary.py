@@ -0,0 +1,87 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from juju.client import client
+
+from juju_spell.commands.fleet_summary import FleetSummaryCommand
+
+
+def _get_model_status(**kwargs) -> client.ModelStatus:
+    """Get model status."""
+    return client.ModelStatus(
+        application_count=2,
+        unit_count=5,
+        hosted_machine_count=3,
+        life="alive",
+        type_="iaas",
+        machines=[
+            client.ModelMachineInfo(id_="0", status="started"),
+            client.ModelMachineInfo(id_="1", status="started"),
+            client.ModelMachineInfo(id_="2", status="down"),
+        ],
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "models, model_mapping, exp_models",
+    [
+        (None, {}, ["controller", "model1", "model2"]),
+        (["model1"], {}, ["model1"]),
+        (["default"], {"default": ["model2"]}, ["model2"]),
+    ],
+)
+@patch("juju_spell.commands.fleet_summary.client.ModelManagerFacade.from_connection")
+async def test_execute(mock_from_connection, models, model_mapping, exp_models):
+    """Test execute function for FleetSummaryCommand."""
+    controller = AsyncMock()
+    controller.connection = MagicMock()
+    controller.model_uuids.return_value = model_uuids = {
+        "controller": "uuid-0",
+        "model1": "uuid-1",
+        "model2": "uuid-2",
+    }
+    facade = mock_from_connection.return_value = AsyncMock()
+    facade.ModelStatus.return_value = client.ModelStatusResults(
+        models=[_get_model_status() for _ in exp_models]
+    )
+    controller_config = MagicMock()
+    controller_config.model_mapping = model_mapping
+
+    result = await FleetSummaryCommand().execute(
+        controller, models, controller_config=controller_config
+    )
+
+    mock_from_connection.assert_called_once_with(controller.connection.return_value)
+    entities = facade.ModelStatus.call_args.kwargs["entities"]
+    assert [entity.tag for entity in entities] == [
+        f"model-{model_uuids[name]}" for name in exp_models
+    ]
+    assert list(result) == exp_models
+    assert result[exp_models[0]] == {
+        "type": "iaas",
+        "life": "alive",
+        "application_count": 2,
+        "unit_count": 5,
+        "machine_count": 3,
+        "machine_status": {"started": 2, "down": 1},
+    }
+    controller.get_model.assert_not_called()  # no model connection
+
+
+@pytest.mark.asyncio
+@patch("juju_spell.commands.fleet_summary.client.ModelManagerFacade.from_connection")
+async def test_execute_model_error(mock_from_connection):
+    """Test execute function for FleetSummaryCommand with failed model."""
+    controller = AsyncMock()
+    controller.connection = MagicMock()
+    controller.model_uuids.return_value = {"model1": "uuid-1"}
+    facade = mock_from_connection.return_value = AsyncMock()
+    facade.ModelStatus.return_value = client.ModelStatusResults(
+        models=[client.ModelStatus(error=client.Error(message="permission denied"))]
+    )
+
+    result = await FleetSummaryCommand().execute(controller)
+
+    assert result == {"model1": {"error": "permission denied"}}
@@ -1,33 +1,133 @@
-from typing import AsyncGenerator, List
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from juju.client._definitions import FullStatus
 
 from juju_spell.commands.status import StatusCommand
 from juju_spell.config import Controller
 
 
-async def _async_generator(values: List) -> AsyncGenerator:
-    """Async generator."""
-    for value in values:
-        yield value
+def _get_model() -> AsyncMock:
+    """Get mocked model with status."""
+    model = AsyncMock()
+    model.get_status.return_value = FullStatus(
+        applications={"nova": {}}, machines={"0": {}}, relations=[{"id": 0}]
+    )
+    return model
 
 
 @pytest.mark.asyncio
-@patch("juju_spell.commands.base.BaseJujuCommand.get_filtered_models")
-async def test_execute(mocked_models):
+@pytest.mark.parametrize("model_parallel", [None, 1, 2])
+async def test_execute(model_parallel):
     """Test execute function for StatusCommand."""
-    models = [("model1", AsyncMock()), ("model2", AsyncMock())]
+    models = {"model1": _get_model(), "model2": _get_model()}
     contoller_config = MagicMock(Controller)
     contoller_config.model_mapping = None
-    mocked_models.return_value = _async_generator(models)
+    controller = AsyncMock()
+    controller.get_model.side_effect = lambda name: models[name]
     status = StatusCommand()
 
     results = await status.execute(
-        MagicMock(), models, **{"controller_config": contoller_config}
+        controller,
+        list(models),
+        model_parallel=model_parallel,
+        **{"controller_config": contoller_config}
+    )
+
+    assert list(results) == list(models)
+    for name, model in models.items():
+        assert list(results[name]["applications"]) == ["nova"]
+        assert "relations" not in results[name]
+        assert "storage" not in results[name]
+        model.get_status.assert_awaited_once_with(filters=None)
+        model.disconnect.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("model_parallel, exp_max_running", [(None, 1), (3, 3)])
+async def test_execute_model_parallel(model_parallel, exp_max_running):
+    """Test models are processed one by one by default and output is in order."""
+    durations = {"model1": 3, "model2": 1, "model3": 2}
+    running, max_running = 0, 0
+    contoller_config = MagicMock(Controller)
+    contoller_config.model_mapping = None
+    controller = AsyncMock()
+
+    def _get_model(name):
+        async def _get_status(**_):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(running, max_running)
+            await asyncio.sleep(0.01 * durations[name])
+            running -= 1
+            return FullStatus(applications={name: {}})
+
+        model = AsyncMock()
+        model.get_status.side_effect = _get_status
+        return model
+
+    controller.get_model.side_effect = _get_model
+
+    results = await StatusCommand().execute(
+        controller,
+        list(durations),
+        model_parallel=model_parallel,
+        **{"controller_config": contoller_config}
+    )
+
+    assert list(results) == list(durations)
+    assert max_running == exp_max_running
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("relations", [True, False])
+@pytest.mark.parametrize("storage", [True, False])
+@patch("juju_spell.commands.status.StatusCommand.get_storage")
+async def test_execute_sections(mock_get_storage, relations, storage):
+    """Test execute function for StatusCommand with requested sections."""
+    model = _get_model()
+    contoller_config = MagicMock(Controller)
+    contoller_config.model_mapping = None
+    controller = AsyncMock()
+    controller.get_model.return_value = model
+    patterns = ["nova*", "ceph-osd/0"]
+
+    results = await StatusCommand().execute(
+        controller,
+        ["model1"],
+        patterns=patterns,
+        relations=relations,
+        storage=storage,
+        **{"controller_config": contoller_config}
     )
 
-    assert len(results) == len(models)
-    for name, model in models:
-        assert results[name] == model.get_status.return_value
-        model.get_status.assert_awaited_once()
+    model.get_status.assert_awaited_once_with(filters=patterns)
+    assert ("relations" in results["model1"]) == relations
+    assert ("storage" in results["model1"]) == storage
+    if storage:
+        mock_get_storage.assert_awaited_once_with(model)
+        assert results["model1"]["storage"] == mock_get_storage.return_value
+    else:
+        mock_get_storage.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("juju_spell.commands.status.client.StorageFacade.from_connection")
+async def test_get_storage(mock_from_connection):
+    """Test getting storage details of model."""
+    details = [MagicMock(), MagicMock(), MagicMock()]
+    facade = mock_from_connection.return_value = AsyncMock()
+    facade.ListStorageDetails.return_value = MagicMock(
+        results=[
+            MagicMock(result=details[:2]),
+            MagicMock(result=None),
+            MagicMock(result=details[2:]),
+        ]
+    )
+    model = MagicMock()
+
+    storage = await StatusCommand.get_storage(model)
+
+    mock_from_connection.assert_called_once_with(model.connection.return_value)
+    assert storage == details
@@ -1,5 +1,6 @@
 import io
 from pathlib import Path
+from unittest import mock
 
 import pytest
 import yaml
@@ -150,3 +151,35 @@ def fixture_mock_load_config_file(test_config_path, test_personal_config_path):
         return ""
 
     return _mock_func
+
+
+@pytest.fixture(autouse=True)
+def port_lease_dir(tmp_path) -> Path:
+    """Use temporary directory for port leases."""
+    path = tmp_path / "ports"
+    with mock.patch("juju_spell.connections.network.PORT_LEASE_DIR", path):
+        yield path
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path) -> Path:
+    """Use temporary directory for cached results."""
+    path = tmp_path / "cache" / "results"
+    with mock.patch("juju_spell.cache.result_cache.path", path):
+        yield path
+
+
+@pytest.fixture(autouse=True)
+def config_cache_dir(tmp_path) -> Path:
+    """Use temporary directory for cached config."""
+    path = tmp_path / "cache" / "config"
+    with mock.patch("juju_spell.config.CONFIG_CACHE_DIR", path):
+        yield path
+
+
+@pytest.fixture(autouse=True)
+def config_shards_cache_dir(tmp_path) -> Path:
+    """Use temporary directory for cached files from config directory."""
+    path = tmp_path / "cache" / "config" / "config.d"
+    with mock.patch("juju_spell.config.CONFIG_SHARDS_CACHE_DIR", path):
+        yield path
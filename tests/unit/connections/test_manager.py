@@ -1,4 +1,7 @@
+import asyncio
+import dataclasses
 import io
+import threading
 import unittest
 from unittest import mock
 from unittest.mock import AsyncMock, MagicMock
@@ -9,6 +12,8 @@ import yaml
 from juju.errors import JujuAPIError, JujuConnectionError
 
 from juju_spell import config as juju_spell_config
+from juju_spell.connections.manager import _get_key
+from juju_spell.timings import phase_timings
 from tests.unit.conftest import TEST_CONFIG, TEST_PERSONAL_CONFIG
 
 
@@ -80,6 +85,33 @@ async def test_controller_direct_connection_timeout():
         )
 
 
+@pytest.mark.asyncio
+async def test_controller_direct_connection_tunnel_exited():
+    """Test direct connection to controller failing if the tunnel exited."""
+    from juju_spell.connections.manager import controller_direct_connection
+    from juju_spell.exceptions import TunnelError
+
+    mock_controller = AsyncMock()
+    mock_controller._connector.connect.side_effect = JujuConnectionError
+    connection_process = MagicMock()
+    connection_process.check.side_effect = [None, TunnelError("exited with code 255")]
+
+    with pytest.raises(TunnelError, match="exited with code 255"):
+        await controller_direct_connection(
+            mock_controller,
+            uuid4(),
+            "test",
+            "localhost:1234",
+            "user",
+            "password",
+            "ca_cert",
+            connection_process,
+        )
+
+    mock_controller._connector.connect.assert_awaited_once()
+    assert connection_process.check.call_count == 2
+
+
 @pytest.mark.asyncio
 async def test_controller_direct_connection_exception():
     """Test direct connection to controller with reties."""
@@ -141,6 +173,9 @@ class TestConnectManager(unittest.IsolatedAsyncioTestCase):
     def tearDown(self) -> None:
         """Clean up after tests."""
         self.connect_manager.connections.clear()
+        self.connect_manager.pending.clear()
+        # NOTE: ConnectManager is singleton, so mocked methods need to be removed
+        vars(self.connect_manager).pop("_connect", None)
 
     def test_new_object(self):
         """Test get new object."""
@@ -165,11 +200,14 @@ class TestConnectManager(unittest.IsolatedAsyncioTestCase):
         with mock.patch(
             "juju_spell.connections.manager.get_connection"
         ) as mock_get_connection:
-            mock_get_connection.return_value = exp_endpoint, MagicMock()
+            connection_process = MagicMock(wait_ready=AsyncMock())
+            mock_get_connection.return_value = exp_endpoint, connection_process
             controller = await self.connect_manager._connect(config, port_range)
             mock_get_connection.assert_called_once_with(config, port_range, False)
 
         assert controller == mocked_controller
+        connection_process.connect.assert_called_once()
+        connection_process.wait_ready.assert_awaited_once()
         mock_controller_direct_connection.assert_called_once_with(
             mocked_controller,
             uuid=config.uuid,
@@ -178,8 +216,106 @@ class TestConnectManager(unittest.IsolatedAsyncioTestCase):
             username=config.user,
             password=config.password,
             cacert=config.ca_cert,
+            connection_process=connection_process,
+        )
+        assert _get_key(config) in self.connect_manager.connections
+        assert set(phase_timings.pop(config.name)) == {"tunnel", "login"}
+
+    @mock.patch("juju_spell.connections.manager.get_connection")
+    @mock.patch("juju_spell.connections.manager.juju.Controller")
+    @mock.patch("juju_spell.connections.manager.controller_direct_connection")
+    async def test_connect_prepared_connection(
+        self, mock_controller_direct_connection, _, mock_get_connection
+    ):
+        """Test connection with connection prepared in advance."""
+        config = self.controller_config_1
+        connection_process = MagicMock(wait_ready=AsyncMock())
+
+        await self.connect_manager._connect(
+            config, range(17071, 17170), False, ("localhost:17071", connection_process)
+        )
+
+        mock_get_connection.assert_not_called()
+        connection_process.connect.assert_called_once()
+        assert (
+            mock_controller_direct_connection.call_args.kwargs["endpoint"]
+            == "localhost:17071"
+        )
+        assert self.connect_manager.connections[
+            _get_key(config)
+        ].connection_process == (connection_process)
+
+    @mock.patch("juju_spell.connections.manager.get_connection")
+    @mock.patch("juju_spell.connections.manager.juju.Controller")
+    @mock.patch("juju_spell.connections.manager.controller_direct_connection")
+    async def test_connect_port_collision(
+        self, mock_controller_direct_connection, _, mock_get_connection
+    ):
+        """Test connection retried with another port after port collision."""
+        from juju_spell.exceptions import PortCollisionError
+
+        config = self.controller_config_1
+        process_1 = MagicMock(wait_ready=AsyncMock(side_effect=PortCollisionError()))
+        process_2 = MagicMock(wait_ready=AsyncMock())
+        mock_get_connection.side_effect = [
+            ("localhost:17071", process_1),
+            ("localhost:17072", process_2),
+        ]
+
+        await self.connect_manager._connect(config, range(17071, 17170))
+
+        process_1.clean.assert_called_once()
+        process_2.clean.assert_not_called()
+        assert (
+            mock_controller_direct_connection.call_args.kwargs["endpoint"]
+            == "localhost:17072"
         )
-        assert config.name in self.connect_manager.connections
+        assert self.connect_manager.connections[
+            _get_key(config)
+        ].connection_process == (process_2)
+
+    @mock.patch("juju_spell.connections.manager.get_connection")
+    @mock.patch("juju_spell.connections.manager.juju.Controller")
+    @mock.patch("juju_spell.connections.manager.controller_direct_connection")
+    async def test_connect_prepared_connection_not_usable(
+        self, mock_controller_direct_connection, _, mock_get_connection
+    ):
+        """Test connection with own connection, if prepared one is not usable."""
+        config = self.controller_config_1
+        prepared_process = MagicMock(is_usable=False)
+        process = MagicMock(wait_ready=AsyncMock())
+        mock_get_connection.return_value = ("localhost:17072", process)
+
+        await self.connect_manager._connect(
+            config, range(17071, 17170), False, ("localhost:17071", prepared_process)
+        )
+
+        prepared_process.clean.assert_called_once()
+        prepared_process.connect.assert_not_called()
+        process.connect.assert_called_once()
+        assert (
+            mock_controller_direct_connection.call_args.kwargs["endpoint"]
+            == "localhost:17072"
+        )
+
+    @mock.patch("juju_spell.connections.manager.get_connection")
+    @mock.patch("juju_spell.connections.manager.juju.Controller")
+    @mock.patch("juju_spell.connections.manager.controller_direct_connection")
+    async def test_connect_port_collision_exception(
+        self, mock_controller_direct_connection, _, mock_get_connection
+    ):
+        """Test connection failing after too many port collisions."""
+        from juju_spell.exceptions import PortCollisionError
+
+        config = self.controller_config_1
+        process = MagicMock(wait_ready=AsyncMock(side_effect=PortCollisionError()))
+        mock_get_connection.return_value = ("localhost:17071", process)
+
+        with pytest.raises(PortCollisionError):
+            await self.connect_manager._connect(config, range(17071, 17170))
+
+        assert mock_get_connection.call_count == 4
+        mock_controller_direct_connection.assert_not_called()
 
     async def test_clean(self):
         """Test clean function."""
@@ -197,15 +333,29 @@ class TestConnectManager(unittest.IsolatedAsyncioTestCase):
         # test clean functions
         await self.connect_manager.clean()
         assert len(self.connect_manager.connections) == 0
-        for connection in connections:
+        for i, connection in enumerate(connections):
             connection.controller.disconnect.assert_called_once()
             connection.connection_process.clean.assert_called_once()
+            assert set(phase_timings.pop(f"test-{i}")) == {"disconnect"}
 
     async def test_get_controller_invalid_controller_config(self):
         """Test function to get controller with invalid controller config."""
         with pytest.raises(AssertionError):
             await self.connect_manager.get_controller({"name": "test"})
 
+    async def test_get_controller_same_name(self):
+        """Test getting controllers with same name, but different UUID."""
+        config_1 = self.controller_config_1
+        config_2 = dataclasses.replace(config_1, uuid=uuid4())
+        self.connect_manager._connect = mock_connect = AsyncMock()
+
+        await self.connect_manager.get_controller(config_1)
+        self.connect_manager.connections[_get_key(config_1)] = MagicMock()
+        await self.connect_manager.get_controller(config_2)
+
+        assert _get_key(config_1) != _get_key(config_2)
+        assert mock_connect.await_count == 2
+
     async def test_get_controller_new_controller(self):
         """Test function to get controller."""
         config = self.controller_config_1
@@ -220,12 +370,16 @@ class TestConnectManager(unittest.IsolatedAsyncioTestCase):
         """Test function to get controller with reconnection."""
         config = self.controller_config_1
         self.connect_manager._connect = mock_connect = AsyncMock()
-        self.connect_manager.connections[config.name] = mocked_connection = AsyncMock()
+        self.connect_manager.connections[_get_key(config)] = (
+            mocked_connection
+        ) = AsyncMock()
+        mocked_connection.connection_process = MagicMock()
         mocked_connection.controller.is_connected = lambda: True
 
         controller = await self.connect_manager.get_controller(config, reconnect=True)
 
         mocked_connection.controller.disconnect.assert_called_once()
+        mocked_connection.connection_process.clean.assert_called_once()
         mock_connect.assert_called_once_with(config, range(17071, 17170), False)
         assert controller == mock_connect.return_value
 
@@ -235,20 +389,249 @@ class TestConnectManager(unittest.IsolatedAsyncioTestCase):
         self.connect_manager._connect = mock_connect = AsyncMock()
         mocked_connection = AsyncMock()
         mocked_connection.controller = mock_controller = MagicMock()
+        mocked_connection.connection_process = MagicMock()
         mock_controller.is_connected.return_value = False
-        self.connect_manager.connections[config.name] = mocked_connection
+        mock_controller.disconnect = AsyncMock()
+        self.connect_manager.connections[_get_key(config)] = mocked_connection
 
         controller = await self.connect_manager.get_controller(config, reconnect=False)
 
+        mock_controller.disconnect.assert_awaited_once()
+        mocked_connection.connection_process.clean.assert_called_once()
         mock_connect.assert_called_once_with(config, range(17071, 17170), False)
         assert controller == mock_connect.return_value
 
     async def test_get_controller_existing_controller(self):
         """Test function to get controller, which already exists."""
         config = self.controller_config_1
-        self.connect_manager.connections[config.name] = mocked_connection = AsyncMock()
+        self.connect_manager.connections[_get_key(config)] = (
+            mocked_connection
+        ) = AsyncMock()
         mocked_connection.controller.is_connected = lambda: True
 
         controller = await self.connect_manager.get_controller(config)
 
         assert controller == mocked_connection.controller
+
+    @mock.patch("juju_spell.connections.manager.get_connections")
+    async def test_warm_up(self, mock_get_connections):
+        """Test connecting to multiple controllers concurrently with limit."""
+        running, max_running = 0, 0
+
+        async def _connect(controller_config, *_):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(running, max_running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return controller_config.name
+
+        controllers = [MagicMock() for _ in range(5)]
+        self.connect_manager._connect = mock_connect = AsyncMock(side_effect=_connect)
+        connections = mock_get_connections.return_value = MagicMock()
+
+        results = await self.connect_manager.warm_up(controllers, range(1, 2), 2)
+
+        assert results == [controller.name for controller in controllers]
+        assert max_running == 2
+        assert mock_connect.await_count == 5
+        mock_get_connections.assert_called_once_with(controllers, range(1, 2), False)
+        mock_connect.assert_any_await(
+            controllers[0],
+            range(1, 2),
+            False,
+            connections.__getitem__.return_value,
+        )
+        assert len(self.connect_manager.pending) == 0
+
+    async def test_warm_up_exception(self):
+        """Test warm up does not raise exception, but get_controller does."""
+        config = self.controller_config_1
+        error = ConnectionError("failed")
+        self.connect_manager._connect = mock_connect = AsyncMock(side_effect=error)
+
+        self.connect_manager.warm_up([config])
+        with pytest.raises(ConnectionError):
+            await self.connect_manager.get_controller(config)
+
+        mock_connect.assert_awaited_once()
+
+    @mock.patch("juju_spell.connections.manager.get_connections")
+    async def test_warm_up_exception_consumed(self, _):
+        """Test failed warm up is raised by get_controller without connecting again."""
+        config = self.controller_config_1
+        error = ConnectionError("failed")
+        self.connect_manager._connect = mock_connect = AsyncMock(side_effect=error)
+
+        await self.connect_manager.warm_up([config])
+        with pytest.raises(ConnectionError) as exc_info:
+            await self.connect_manager.get_controller(config)
+
+        assert exc_info.value is error
+        mock_connect.assert_awaited_once()
+        assert _get_key(config) not in self.connect_manager.pending
+
+        # the failure was consumed, so the next get_controller connects again
+        mock_connect.side_effect = None
+        await self.connect_manager.get_controller(config)
+        assert mock_connect.await_count == 2
+
+    @mock.patch("juju_spell.connections.manager.get_connections")
+    async def test_warm_up_replace_failed(self, _):
+        """Test warm up connecting again, if failure was not consumed."""
+        config = self.controller_config_1
+        self.connect_manager._connect = mock_connect = AsyncMock(
+            side_effect=[ConnectionError("failed"), "controller"]
+        )
+
+        await self.connect_manager.warm_up([config])
+        results = await self.connect_manager.warm_up([config])
+
+        assert results == ["controller"]
+        assert mock_connect.await_count == 2
+        assert _get_key(config) not in self.connect_manager.pending
+
+    @mock.patch("juju_spell.connections.manager.get_connections")
+    async def test_warm_up_dropped(self, _):
+        """Test warm up cleaning dropped connection before connecting again."""
+        config = self.controller_config_1
+        self.connect_manager._connect = mock_connect = AsyncMock()
+        mocked_connection = MagicMock()
+        mocked_connection.controller.is_connected.return_value = False
+        mocked_connection.controller.disconnect = AsyncMock()
+        self.connect_manager.connections[_get_key(config)] = mocked_connection
+
+        await self.connect_manager.warm_up([config])
+
+        mocked_connection.controller.disconnect.assert_awaited_once()
+        mocked_connection.connection_process.clean.assert_called_once()
+        mock_connect.assert_awaited_once()
+        assert _get_key(config) not in self.connect_manager.connections
+
+    async def test_warm_up_skip_connected(self):
+        """Test warm up skipping already connected controllers."""
+        config = self.controller_config_1
+        self.connect_manager._connect = mock_connect = AsyncMock()
+        self.connect_manager.connections[_get_key(config)] = (
+            mocked_connection
+        ) = AsyncMock()
+        mocked_connection.controller.is_connected = lambda: True
+
+        await self.connect_manager.warm_up([config])
+
+        mock_connect.assert_not_called()
+
+    async def test_get_controller_pending(self):
+        """Test function to get controller waiting for connection in progress."""
+        config = self.controller_config_1
+        connected = asyncio.Event()
+
+        async def _connect(*_):
+            await connected.wait()
+            return "controller"
+
+        self.connect_manager._connect = mock_connect = AsyncMock(side_effect=_connect)
+        self.connect_manager.warm_up([config])
+        get_controller = asyncio.ensure_future(
+            self.connect_manager.get_controller(config)
+        )
+        await asyncio.sleep(0)
+        connected.set()
+
+        assert await get_controller == "controller"
+        mock_connect.assert_awaited_once()
+
+    @mock.patch("juju_spell.connections.manager.get_connection")
+    async def test_connect_cancelled(self, mock_get_connection):
+        """Test cleaning connection prepared after connecting was cancelled."""
+        config = self.controller_config_1
+        prepared = threading.Event()
+        connection_process = MagicMock()
+
+        def _get_connection(*_):
+            prepared.wait(1)
+            return "localhost:17071", connection_process
+
+        mock_get_connection.side_effect = _get_connection
+        task = asyncio.ensure_future(
+            self.connect_manager._connect(config, range(17071, 17170))
+        )
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        prepared.set()
+        for _ in range(100):
+            if connection_process.clean.called:
+                break
+
+            await asyncio.sleep(0.01)
+
+        connection_process.clean.assert_called_once()
+
+        connection_process.connect.assert_not_called()
+
+    @mock.patch("juju_spell.connections.manager.get_connections")
+    async def test_clean_pending_not_prepared(self, mock_get_connections):
+        """Test clean function cleaning connections prepared after it was called."""
+        config = self.controller_config_1
+        prepared = threading.Event()
+        connection_process = MagicMock()
+
+        def _get_connections(*_):
+            prepared.wait(1)
+            return {config.name: ("localhost:17071", connection_process)}
+
+        mock_get_connections.side_effect = _get_connections
+        self.connect_manager._connect = mock_connect = AsyncMock()
+
+        self.connect_manager.warm_up([config])
+        await asyncio.sleep(0.01)
+        await self.connect_manager.clean()
+        prepared.set()
+        for _ in range(100):
+            if connection_process.clean.called:
+                break
+
+            await asyncio.sleep(0.01)
+
+        connection_process.clean.assert_called_once()
+
+        mock_connect.assert_not_called()
+
+    @mock.patch("juju_spell.connections.manager.get_connections")
+    async def test_clean_pending_not_started(self, mock_get_connections):
+        """Test clean function cleaning connections, which were not started."""
+        config = self.controller_config_1
+        connection_process = MagicMock()
+        mock_get_connections.return_value = {
+            config.name: ("localhost:17071", connection_process)
+        }
+        self.connect_manager._connect = mock_connect = AsyncMock()
+
+        self.connect_manager.warm_up([config], limit=0)  # nothing could be started
+        await asyncio.sleep(0.01)
+        await self.connect_manager.clean()
+
+        mock_connect.assert_not_called()
+        connection_process.clean.assert_called_once()
+
+    async def test_clean_pending(self):
+        """Test clean function cancelling connections in progress."""
+        config = self.controller_config_1
+        started = asyncio.Event()
+
+        async def _connect(*_):
+            started.set()
+            await asyncio.sleep(10)
+
+        self.connect_manager._connect = AsyncMock(side_effect=_connect)
+        warm_up = self.connect_manager.warm_up([config])
+        task = self.connect_manager.pending[_get_key(config)]
+        await started.wait()
+
+        await self.connect_manager.clean()
+
+        assert task.cancelled()
+        assert isinstance((await warm_up)[0], asyncio.CancelledError)
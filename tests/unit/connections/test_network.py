@@ -1,3 +1,5 @@
+import asyncio
+import io
 import socket
 import subprocess
 import unittest
@@ -28,31 +30,87 @@ def test_is_port_free(mock_socket, return_code, exp_result):
 
 @mock.patch("juju_spell.connections.network._is_port_free")
 @mock.patch("juju_spell.connections.network.random.shuffle")
-def test_get_free_tcp_port(mock_random_shuffle, mock_is_port_free):
-    """Test getting free TCP port."""
-    from juju_spell.connections.network import get_free_tcp_port
+def test_lease_tcp_port(mock_random_shuffle, mock_is_port_free, port_lease_dir):
+    """Test leasing free TCP port."""
+    from juju_spell.connections.network import lease_tcp_port
 
     exp_port = 17073
     mock_is_port_free.side_effect = [False, False, True, False]
 
-    port = get_free_tcp_port(range(17071, 17075))
+    lease = lease_tcp_port(range(17071, 17075))
 
     mock_random_shuffle.assert_called_once_with([17071, 17072, 17073, 17074])
     mock_is_port_free.assert_has_calls(
         [mock.call(17071), mock.call(17072), mock.call(17073)]
     )
-    assert port == exp_port
+    assert lease.port == exp_port
+    assert (port_lease_dir / f"{exp_port}.lock").exists()
+    lease.release()
+    assert not (port_lease_dir / f"{exp_port}.lock").exists()
 
 
+@mock.patch("juju_spell.connections.network._is_port_free", return_value=True)
+def test_lease_tcp_port_leased(_):
+    """Test leasing TCP port skipping ports leased by others."""
+    from juju_spell.connections.network import lease_tcp_port
+
+    lease_1 = lease_tcp_port(range(17071, 17073))
+    lease_2 = lease_tcp_port(range(17071, 17073))
+
+    assert {lease_1.port, lease_2.port} == {17071, 17072}
+
+    lease_1.release()
+    lease_3 = lease_tcp_port(range(17071, 17073))
+    assert lease_3.port == lease_1.port
+    lease_2.release()
+    lease_3.release()
+
+
+@mock.patch("juju_spell.connections.network._get_ephemeral_port", return_value=45678)
 @mock.patch("juju_spell.connections.network._is_port_free")
-def test_get_free_tcp_port_exception(mock_is_port_free):
-    """Test getting free TCP port raising an Error."""
-    from juju_spell.connections.network import get_free_tcp_port
+def test_lease_tcp_port_ephemeral(mock_is_port_free, _, port_lease_dir):
+    """Test leasing ephemeral port if all ports in range are used."""
+    from juju_spell.connections.network import lease_tcp_port
+
+    mock_is_port_free.side_effect = lambda port: port == 45678
+
+    lease = lease_tcp_port(range(17071, 17075))
+
+    assert lease.port == 45678
+    lease.release()
+    assert list(port_lease_dir.iterdir()) == []  # lock files are removed
 
-    mock_is_port_free.return_value = False
+
+@mock.patch("juju_spell.connections.network._is_port_free", return_value=True)
+def test_try_lease_port_removed(_, port_lease_dir):
+    """Test leasing port fails if lock file was removed by released lease."""
+    from juju_spell.connections.network import _try_lease_port
+
+    lease = _try_lease_port(17071)
+    lock_file = open(port_lease_dir / "17071.lock")  # opened before release
+    lease.release()
+
+    with mock.patch("juju_spell.connections.network.open", return_value=lock_file):
+        assert _try_lease_port(17071) is None
+
+    assert lock_file.closed
+
+
+@mock.patch("juju_spell.connections.network._get_ephemeral_port", return_value=45678)
+@mock.patch("juju_spell.connections.network._is_port_free", return_value=False)
+def test_lease_tcp_port_exception(*_):
+    """Test leasing TCP port raising an Error."""
+    from juju_spell.connections.network import lease_tcp_port
 
     with pytest.raises(ValueError):
-        get_free_tcp_port(range(17071, 17075))
+        lease_tcp_port(range(17071, 17075))
+
+
+def test_get_ephemeral_port():
+    """Test getting port from ephemeral range."""
+    from juju_spell.connections.network import _get_ephemeral_port
+
+    assert 0 < _get_ephemeral_port() < 65536
 
 
 def test_empty_connection():
@@ -115,8 +173,160 @@ class BaseSubprocessConnectionTestCase(unittest.TestCase):
     def test_clean(self):
         """Test clean function."""
         self.connection.process = mocked_process = mock.MagicMock()
+        self.connection._stderr = stderr = io.BytesIO()
+        self.connection.clean()
+        mocked_process.terminate.assert_called_once()
+        mocked_process.wait.assert_called_once()
+        mocked_process.kill.assert_not_called()
+        self.assertTrue(stderr.closed)
+
+    def test_clean_kill(self):
+        """Test clean function killing subprocess, which did not exit."""
+        self.connection.process = mocked_process = mock.MagicMock()
+        mocked_process.wait.side_effect = [subprocess.TimeoutExpired("ssh", 5), 0]
         self.connection.clean()
         mocked_process.terminate.assert_called_once()
+        mocked_process.kill.assert_called_once()
+        self.assertEqual(mocked_process.wait.call_count, 2)
+
+
+@pytest.mark.asyncio
+async def test_base_subprocess_wait_ready():
+    """Test waiting for subprocess connection, which is ready."""
+    from juju_spell.connections.network import BaseSubprocessConnection
+
+    connection = BaseSubprocessConnection()
+    connection.process = mock.MagicMock()
+    connection.process.poll.return_value = None
+
+    await connection.wait_ready(timeout=1)
+
+    connection.process.poll.assert_called_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stderr", [b"bind [127.0.0.1]:1234: Address in use", None])
+async def test_base_subprocess_wait_ready_exited(stderr):
+    """Test waiting for subprocess connection, which exited."""
+    from juju_spell.connections.network import BaseSubprocessConnection
+    from juju_spell.exceptions import TunnelError
+
+    connection = BaseSubprocessConnection()
+    connection.process = mock.MagicMock()
+    connection.process.poll.return_value = 255
+    connection._stderr = io.BytesIO(stderr or b"")
+
+    with pytest.raises(TunnelError, match="exited with code 255"):
+        await connection.wait_ready(timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_base_subprocess_stderr():
+    """Test error of subprocess, which output is not read while it runs."""
+    from juju_spell.connections.network import BaseSubprocessConnection
+    from juju_spell.exceptions import TunnelError
+
+    connection = BaseSubprocessConnection()
+    connection.is_ready = mock.AsyncMock(return_value=False)
+    connection._start(["sh", "-c", "head -c 100000 /dev/zero; echo failed >&2; exit 1"])
+
+    with pytest.raises(TunnelError, match="exited with code 1: failed"):
+        await connection.wait_ready(timeout=5)
+
+    connection.clean()
+    assert connection.process.returncode == 1
+
+
+def test_base_subprocess_check():
+    """Test checking subprocess, which is running."""
+    from juju_spell.connections.network import BaseSubprocessConnection
+
+    connection = BaseSubprocessConnection()
+    connection.process = mock.MagicMock()
+    connection.process.poll.return_value = None
+
+    connection.check()
+
+    connection.process.poll.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_base_subprocess_wait_ready_not_started():
+    """Test waiting for subprocess connection, which was not started."""
+    from juju_spell.connections.network import BaseSubprocessConnection
+    from juju_spell.exceptions import TunnelError
+
+    with pytest.raises(TunnelError):
+        await BaseSubprocessConnection().wait_ready(timeout=1)
+
+
+@pytest.mark.asyncio
+@mock.patch("juju_spell.connections.network.DEFAULT_TUNNEL_POLL_INTERVAL", 0.01)
+async def test_base_subprocess_wait_ready_timeout():
+    """Test waiting for subprocess connection, which is never ready."""
+    from juju_spell.connections.network import BaseSubprocessConnection
+    from juju_spell.exceptions import TunnelError
+
+    connection = BaseSubprocessConnection()
+    connection.process = mock.MagicMock()
+    connection.process.poll.return_value = None
+    connection.is_ready = mock.AsyncMock(return_value=False)
+
+    with pytest.raises(TunnelError, match="was not ready"):
+        await connection.wait_ready(timeout=0.05)
+
+    assert connection.is_ready.await_count > 1
+
+
+def test_ssh_port_forwarding_clean():
+    """Test cleaning ssh tunnel releases leased ports."""
+    from juju_spell.connections.network import SshPortForwardSubprocess
+
+    lease_1, lease_2 = mock.MagicMock(), mock.MagicMock()
+    ssh_portforward = SshPortForwardSubprocess(
+        "localhost:1234", "10.1.1.99:17070", "bastion", lease=lease_1
+    )
+    ssh_portforward.add_forward("localhost:1235", "10.1.1.98:17070", lease_2)
+    ssh_portforward.process = mock.MagicMock()
+
+    ssh_portforward.clean()
+
+    ssh_portforward.process.terminate.assert_called_once()
+    lease_1.release.assert_called_once()
+    lease_2.release.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_base_subprocess_wait_ready_port_collision():
+    """Test waiting for subprocess connection, which failed to bind port."""
+    from juju_spell.connections.network import BaseSubprocessConnection
+    from juju_spell.exceptions import PortCollisionError
+
+    connection = BaseSubprocessConnection()
+    connection.process = mock.MagicMock()
+    connection.process.poll.return_value = 255
+    connection._stderr = io.BytesIO(b"bind [127.0.0.1]:1234: Address already in use")
+
+    with pytest.raises(PortCollisionError):
+        await connection.wait_ready(timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_ssh_port_forwarding_is_ready():
+    """Test ssh tunnel is ready when local targets accept connections."""
+    from juju_spell.connections.network import SshPortForwardSubprocess
+
+    server = await asyncio.start_server(lambda *_: None, "localhost", 0)
+    port = server.sockets[0].getsockname()[1]
+    ssh_portforward = SshPortForwardSubprocess(
+        f"localhost:{port}", "10.1.1.99:17070", "bastion"
+    )
+
+    assert await ssh_portforward.is_ready() is True
+
+    server.close()
+    await server.wait_closed()
+    assert await ssh_portforward.is_ready() is False
 
 
 @pytest.mark.parametrize(
@@ -124,7 +334,15 @@ class BaseSubprocessConnectionTestCase(unittest.TestCase):
     [
         (
             ("localhost:1234", "10.1.1.99:17070", "bastion"),
-            ["ssh", "bastion", "-N", "-L", "localhost:1234:10.1.1.99:17070"],
+            [
+                "ssh",
+                "bastion",
+                "-N",
+                "-L",
+                "localhost:1234:10.1.1.99:17070",
+                "-o",
+                "ExitOnForwardFailure=yes",
+            ],
         ),
         (
             ("localhost:1234", "10.1.1.99:17070", "bastion", ["bastion1", "bastion2"]),
@@ -134,12 +352,22 @@ class BaseSubprocessConnectionTestCase(unittest.TestCase):
                 "-N",
                 "-L",
                 "localhost:1234:10.1.1.99:17070",
+                "-o",
+                "ExitOnForwardFailure=yes",
                 "-J bastion1 -J bastion2",
             ],
         ),
         (
             ("1234", "10.1.1.99:17070", "ubuntu@bastion"),
-            ["ssh", "ubuntu@bastion", "-N", "-L", "1234:10.1.1.99:17070"],
+            [
+                "ssh",
+                "ubuntu@bastion",
+                "-N",
+                "-L",
+                "1234:10.1.1.99:17070",
+                "-o",
+                "ExitOnForwardFailure=yes",
+            ],
         ),
     ],
 )
@@ -157,8 +385,126 @@ def test_ssh_port_forwarding_proc_connect(mock_popen, args, exp_cmd):
 
     assert ssh_portforward.is_connected is True
     mock_popen.assert_called_once_with(
-        exp_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        exp_cmd, stdout=subprocess.DEVNULL, stderr=mock.ANY
+    )
+
+
+@mock.patch("juju_spell.connections.network.subprocess.Popen")
+def test_ssh_port_forwarding_proc_multiple_forwards(mock_popen):
+    """Test ssh tunnel with multiple port forwards."""
+    from juju_spell.connections.network import SshPortForwardSubprocess
+
+    ssh_portforward = SshPortForwardSubprocess(
+        "localhost:1234", "10.1.1.99:17070", "bastion"
     )
+    ssh_portforward.add_forward("localhost:1235", "10.1.1.98:17070")
+    ssh_portforward.connect()
+
+    mock_popen.assert_called_once_with(
+        [
+            "ssh",
+            "bastion",
+            "-N",
+            "-L",
+            "localhost:1234:10.1.1.99:17070",
+            "-L",
+            "localhost:1235:10.1.1.98:17070",
+            "-o",
+            "ExitOnForwardFailure=yes",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=mock.ANY,
+    )
+
+
+class SharedConnectionTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        """Set up test cases."""
+        from juju_spell.connections.network import SharedConnection, SharedState
+
+        self.process = mock.MagicMock()
+        self.process.is_connected = True
+        self.state = SharedState()
+        self.lease_1, self.lease_2 = mock.MagicMock(), mock.MagicMock()
+        self.connection_1 = SharedConnection(self.process, self.state, self.lease_1)
+        self.connection_2 = SharedConnection(self.process, self.state, self.lease_2)
+
+    def test_is_connected(self):
+        """Test is_connected."""
+        self.assertFalse(self.connection_1.is_connected)
+        self.connection_1.connect()
+        self.assertTrue(self.connection_1.is_connected)
+        self.assertFalse(self.connection_2.is_connected)
+
+    def test_connect(self):
+        """Test connect function creates the connection only once."""
+        self.connection_1.connect()
+        self.connection_2.connect()
+        self.process.connect.assert_called_once()
+
+    def test_wait_ready(self):
+        """Test waiting for the shared connection."""
+        self.process.wait_ready = mock.AsyncMock()
+        asyncio.run(self.connection_1.wait_ready(10))
+        self.process.wait_ready.assert_awaited_once_with(10)
+
+    def test_clean(self):
+        """Test clean function cleans the connection by the last user."""
+        self.connection_1.connect()
+        self.connection_2.connect()
+
+        self.connection_1.clean()
+        self.process.clean.assert_not_called()
+        self.lease_1.release.assert_not_called()  # port is still forwarded
+        self.connection_2.clean()
+        self.process.clean.assert_called_once()
+        self.lease_1.release.assert_called_once()
+        self.lease_2.release.assert_called_once()
+        self.assertFalse(self.connection_1.is_usable)
+
+    def test_clean_not_started(self):
+        """Test clean releases only leases of users, which used the connection."""
+        from juju_spell.exceptions import TunnelError
+
+        self.connection_1.connect()
+        self.connection_1.clean()
+
+        self.process.clean.assert_called_once()
+        self.lease_1.release.assert_called_once()
+        self.lease_2.release.assert_not_called()
+        # the user, which did not connect, can't restart the cleaned connection
+        self.assertFalse(self.connection_2.is_usable)
+        with self.assertRaises(TunnelError):
+            self.connection_2.connect()
+
+        self.connection_2.clean()
+        self.process.clean.assert_called_once()
+        self.lease_2.release.assert_called_once()
+
+    def test_wait_ready_failed(self):
+        """Test shared connection is not usable after it failed."""
+        from juju_spell.exceptions import PortCollisionError
+
+        self.process.wait_ready = mock.AsyncMock(side_effect=PortCollisionError())
+        self.connection_1.connect()
+
+        with self.assertRaises(PortCollisionError):
+            asyncio.run(self.connection_1.wait_ready(10))
+
+        self.assertFalse(self.connection_1.is_usable)
+        self.assertFalse(self.connection_2.is_usable)
+
+    def test_check_failed(self):
+        """Test shared connection is not usable after its check failed."""
+        from juju_spell.exceptions import TunnelError
+
+        self.process.check.side_effect = TunnelError()
+        self.connection_1.connect()
+
+        with self.assertRaises(TunnelError):
+            self.connection_1.check()
+
+        self.assertFalse(self.connection_2.is_usable)
 
 
 @pytest.mark.parametrize(
@@ -190,7 +536,7 @@ def test_sshuttle_proc(mock_popen, args, exp_cmd):
     sshuttle.connect()
 
     mock_popen.assert_called_once_with(
-        exp_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        exp_cmd, stdout=subprocess.DEVNULL, stderr=mock.ANY
     )
 
 
@@ -202,7 +548,10 @@ def test_sshuttle_proc(mock_popen, args, exp_cmd):
         ("10.1.1.1:17070", Connection("10.2.2.1"), True, "10.1.1.1:17070"),
     ],
 )
-@mock.patch("juju_spell.connections.network.get_free_tcp_port", return_value=18070)
+@mock.patch(
+    "juju_spell.connections.network.lease_tcp_port",
+    return_value=mock.MagicMock(port=18070),
+)
 @mock.patch("juju_spell.connections.network.SshPortForwardSubprocess")
 @mock.patch("juju_spell.connections.network.SshuttleSubprocess")
 def test_get_connection(
@@ -232,3 +581,73 @@ def test_get_connection(
     else:
         mocked_port_forward.assert_not_called()
         mocked_sshuttle.assert_not_called()
+
+
+@mock.patch("juju_spell.connections.network._is_port_free", return_value=True)
+def test_get_connections(_):
+    """Test get connections sharing a single ssh process per destination."""
+    from juju_spell.connections.network import (
+        EmptyConnection,
+        SshPortForwardSubprocess,
+        get_connections,
+    )
+
+    controllers = [
+        mock.MagicMock(endpoint="10.1.1.1:17070", connection=None),
+        mock.MagicMock(endpoint="10.1.1.2:17070", connection=Connection("bastion")),
+        mock.MagicMock(endpoint="10.1.1.3:17070", connection=Connection("bastion")),
+        mock.MagicMock(
+            endpoint="10.1.1.4:17070", connection=Connection("bastion", ["jump"])
+        ),
+    ]
+    for i, controller in enumerate(controllers):
+        controller.name = f"controller-{i}"
+
+    connections = get_connections(controllers, range(17071, 17075))
+
+    endpoint, process = connections["controller-0"]
+    assert endpoint == "10.1.1.1:17070"
+    assert isinstance(process, EmptyConnection)
+    _, process_1 = connections["controller-1"]
+    _, process_2 = connections["controller-2"]
+    _, process_3 = connections["controller-3"]
+    assert process_1.connection is process_2.connection
+    assert process_1.connection is not process_3.connection
+    assert isinstance(process_1.connection, SshPortForwardSubprocess)
+    assert process_1.connection.forwards == [
+        (connections["controller-1"][0], "10.1.1.2:17070"),
+        (connections["controller-2"][0], "10.1.1.3:17070"),
+    ]
+    assert process_3.connection.jumps == ["jump"]
+    # leases are owned by users of shared connection
+    assert process_1.connection.leases == []
+    assert process_1.lease.port != process_2.lease.port
+    endpoints = {endpoint for endpoint, _ in list(connections.values())[1:]}
+    assert len(endpoints) == 3  # each controller has a different local port
+
+
+def test_get_connections_sshuttle():
+    """Test get connections sharing a single sshuttle process per destination."""
+    from juju_spell.connections.network import SshuttleSubprocess, get_connections
+
+    controllers = [
+        mock.MagicMock(
+            endpoint="10.1.1.1:17070",
+            connection=Connection("bastion", subnets=["10.1.1.0/24"]),
+        ),
+        mock.MagicMock(
+            endpoint="10.1.2.1:17070",
+            connection=Connection("bastion", subnets=["10.1.1.0/24", "10.1.2.0/24"]),
+        ),
+    ]
+    for i, controller in enumerate(controllers):
+        controller.name = f"controller-{i}"
+
+    connections = get_connections(controllers, sshuttle=True)
+
+    (endpoint_1, process_1), (endpoint_2, process_2) = connections.values()
+    assert endpoint_1 == "10.1.1.1:17070"
+    assert endpoint_2 == "10.1.2.1:17070"
+    assert process_1.connection is process_2.connection
+    assert isinstance(process_1.connection, SshuttleSubprocess)
+    assert process_1.connection.subnets == ["10.1.1.0/24", "10.1.2.0/24"]
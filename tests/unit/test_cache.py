@@ -0,0 +1,127 @@
+import argparse
+import os
+import stat
+import time
+from unittest import mock
+
+import pytest
+
+from juju_spell.cache import ResultCache, get_cache_key
+from juju_spell.commands.base import Result
+
+
+@pytest.fixture
+def command():
+    """Command with name."""
+    command = mock.MagicMock()
+    command.name = "status"
+    return command
+
+
+def test_get_cache_key(controller_config, command):
+    """Test cache key does not depend on arguments, which do not change output."""
+    key = get_cache_key(
+        controller_config, command, argparse.Namespace(models=["a"], dry_run=False)
+    )
+
+    assert key == get_cache_key(
+        controller_config,
+        command,
+        argparse.Namespace(dry_run=False, models=["a"], parallel=5, max_age=10),
+    )
+    assert key != get_cache_key(
+        controller_config, command, argparse.Namespace(models=["b"], dry_run=False)
+    )
+    command.name = "ping"
+    assert key != get_cache_key(
+        controller_config, command, argparse.Namespace(models=["a"], dry_run=False)
+    )
+
+
+def test_result_cache(tmp_path):
+    """Test storing and loading result from cache."""
+    cache = ResultCache(tmp_path / "cache")
+
+    assert cache.get("key", 10) is None
+    cache.set("key", Result(True, {"a": 1}))
+
+    assert cache.get("key", 10) == Result(True, {"a": 1})
+    assert stat.S_IMODE(os.stat(tmp_path / "cache").st_mode) == 0o700
+
+
+def test_result_cache_expired(tmp_path):
+    """Test expired result is not used."""
+    cache = ResultCache(tmp_path)
+    with mock.patch("juju_spell.cache.time.time", return_value=time.time() - 20):
+        cache.set("key", Result(True, "OK"))
+
+    assert cache.get("key", 10) is None
+    assert cache.get("key", 30) == Result(True, "OK")
+
+
+def test_result_cache_corrupted(tmp_path):
+    """Test corrupted result is ignored."""
+    cache = ResultCache(tmp_path)
+    (tmp_path / "key.pickle").write_bytes(b"corrupted")
+
+    assert cache.get("key", 10) is None
+
+
+def test_result_cache_not_serializable(tmp_path):
+    """Test result, which could not be serialized, is not cached."""
+    cache = ResultCache(tmp_path)
+    cache.set("key", Result(True, lambda: None))
+
+    assert cache.get("key", 10) is None
+
+
+def test_result_cache_evict(tmp_path):
+    """Test the least recently used results are removed first."""
+    cache = ResultCache(tmp_path, max_size=1024**2)
+    for index, key in enumerate(["a", "b", "c"]):
+        cache.set(key, Result(True, key))
+        os.utime(tmp_path / f"{key}.pickle", (index, index))
+
+    size = (tmp_path / "a.pickle").stat().st_size
+    cache.max_size = 3.5 * size  # evicted to 2.625 * size
+    cache.get("a", float("inf"))  # mark "a" as recently used
+    cache.set("d", Result(True, "d"))
+
+    assert sorted(path.stem for path in tmp_path.glob("*.pickle")) == ["a", "d"]
+
+
+def test_result_cache_evict_not_scanned(tmp_path):
+    """Test cache directory is scanned only if tracked size exceeds max size."""
+    cache = ResultCache(tmp_path, max_size=1024**2)
+    with mock.patch.object(cache, "evict", wraps=cache.evict) as mock_evict:
+        for key in ["a", "b", "c"]:
+            cache.set(key, Result(True, key))
+
+        mock_evict.assert_called_once()  # the first write
+        cache.max_size = 1
+        cache.set("d", Result(True, "d"))
+        assert mock_evict.call_count == 2
+
+    assert list(tmp_path.glob("*.pickle")) == []
+
+
+def test_result_cache_default_path():
+    """Test cached config is not in directory of results, so it's never evicted."""
+    from juju_spell.settings import (
+        CONFIG_CACHE_DIR,
+        CONFIG_SHARDS_CACHE_DIR,
+        RESULTS_CACHE_DIR,
+    )
+
+    assert ResultCache().path == RESULTS_CACHE_DIR
+    assert RESULTS_CACHE_DIR not in [CONFIG_CACHE_DIR, *CONFIG_CACHE_DIR.parents]
+    assert RESULTS_CACHE_DIR not in CONFIG_SHARDS_CACHE_DIR.parents
+
+
+def test_result_cache_evicted_by_another_process(tmp_path):
+    """Test result is returned, even if it was removed after it was loaded."""
+    cache = ResultCache(tmp_path)
+    cache.set("key", Result(True, "output"))
+
+    with mock.patch("os.utime", side_effect=FileNotFoundError()):
+        assert cache.get("key", 10) == Result(True, "output")
@@ -1,10 +1,23 @@
+import subprocess
+import sys
 from unittest import mock
 
 import pytest
-from craft_cli import Dispatcher
+from craft_cli import ArgumentParsingError, Dispatcher
 
-from juju_spell.cmd import GLOBAL_ARGS, _run_dispatcher, get_command_groups
-from juju_spell.settings import APP_NAME, APP_VERSION, CONFIG_PATH, PERSONAL_CONFIG_PATH
+from juju_spell.cmd import (
+    GLOBAL_ARGS,
+    _run_dispatcher,
+    _set_default_profile_mode,
+    get_command_groups,
+)
+from juju_spell.settings import (
+    APP_NAME,
+    APP_VERSION,
+    CONFIG_DIR_PATH,
+    CONFIG_PATH,
+    PERSONAL_CONFIG_PATH,
+)
 
 
 @pytest.mark.parametrize(
@@ -39,10 +52,79 @@ def test_run_dispatcher(mock_load_config, mock_emit, mock_sys, cli_args):
     elif (args.get("version") and filtered_params) or not args.get("version"):
         mock_emit.emit(f"JujuSpell: {APP_VERSION}")
 
+        dispatcher.load_command.assert_called_once()
+        mock_load_config.assert_not_called()  # config is loaded on first access
+        (config,) = dispatcher.load_command.call_args.args
+        assert config() == mock_load_config.return_value
+
         if args.get("config"):
-            mock_load_config.assert_called_once_with(args.get("config"))
+            mock_load_config.assert_called_once_with(args.get("config"), lazy=True)
         else:
-            mock_load_config.assert_called_once_with(CONFIG_PATH, PERSONAL_CONFIG_PATH)
+            mock_load_config.assert_called_once_with(
+                CONFIG_PATH,
+                PERSONAL_CONFIG_PATH,
+                lazy=True,
+                config_dir_path=CONFIG_DIR_PATH,
+            )
 
-        dispatcher.load_command.assert_called_once_with(mock_load_config.return_value)
         dispatcher.run.assert_called_once()
+
+
+def test_import_without_libjuju():
+    """Test that python-libjuju is not imported during CLI startup."""
+    code = (
+        "import sys, juju_spell.cmd; "
+        "print(','.join(sorted(name for name in sys.modules "
+        "if name in ('juju.controller', 'juju.model', 'juju.client.client') "
+        "and not type(sys.modules[name]).__name__ == '_LazyModule')))"
+    )
+    output = subprocess.check_output([sys.executable, "-c", code], text=True)
+
+    assert output.strip() == ""
+
+
+@pytest.mark.parametrize(
+    "sysargs, exp_sysargs",
+    [
+        (["ping"], ["ping"]),
+        (["--profile", "ping"], ["--profile=cpu", "ping"]),
+        (["ping", "--profile"], ["ping", "--profile=cpu"]),
+        (["--profile", "wall", "ping"], ["--profile", "wall", "ping"]),
+        (["--profile=alloc", "ping"], ["--profile=alloc", "ping"]),
+    ],
+)
+def test_set_default_profile_mode(sysargs, exp_sysargs):
+    """Test using cpu profiler if `--profile` is used without mode."""
+    assert _set_default_profile_mode(sysargs) == exp_sysargs
+
+
+@mock.patch("juju_spell.cmd.sys")
+@mock.patch("juju_spell.cmd.profile")
+@mock.patch("juju_spell.cmd.load_config")
+def test_run_dispatcher_profile(_, mock_profile, mock_sys):
+    """Test run dispatcher with profiler."""
+    mock_sys.argv = ["juju-spell", "--profile", "ping"]
+    profiler = mock_profile.return_value.__enter__.return_value
+    dispatcher = Dispatcher(
+        APP_NAME, get_command_groups(), extra_global_args=GLOBAL_ARGS
+    )
+    dispatcher.load_command = mock.MagicMock()
+    dispatcher.run = mock.MagicMock()
+
+    _run_dispatcher(dispatcher)
+
+    mock_profile.assert_called_once_with("cpu")
+    dispatcher.run.assert_called_once()
+    profiler.summary.assert_called_once()
+
+
+@mock.patch("juju_spell.cmd.sys")
+def test_run_dispatcher_invalid_profile(mock_sys):
+    """Test run dispatcher with profiler, which is not supported."""
+    mock_sys.argv = ["juju-spell", "--profile=gpu", "ping"]
+    dispatcher = Dispatcher(
+        APP_NAME, get_command_groups(), extra_global_args=GLOBAL_ARGS
+    )
+
+    with pytest.raises(ArgumentParsingError):
+        _run_dispatcher(dispatcher)
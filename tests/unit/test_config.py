@@ -1,4 +1,6 @@
 import io
+import os
+import stat
 import uuid
 from typing import Any, Dict
 from unittest import mock
@@ -16,10 +18,12 @@ from juju_spell.config import (
     Config,
     String,
     _apply_default,
+    _get_config_cache_key,
     _validate_config,
     load_config,
     load_config_file,
     merge_configs,
+    validate_config,
     validate_source_match_template,
 )
 from juju_spell.exceptions import JujuSpellError
@@ -190,6 +194,8 @@ def test_validate_config(
     [
         {"connection": {"port-range": "17070"}},
         {"connection": {"port-range": "1:100000"}},
+        {"connection": {"max-concurrency": 0}},
+        {"connection": {"max-concurrency": -1}},
         {"controllers": [{"name": 1}]},
         {"controllers": [{"customer": None}]},
         {"controllers": [{"owner": None}]},
@@ -387,6 +393,131 @@ def test_load_config(
     assert config == mock_validate_config.return_value
 
 
+@pytest.fixture
+def valid_config_path(test_config_path):
+    """Return path to valid global config."""
+    test_config_path.write_text(
+        TEST_CONFIG.replace("lma: monitoring", "lma: [monitoring]").replace(
+            "default: production", "default: [production]"
+        )
+    )
+    return test_config_path
+
+
+def test_load_config_cached(
+    valid_config_path, test_personal_config_path, config_cache_dir
+):
+    """Test validated config is loaded from cache until config file is changed."""
+    test_config_path = valid_config_path
+    config = load_config(test_config_path, test_personal_config_path)
+    (config_cache_path,) = config_cache_dir.glob("*.pickle")
+    assert stat.S_IMODE(os.stat(config_cache_path).st_mode) == 0o600
+
+    with mock.patch("juju_spell.config._validate_config") as mock_validate_config:
+        assert load_config(test_config_path, test_personal_config_path) == config
+        mock_validate_config.assert_not_called()
+
+        test_personal_config_path.write_text(
+            TEST_PERSONAL_CONFIG.replace("pass1234", "pass5678")
+        )
+        load_config(test_config_path, test_personal_config_path)
+        mock_validate_config.assert_called_once()
+
+
+def test_load_config_lazy(valid_config_path, test_personal_config_path):
+    """Test controllers are validated only by validate_config."""
+    with mock.patch(
+        "juju_spell.config.validate_source_match_template",
+        wraps=validate_source_match_template,
+    ) as mock_validate:
+        config = load_config(valid_config_path, test_personal_config_path, lazy=True)
+        mock_validate.assert_called_once()  # only connection section
+
+        assert config.lazy is True
+        assert config.controllers[0].connection.destination == "ubuntu@10.1.1.99"
+        validated_config = validate_config(config)
+
+    assert validated_config.lazy is False
+    assert validated_config == load_config(valid_config_path, test_personal_config_path)
+    assert validate_config(validated_config) is validated_config
+
+
+@pytest.mark.parametrize(
+    "key, value, exp_error",
+    [
+        ("owner", None, "configuration file validation failed"),
+        ("connection", {"jumps": []}, "configuration file validation failed"),
+        ("endpoint", "not an endpoint", "configuration of controller .* invalid"),
+        ("tags", "not-a-list", "configuration of controller .* invalid"),
+    ],
+)
+def test_load_config_lazy_invalid(
+    valid_config_path, test_personal_config_path, key, value, exp_error
+):
+    """Test structural errors are raised by load, others by validate_config."""
+    source = yaml.safe_load(valid_config_path.read_text())
+    source["controllers"][0][key] = value
+    if value is None:
+        source["controllers"][0].pop(key)
+
+    valid_config_path.write_text(yaml.dump(source))
+
+    with pytest.raises(JujuSpellError, match=exp_error):
+        config = load_config(valid_config_path, test_personal_config_path, lazy=True)
+        validate_config(config)
+
+
+def test_load_config_corrupted_cache(
+    valid_config_path, test_personal_config_path, config_cache_dir
+):
+    """Test corrupted cached config is ignored."""
+    load_config(valid_config_path, test_personal_config_path)
+    (config_cache_path,) = config_cache_dir.glob("*.pickle")
+    config_cache_path.write_bytes(b"corrupted")
+
+    config = load_config(valid_config_path, test_personal_config_path)
+
+    assert len(config.controllers) == 2
+
+
+def test_load_config_cached_lazy_and_full(
+    valid_config_path, test_personal_config_path, config_cache_dir
+):
+    """Test lazy and full load do not overwrite cached config of each other."""
+    config = load_config(valid_config_path, test_personal_config_path)
+    lazy_config = load_config(valid_config_path, test_personal_config_path, lazy=True)
+
+    assert len(list(config_cache_dir.glob("*.pickle"))) == 2
+    with mock.patch("juju_spell.config._apply_default") as mock_apply_default:
+        assert load_config(valid_config_path, test_personal_config_path) == config
+        assert (
+            load_config(valid_config_path, test_personal_config_path, lazy=True)
+            == lazy_config
+        )
+        mock_apply_default.assert_not_called()
+
+
+@mock.patch("juju_spell.config.DEFAULT_CONFIG_CACHE_FILES", 1)
+def test_load_config_cached_outdated(
+    valid_config_path, test_personal_config_path, config_cache_dir
+):
+    """Test only the most recently used configs are kept in cache."""
+    load_config(valid_config_path, test_personal_config_path)
+    load_config(valid_config_path, test_personal_config_path, lazy=True)
+
+    assert len(list(config_cache_dir.glob("*.pickle"))) == 1
+
+
+@pytest.mark.parametrize(
+    "patch", ["juju_spell.config.APP_VERSION", "juju_spell.config.CONFIG_CACHE_FORMAT"]
+)
+def test_get_config_cache_key_format(valid_config_path, patch):
+    """Test cached config is not used by different version or format."""
+    key = _get_config_cache_key(valid_config_path)
+    with mock.patch(patch, "other"):
+        assert _get_config_cache_key(valid_config_path) != key
+
+
 @pytest.mark.parametrize(
     "source,exp",
     [
@@ -456,3 +587,75 @@ def test_validate_source_match_template(template, source, exp_error):
             validate_source_match_template(source, template)
     else:
         validate_source_match_template(source, template)
+
+
+@pytest.fixture
+def config_dir_path(tmp_path, valid_config_path):
+    """Return path to config directory with two files."""
+    source = yaml.safe_load(valid_config_path.read_text())
+    controllers = source.pop("controllers")
+    valid_config_path.write_text(yaml.dump(source))
+    path = tmp_path / "config.d"
+    path.mkdir()
+    for index, controller in enumerate(controllers):
+        controller.pop("risk", None)
+        shard = {"controllers": [controller]}
+        if index == 0:
+            shard["default"] = {"controller": {"risk": 1}}
+
+        (path / f"customer-{index}.yaml").write_text(yaml.dump(shard))
+
+    (path / "README.md").write_text("not a config")
+    return path
+
+
+@pytest.mark.parametrize("with_global_config", [True, False])
+def test_load_config_dir(
+    config_dir_path, valid_config_path, test_personal_config_path, with_global_config
+):
+    """Test loading controllers from config directory."""
+    if not with_global_config:
+        valid_config_path.unlink()
+
+    config = load_config(
+        valid_config_path, test_personal_config_path, config_dir_path=config_dir_path
+    )
+
+    assert [controller.name for controller in config.controllers] == [
+        "example_controller",
+        "example_controller_without_optional",
+    ]
+    # default from file is applied only to controllers from the same file
+    assert [controller.risk for controller in config.controllers] == [1, 5]
+    assert all(controller.user == "admin" for controller in config.controllers)
+
+
+def test_load_config_dir_cached(
+    config_dir_path, valid_config_path, test_personal_config_path
+):
+    """Test only changed files from config directory are parsed again."""
+    load_config(
+        valid_config_path, test_personal_config_path, config_dir_path=config_dir_path
+    )
+    changed_path = config_dir_path / "customer-1.yaml"
+    changed_path.write_text(changed_path.read_text().replace("Gandalf", "Frodo"))
+
+    with mock.patch(
+        "juju_spell.config.load_config_file", wraps=load_config_file
+    ) as mock_load_config_file:
+        config = load_config(
+            valid_config_path,
+            test_personal_config_path,
+            config_dir_path=config_dir_path,
+        )
+
+    mock_load_config_file.assert_has_calls(
+        [
+            mock.call(valid_config_path),
+            mock.call(changed_path),
+            mock.call(test_personal_config_path),
+        ],
+        any_order=True,
+    )
+    assert mock_load_config_file.call_count == 3
+    assert config.controllers[1].owner == "Frodo"
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import os
+import stat
+from unittest import mock
+
+import pytest
+
+from juju_spell.commands.base import Result
+from juju_spell.commands.ping import PingCommand
+from juju_spell.config import Config
+from juju_spell.daemon import (
+    Daemon,
+    _dump,
+    _get_command_path,
+    _load_command,
+    _select_controllers,
+    is_daemon_running,
+    run_on_daemon,
+)
+from juju_spell.exceptions import JujuSpellError
+from juju_spell.serializer import dumps_json
+
+
+def test_dump():
+    """Test result is sent to client serialized as output without daemon."""
+    data = {"result": {"success": False, "error": ValueError("failed")}}
+
+    assert _dump(data) == dumps_json(data).encode() + b"\n"
+    assert b'"error":"failed"' in _dump(data)
+
+
+@pytest.fixture
+def daemon_config():
+    """Return config of daemon with two controllers."""
+    return Config(
+        controllers=[mock.MagicMock(uuid=f"uuid-{i}") for i in range(2)],
+        connection={"max-concurrency": 5},
+    )
+
+
+def test_select_controllers(daemon_config):
+    """Test selecting controllers from config of daemon by UUIDs."""
+    controller_1, controller_2 = daemon_config.controllers
+
+    config = _select_controllers(daemon_config, ["uuid-1", "uuid-0"])
+
+    assert config.controllers == [controller_2, controller_1]
+    assert config.connection == daemon_config.connection
+
+
+def test_select_controllers_unknown(daemon_config):
+    """Test selecting controller, which is not in config of daemon."""
+    with pytest.raises(JujuSpellError, match="unknown-uuid are not in configuration"):
+        _select_controllers(daemon_config, ["uuid-0", "unknown-uuid"])
+
+
+def test_load_command():
+    """Test loading command sent to daemon."""
+    path = _get_command_path(PingCommand)
+
+    assert path == "juju_spell.commands.ping:PingCommand"
+    assert _load_command(path) is PingCommand
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "os:system",
+        "juju_spell.commands.base:Result",
+        "juju_spell.commands.ping:Foo",
+        "juju_spell.commands.grant:GrantCommand",  # write command
+    ],
+)
+def test_load_command_exception(path):
+    """Test loading command, which is not supported."""
+    with pytest.raises(JujuSpellError):
+        _load_command(path)
+
+
+def test_is_daemon_running(tmp_path):
+    """Test checking if daemon is running without daemon."""
+    assert is_daemon_running(tmp_path / "daemon.sock") is False
+
+
+@pytest.mark.asyncio
+@mock.patch("juju_spell.daemon.connect_manager", new_callable=mock.AsyncMock)
+@mock.patch("juju_spell.daemon.iter_run")
+async def test_daemon(mock_iter_run, mock_connect_manager, tmp_path, controller_config):
+    """Test running command by daemon."""
+    test_config = Config(controllers=[controller_config])
+    path = tmp_path / "daemon.sock"
+    parsed_args = argparse.Namespace(run_type="parallel", filter="")
+
+    async def _iter_run(config, command, _, keep_connections):
+        assert keep_connections is True
+        assert isinstance(command, PingCommand)
+        for controller in config.controllers:
+            yield {"context": {"name": controller.name}, "output": "accessible"}
+
+        yield Result(False, error=ValueError("failed"))
+
+    mock_iter_run.side_effect = _iter_run
+    daemon = Daemon(path, config_loader=lambda: test_config)
+    serve = asyncio.ensure_future(daemon.serve())
+    while not is_daemon_running(path):
+        await asyncio.sleep(0.01)
+
+    results = await asyncio.get_running_loop().run_in_executor(
+        None, lambda: list(run_on_daemon(PingCommand, test_config, parsed_args, path))
+    )
+
+    assert results == [
+        {"context": {"name": controller.name}, "output": "accessible"}
+        for controller in test_config.controllers
+    ] + [{"success": False, "output": None, "error": "failed"}]
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    with pytest.raises(JujuSpellError):
+        await Daemon(path).serve()  # daemon is already running
+
+    daemon.stop()
+    await serve
+    assert not path.exists()
+    mock_connect_manager.clean.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@mock.patch("juju_spell.daemon.connect_manager", new_callable=mock.AsyncMock)
+async def test_daemon_error(_, tmp_path, controller_config):
+    """Test daemon sending error to client."""
+    test_config = Config(controllers=[controller_config])
+    path = tmp_path / "daemon.sock"
+    path.touch()  # socket left by daemon, which was killed
+    daemon = Daemon(path)
+    serve = asyncio.ensure_future(daemon.serve())
+    while not is_daemon_running(path):
+        await asyncio.sleep(0.01)
+
+    with pytest.raises(JujuSpellError, match="daemon failed"):
+        await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: list(
+                run_on_daemon(Result, test_config, argparse.Namespace(), path)
+            ),
+        )
+
+    daemon.stop()
+    await serve
@@ -1,9 +1,14 @@
 """Test for filter."""
+from unittest import mock
 
 import pytest
 
 from juju_spell.config import Config, Controller
-from juju_spell.filter import get_filtered_config, make_controllers_filter
+from juju_spell.filter import (
+    ControllerIndex,
+    get_filtered_config,
+    make_controllers_filter,
+)
 
 
 @pytest.mark.parametrize(
@@ -364,3 +369,83 @@ def test_get_filtered_config(filter_expression, controllers, result_controllers)
     original_config = Config(controllers=controllers)
     config = get_filtered_config(original_config, filter_expression)
     assert config == Config(controllers=result_controllers)
+
+
+@pytest.fixture
+def controllers():
+    """List of controllers used for filtering."""
+    return [
+        Controller(
+            uuid=f"00000000-0000-0000-0000-00000000000{index}",
+            name=f"prod-{index}" if index % 2 else f"stg-{index}",
+            customer=f"customer-{index % 3}",
+            owner="owner-a",
+            endpoint="localhost:17070",
+            ca_cert="",
+            user="admin" if index < 4 else "operator",
+            password="pwd",
+            model_mapping={},
+            tags=["a", str(index)] if index % 2 else None,
+            risk=index % 5 + 1,
+        )
+        for index in range(6)
+    ]
+
+
+@pytest.mark.parametrize(
+    "filter_expression, exp_names",
+    [
+        ("name=prod-1,stg-2", ["prod-1", "stg-2"]),
+        ("name!=prod-1,stg-2", ["stg-0", "prod-3", "stg-4", "prod-5"]),
+        ("name=prod-*", ["prod-1", "prod-3", "prod-5"]),
+        ("name=/^stg-[0-2]$/", ["stg-0", "stg-2"]),
+        ("tags=a customer!=customer-0", ["prod-1", "prod-5"]),
+        ("tags!=a", ["stg-0", "stg-2", "stg-4"]),
+        ("risk=1,2", ["stg-0", "prod-1", "prod-5"]),
+        ("user=operator name=stg-*", ["stg-4"]),
+        ("user!=admin,operator", []),
+        ("description=*", []),
+    ],
+)
+def test_filter_expression(controllers, filter_expression, exp_names):
+    """Test filtering with negation, glob and regex values."""
+    controller_filter = make_controllers_filter(filter_expression)
+    names = [
+        controller.name for controller in controllers if controller_filter(controller)
+    ]
+
+    assert names == exp_names
+    if exp_names:
+        config = get_filtered_config(Config(controllers=controllers), filter_expression)
+        assert [controller.name for controller in config.controllers] == exp_names
+    else:
+        with pytest.raises(ValueError):
+            get_filtered_config(Config(controllers=controllers), filter_expression)
+
+
+def test_get_filtered_config_index(controllers):
+    """Test index is built only once and original config is not changed."""
+    config = Config(controllers=controllers)
+
+    with mock.patch(
+        "juju_spell.filter.ControllerIndex", wraps=ControllerIndex
+    ) as mock_index:
+        get_filtered_config(config, "customer=customer-1")
+        filtered_config = get_filtered_config(config, "tags=a")
+
+    mock_index.assert_called_once_with(controllers)
+    assert config.controllers == controllers
+    assert filtered_config.connection is config.connection
+
+
+def test_get_filtered_config_lazy(controllers):
+    """Test only selected controllers of lazy config are validated."""
+    config = Config(controllers=controllers, lazy=True)
+
+    with mock.patch("juju_spell.filter.validate_config") as mock_validate_config:
+        filtered_config = get_filtered_config(config, "name=prod-1")
+
+    mock_validate_config.assert_called_once_with(
+        Config(controllers=[controllers[1]], lazy=True)
+    )
+    assert filtered_config == mock_validate_config.return_value
@@ -0,0 +1,80 @@
+"""Tests for profiler."""
+import asyncio
+import pstats
+import time
+import tracemalloc
+
+import pytest
+
+from juju_spell.profiler import WallProfiler, profile
+
+
+def _busy_work():
+    """Do some work, which could be profiled."""
+    return sorted(str(value) for value in range(10000))
+
+
+def test_profile_disabled(tmp_path):
+    """Test nothing is profiled without mode."""
+    with profile(None, tmp_path) as profiler:
+        _busy_work()
+
+    assert profiler is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profile_cpu(tmp_path):
+    """Test profiling CPU time by cProfile."""
+    with profile("cpu", tmp_path / "profiles") as profiler:
+        _busy_work()
+
+    assert profiler.path.parent == tmp_path / "profiles"
+    assert profiler.path.name.endswith("-cpu.pstats")
+    assert "_busy_work" in profiler.summary()
+    stats = pstats.Stats(str(profiler.path))
+    assert any(name == "_busy_work" for _, _, name in stats.stats)
+
+
+def test_profile_alloc(tmp_path):
+    """Test profiling allocations by tracemalloc."""
+    with profile("alloc", tmp_path) as profiler:
+        data = _busy_work()
+
+    assert data
+    assert not tracemalloc.is_tracing()
+    assert profiler.summary().startswith("peak memory:")
+    assert tracemalloc.Snapshot.load(str(profiler.path)).traces
+
+
+def test_profile_failure(tmp_path):
+    """Test profile is written even if profiled code failed."""
+    with pytest.raises(ValueError):
+        with profile("cpu", tmp_path) as profiler:
+            raise ValueError("failed")
+
+    assert profiler.path.exists()
+
+
+def test_wall_profiler(tmp_path):
+    """Test sampling stacks of suspended asyncio tasks."""
+
+    async def wait_for_controller():
+        await asyncio.sleep(0.1)
+
+    async def main():
+        await asyncio.gather(wait_for_controller(), wait_for_controller())
+
+    profiler = WallProfiler(tmp_path, interval=0.001)
+    profiler.start()
+    try:
+        asyncio.run(main())
+        time.sleep(0.01)  # main thread without event loop
+    finally:
+        profiler.stop()
+
+    stacks = profiler.path.read_text().splitlines()
+    assert any(
+        stack.startswith("task ") and "wait_for_controller" in stack for stack in stacks
+    )
+    assert any(stack.startswith("main;") for stack in stacks)
+    assert "wait_for_controller" in profiler.summary()
@@ -0,0 +1,120 @@
+"""Tests for serializer."""
+import argparse
+import datetime
+import json
+import uuid
+from unittest import mock
+
+import pytest
+import yaml
+from juju.client import client
+
+from juju_spell import serializer
+from juju_spell.serializer import dumps_json, dumps_yaml, to_plain
+
+FULL_STATUS = {
+    "applications": {
+        "ubuntu": {
+            "charm": "ubuntu",
+            "status": {"status": "active", "info": "ready"},
+            "units": {"ubuntu/0": {"machine": "0", "workload-status": {}}},
+        }
+    },
+    "machines": {"0": {"id": "0", "series": "jammy"}},
+    "model": {"name": "production", "version": "2.9.42"},
+}
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "json"])
+def json_backend(request):
+    """Serialize JSON with orjson and without it."""
+    if request.param:
+        yield
+    else:
+        with mock.patch.object(serializer, "orjson", None):
+            yield
+
+
+@pytest.fixture
+def full_status():
+    """Return python-libjuju status with nested definitions."""
+    return client.FullStatus.from_json(FULL_STATUS)
+
+
+def test_to_plain(full_status):
+    """Test converting libjuju definitions to same data as `vars`."""
+    exp_data = json.loads(json.dumps(full_status, default=vars))
+
+    assert to_plain(full_status) == exp_data
+    assert to_plain({"status": (full_status,)}) == {"status": [exp_data]}
+
+
+def test_to_plain_object():
+    """Test converting object, which is not libjuju definition."""
+    obj = argparse.Namespace(name="Gandalf")
+
+    assert to_plain([obj, None, 1.5]) == [{"name": "Gandalf"}, None, 1.5]
+
+
+@pytest.mark.parametrize("pretty", [True, False])
+def test_dumps_json(pretty, json_backend, full_status):
+    """Test serializing libjuju definitions to JSON."""
+    data = {"success": True, "output": full_status, "context": {1: "ľ"}}
+    exp_data = {
+        "success": True,
+        "output": json.loads(json.dumps(full_status, default=vars)),
+        "context": {"1": "ľ"},
+    }
+
+    output = dumps_json(data, pretty=pretty)
+
+    assert json.loads(output) == exp_data
+    assert ("\n" in output) is pretty
+    if pretty:
+        assert output == json.dumps(exp_data, ensure_ascii=False, indent=1)
+    else:
+        assert output == json.dumps(exp_data, ensure_ascii=False, separators=(",", ":"))
+
+
+def test_dumps_json_pretty_multiline(json_backend):
+    """Test indentation of JSON does not change strings with new lines."""
+    data = {"a": [{"b": "line\n    indented"}, [], {}]}
+
+    assert dumps_json(data, pretty=True) == json.dumps(data, indent=1)
+
+
+def test_dumps_json_native_types(json_backend):
+    """Test serializing types natively supported by orjson in the same way."""
+    uuid_ = uuid.UUID("f8f9f1a2-3c4d-4e5f-8a9b-0c1d2e3f4a5b")
+    data = {
+        "uuid": uuid_,
+        "datetime": datetime.datetime(2023, 1, 2, 3, 4, 5, 6),
+        "aware": datetime.datetime(2023, 1, 2, tzinfo=datetime.timezone.utc),
+        "date": datetime.date(2023, 1, 2),
+        "time": datetime.time(1, 2, 3),
+    }
+
+    assert json.loads(dumps_json(data)) == {
+        "uuid": "f8f9f1a2-3c4d-4e5f-8a9b-0c1d2e3f4a5b",
+        "datetime": "2023-01-02T03:04:05.000006",
+        "aware": "2023-01-02T00:00:00+00:00",
+        "date": "2023-01-02",
+        "time": "01:02:03",
+    }
+    assert to_plain([uuid_]) == [str(uuid_)]
+
+
+def test_dumps_exception(json_backend):
+    """Test serializing exception to its message."""
+    data = {"success": False, "error": ValueError("failed")}
+
+    assert json.loads(dumps_json(data)) == {"success": False, "error": "failed"}
+    assert to_plain(data) == {"success": False, "error": "failed"}
+
+
+def test_dumps_yaml(full_status):
+    """Test serializing data to YAML with keys in original order."""
+    output = dumps_yaml({"status": full_status, "name": "ľ"})
+
+    assert yaml.safe_load(output) == {"status": to_plain(full_status), "name": "ľ"}
+    assert output.index("status:") < output.index("name: ľ")
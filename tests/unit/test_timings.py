@@ -0,0 +1,93 @@
+"""Tests for timings."""
+import asyncio
+
+import pytest
+
+from juju_spell.timings import PhaseTimings, get_percentile, get_report
+
+
+def test_phase_timings_span():
+    """Test measuring duration of phase, even if it failed."""
+    timings = PhaseTimings()
+
+    with timings.span("controller-1", "login"):
+        pass
+
+    with pytest.raises(ValueError):
+        with timings.span("controller-1", "execute"):
+            raise ValueError("failed")
+
+    assert set(timings.pop("controller-1")) == {"login", "execute"}
+    assert timings.pop("controller-1") == {}
+
+
+def test_phase_timings_record():
+    """Test recording duration of same phase multiple times."""
+    timings = PhaseTimings()
+
+    timings.record("controller-1", "tunnel", 1.0)
+    timings.record("controller-1", "tunnel", 0.5)
+    timings.record("controller-2", "disconnect", 0.1)
+
+    assert timings.pop_all() == {
+        "controller-1": {"tunnel": 1.5},
+        "controller-2": {"disconnect": 0.1},
+    }
+    assert timings.pop_all() == {}
+
+
+@pytest.mark.asyncio
+async def test_phase_timings_scope():
+    """Test recording timings separately in scope, including tasks created in it."""
+    timings = PhaseTimings()
+
+    async def _run(phase):
+        with timings.scope():
+            await asyncio.ensure_future(_record(phase))
+            return timings.pop_all()
+
+    async def _record(phase):
+        await asyncio.sleep(0)
+        timings.record("controller-1", phase, 1.0)
+
+    results = await asyncio.gather(_run("login"), _run("execute"))
+
+    assert results == [
+        {"controller-1": {"login": 1.0}},
+        {"controller-1": {"execute": 1.0}},
+    ]
+    assert timings.pop_all() == {}
+
+
+@pytest.mark.parametrize(
+    "values, percent, exp_value",
+    [
+        ([1.0], 50, 1.0),
+        ([1.0, 2.0], 50, 1.0),
+        ([1.0, 2.0, 3.0], 50, 2.0),
+        ([float(value) for value in range(1, 101)], 95, 95.0),
+        ([float(value) for value in range(1, 11)], 95, 10.0),
+    ],
+)
+def test_get_percentile(values, percent, exp_value):
+    """Test percentile by nearest-rank method."""
+    assert get_percentile(values, percent) == exp_value
+
+
+def test_get_report():
+    """Test table sorted by p95 duration of phases."""
+    timings = [
+        {"tunnel": 0.5, "login": 0.2, "execute": 3.0},
+        {"tunnel": 1.5, "login": 0.4, "execute": 1.0},
+        {"disconnect": 0.01},
+    ]
+
+    report = get_report(timings)
+
+    assert report.splitlines() == [
+        "phase         count       p50       p95       max",
+        "execute           2    1.000s    3.000s    3.000s",
+        "tunnel            2    0.500s    1.500s    1.500s",
+        "login             2    0.200s    0.400s    0.400s",
+        "disconnect        1    0.010s    0.010s    0.010s",
+    ]
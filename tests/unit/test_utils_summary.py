@@ -0,0 +1,60 @@
+"""Tests for utilities."""
+import logging
+
+import pytest
+from juju.client import client
+
+from juju_spell.utils import Summary, summarize
+
+
+@pytest.fixture
+def full_status():
+    """Return python-libjuju status of model with many applications."""
+    return client.FullStatus.from_json(
+        {
+            "applications": {
+                f"app-{index}": {"charm": f"app-{index}"} for index in range(100)
+            },
+            "model": {"name": "production"},
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "obj, exp_summary",
+    [
+        ("Gandalf", "Gandalf"),
+        (1, "1"),
+        ({"a": [1, 2]}, "{'a': [1, 2]}"),
+        (list(range(20)), "[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, ...]"),
+        (ValueError("failed"), "ValueError('failed')"),
+    ],
+)
+def test_summarize(obj, exp_summary):
+    """Test summary of small objects."""
+    assert summarize(obj) == exp_summary
+
+
+def test_summarize_max_length():
+    """Test summary limited to maximum length."""
+    assert summarize("a" * 30, max_length=10) == "aaaaaaaaaa... (20 more characters)"
+
+
+def test_summarize_libjuju(full_status):
+    """Test summary of python-libjuju object."""
+    summary = summarize(full_status)
+
+    assert summary.startswith("FullStatus(applications={'app-0': ApplicationStatus(")
+    assert len(summary) < len(repr(full_status))
+    assert len(summary) <= 1000 + len("... (99999 more characters)")
+
+
+def test_summary_lazy(caplog, full_status):
+    """Test summary is created only if log message is formatted."""
+    logger = logging.getLogger("test-summary")
+    logger.setLevel(logging.INFO)
+
+    logger.debug("status: %s", Summary(full_status))
+    logger.info("status: %s", Summary(full_status))
+
+    assert caplog.messages == [f"status: {summarize(full_status)}"]
@@ -0,0 +1,98 @@
+"""Tests for validator."""
+import confuse
+import pytest
+import yaml
+from confuse import ConfigError, RootView
+
+from juju_spell.config import (
+    JUJUSPELL_CONFIG_TEMPLATE,
+    JUJUSPELL_CONTROLLER_TEMPLATE,
+    JUJUSPELL_DEFAULT_CONFIG_TEMPLATE,
+    Controller,
+)
+from juju_spell.validator import compile_template
+from tests.unit.conftest import TEST_CONFIG
+
+
+def _confuse_validate(template, source):
+    """Validate source with confuse library."""
+    try:
+        return RootView([source]).get(template)
+    except ConfigError as error:
+        return type(error), str(error)
+
+
+def _compiled_validate(template, source):
+    """Validate source with compiled template."""
+    try:
+        return compile_template(template)(dict(source))
+    except ConfigError as error:
+        return type(error), str(error)
+
+
+@pytest.fixture
+def source():
+    """Return valid source of config."""
+    source = yaml.safe_load(TEST_CONFIG)
+    for controller in source["controllers"]:
+        controller["model_mapping"] = {"lma": ["monitoring"]}
+        controller["user"], controller["password"] = "admin", "pass1234"
+
+    return source
+
+
+@pytest.mark.parametrize(
+    "update",
+    [
+        {},
+        {"connection": {"port-range": "17071:17080", "max-concurrency": 5}},
+        {"connection": {"port-range": "1:2:3"}},
+        {"connection": {"max-concurrency": "5"}},
+        {"connection": {"max-concurrency": 0}},
+        {"connection": {"max-concurrency": -1}},
+        {"controllers": "not-a-list"},
+        {"controllers": ["not-a-controller"]},
+        {"controllers": [{"name": "a"}]},
+        {"controllers": [{"name": None}]},
+        {"controllers": [{"uuid": "not-uuid", "name": "a"}]},
+        {"controllers": [{"name": "a", "risk": 7}]},
+        {"controllers": [{"name": "a", "tags": "a"}]},
+        {"controllers": [{"name": "a", "connection": {"subnets": ["10.1.1.0/x"]}}]},
+        {"controllers": [{"name": "a", "connection": "bastion"}]},
+        {"default": {"controller": {"customer": 123}}},
+    ],
+)
+@pytest.mark.parametrize(
+    "template",
+    [JUJUSPELL_CONFIG_TEMPLATE, JUJUSPELL_DEFAULT_CONFIG_TEMPLATE],
+)
+def test_compile_template(source, update, template):
+    """Test compiled template produce same values and errors as confuse."""
+    if "controllers" in update and isinstance(update["controllers"], list):
+        controllers = []
+        for controller in update["controllers"]:
+            if isinstance(controller, dict):
+                controller = {**source["controllers"][0], **controller}
+            controllers.append(controller)
+
+        update = {**update, "controllers": controllers}
+
+    source.update(update)
+
+    assert _compiled_validate(template, source) == _confuse_validate(template, source)
+
+
+def test_compile_template_dataclass(source):
+    """Test compiled template create dataclasses."""
+    controller = compile_template(JUJUSPELL_CONTROLLER_TEMPLATE)(
+        source["controllers"][0]
+    )
+
+    assert isinstance(controller, Controller)
+    assert controller.connection.jumps == ["bastion"]
+
+
+def test_compile_template_not_supported():
+    """Test compiling template, which defines its own value method."""
+    with pytest.raises(TypeError):
+        compile_template(confuse.OneOf([str, int]))